@@ -1,33 +1,151 @@
 """
 Admin and data management endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from backend.utils.database import get_db, DatabaseService
-from backend.pipelines.data_pipeline import DataPipeline
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.config import settings
+from backend.models.registry import salary_models
+from backend.pipelines.tasks import retrain_models
+from backend.utils.async_database import get_async_db, AsyncDatabaseService
+from backend.utils.bloom import KnownJobsIndex
+from backend.utils.cache import response_cache
+from backend.utils.executor import ExecutorBusyError, ExecutorTimeoutError, get_task_executor
+from backend.utils.ratelimit import rate_limiter
+from backend.utils.refresh_runs import FAILED
+from backend.utils.scheduler import get_job_scheduler
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
-pipeline = DataPipeline()
 
 
-@router.post("/refresh-data")
-async def refresh_data(db: Session = Depends(get_db)):
-    """Refresh job data from sources"""
+@router.post("/refresh-data", status_code=202)
+async def refresh_data(db: AsyncSession = Depends(get_async_db)):
+    """
+    Queue a refresh of job data from sources and return its job id at once.
+    Poll ``GET /refresh-data/{job_id}`` for progress; only one refresh is
+    queued or running at a time, so a second submission gets 409 with the
+    active job's id.
+    """
+    run, created = await AsyncDatabaseService.submit_refresh_run(db, trigger='api')
+    if not created:
+        raise HTTPException(
+            status_code=409,
+            detail={'message': f"A refresh is already {run['status']}", 'job_id': run['job_id']}
+        )
     try:
-        jobs = pipeline.run()
-        count = DatabaseService.insert_jobs(db, jobs)
-        logger.info(f"Inserted {count} new jobs")
-        return {
-            'success': True,
-            'jobs_inserted': count,
-            'message': f"Successfully refreshed job data with {count} new jobs"
-        }
+        get_job_scheduler().submit_refresh(run['job_id'])
     except Exception as e:
-        logger.error(f"Error refreshing data: {e}")
+        logger.error(f"Error scheduling refresh {run['job_id']}: {e}")
+        await AsyncDatabaseService.finish_refresh_run(db, run['job_id'], FAILED, error=f"Could not schedule: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+    logger.info(f"Queued refresh {run['job_id']}")
+    return {
+        'success': True,
+        'job_id': run['job_id'],
+        'status': run['status'],
+        'status_url': f"{router.prefix}/refresh-data/{run['job_id']}"
+    }
+
+
+@router.get("/refresh-data")
+async def list_refresh_jobs(limit: int = Query(20, ge=1, le=100), db: AsyncSession = Depends(get_async_db)):
+    """Recent refresh jobs, newest first"""
+    return await AsyncDatabaseService.list_refresh_runs(db, limit)
+
+
+@router.get("/refresh-data/{job_id}")
+async def get_refresh_job(job_id: str, db: AsyncSession = Depends(get_async_db)):
+    """
+    Status of a refresh job. ``progress`` holds the pipeline totals so far:
+    jobs scraped, cleaned (``processed``), deduplicated, inserted, updated
+    and unchanged, plus seconds spent per stage in ``timings``.
+    """
+    run = await AsyncDatabaseService.get_refresh_run(db, job_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Refresh job not found")
+    return run
+
+
+@router.post("/refresh-data/{job_id}/cancel")
+async def cancel_refresh_job(job_id: str, db: AsyncSession = Depends(get_async_db)):
+    """
+    Cancel a refresh job. A queued job never starts; a running one stops at
+    its next progress report, keeping the batches it already committed.
+    """
+    run = await AsyncDatabaseService.cancel_refresh_run(db, job_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Refresh job not found")
+    if not run['cancel_requested']:
+        raise HTTPException(status_code=409, detail=f"Refresh job already {run['status']}")
+    return run
+
+
+@router.post("/retrain-models")
+async def retrain(full: bool = False):
+    """
+    Retrain the salary model in a worker process and swap the new version in.
+    Only rows changed since the last version are fitted unless ``full`` is set.
+    """
+    try:
+        result = await get_task_executor().run_background(retrain_models, not full)
+        await get_task_executor().run_inference(salary_models.refresh)
+        await response_cache.ainvalidate()
+        return {'success': True, **result}
+    except (ExecutorBusyError, ExecutorTimeoutError):
+        raise
+    except Exception as e:
+        logger.error(f"Error retraining models: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _model_versions() -> dict:
+    registry = salary_models.registry
+    latest = registry.latest_version(salary_models.name)
+    return {
+        'serving': salary_models.current.version,
+        'latest': latest,
+        'versions': registry.versions(salary_models.name),
+        'metadata': registry.metadata(salary_models.name) if latest else None
+    }
+
+
+@router.get("/models")
+async def get_models():
+    """Published salary model versions and the one this worker serves"""
+    # Reads the registry directory, so off the event loop like /scheduler
+    return await get_task_executor().run_inference(_model_versions)
+
+
+@router.get("/executor")
+async def get_executor_stats():
+    """Queue depth, outcomes and latency of the inference and background pools"""
+    return get_task_executor().stats()
+
+
+def _bloom_stats() -> Optional[dict]:
+    index = KnownJobsIndex()
+    return index.stats() if index.load() else None
+
+
+@router.get("/bloom")
+async def get_bloom_stats():
+    """Size, fill and expected false positive rate of the known jobs filter"""
+    if not settings.bloom_enabled:
+        return {'enabled': False}
+    # Loading reads the whole filter file
+    stats = await get_task_executor().run_inference(_bloom_stats)
+    if stats is None:
+        raise HTTPException(status_code=404, detail="Known jobs filter has not been built yet")
+    return {'enabled': True, **stats}
+
+
+@router.get("/scheduler")
+async def get_scheduler_status():
+    """Whether this replica leads the periodic jobs, who does, and when they run next"""
+    return await get_task_executor().run_inference(get_job_scheduler().status)
 
 
 @router.get("/health")
@@ -41,7 +159,46 @@ async def health_check():
 
 
 @router.get("/stats")
-async def get_detailed_stats(db: Session = Depends(get_db)):
+async def get_detailed_stats(db: AsyncSession = Depends(get_async_db)):
     """Get detailed statistics"""
-    stats = DatabaseService.get_statistics(db)
-    return stats
+    return await response_cache.aget_or_set('admin.stats', {}, lambda: AsyncDatabaseService.get_statistics(db))
+
+
+@router.get("/cache")
+def get_cache_stats():
+    """Response cache hit/miss counters and memory use"""
+    return response_cache.stats()
+
+
+@router.get("/rate-limit")
+async def get_rate_limit_stats():
+    """Allowed and rejected requests and callers tracked by this worker"""
+    return rate_limiter.stats()
+
+
+@router.post("/cache/clear")
+def clear_cache():
+    """Drop every cached response"""
+    response_cache.invalidate()
+    return {'success': True, 'generation': response_cache.stats()['generation']}
+
+
+@router.post("/stats/rebuild")
+async def rebuild_stats(db: AsyncSession = Depends(get_async_db)):
+    """Recompute the statistics rollups from the job table"""
+    try:
+        rows = await AsyncDatabaseService.rebuild_statistics(db)
+        return {'success': True, 'rollup_rows': rows}
+    except Exception as e:
+        logger.error(f"Error rebuilding statistics: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/analytics/refresh")
+async def refresh_analytics(db: AsyncSession = Depends(get_async_db)):
+    """Recompute skill demand and posting growth"""
+    try:
+        return {'success': True, **(await AsyncDatabaseService.refresh_analytics(db))}
+    except Exception as e:
+        logger.error(f"Error refreshing analytics: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,12 +1,19 @@
 """
 FastAPI application setup and configuration
 """
+import asyncio
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZIPMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from backend.config import settings
+from backend.models.registry import salary_models
+from backend.utils.async_database import init_async_db
 from backend.utils.database import init_db
+from backend.utils.executor import ExecutorBusyError, ExecutorTimeoutError, shutdown_task_executor
+from backend.utils.ratelimit import RateLimitMiddleware
+from backend.utils.scheduler import get_job_scheduler, shutdown_job_scheduler
 import logging
 
 logger = logging.getLogger(__name__)
@@ -18,9 +25,18 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting up...")
     init_db()
+    await init_async_db()
+    salary_models.refresh()
+    model_watcher = asyncio.create_task(salary_models.watch())
+    if settings.scheduler_enabled:
+        # Every replica runs one; the database lease picks the one that fires jobs
+        get_job_scheduler().start()
     yield
     # Shutdown
     logger.info("Shutting down...")
+    model_watcher.cancel()
+    shutdown_job_scheduler()
+    shutdown_task_executor()
 
 
 def create_app() -> FastAPI:
@@ -33,6 +49,9 @@ def create_app() -> FastAPI:
         lifespan=lifespan
     )
     
+    # Per-caller request limits; inside CORS so 429s still carry CORS headers
+    app.add_middleware(RateLimitMiddleware)
+    
     # Add CORS middleware
     app.add_middleware(
         CORSMiddleware,
@@ -43,7 +62,16 @@ def create_app() -> FastAPI:
     )
     
     # Add compression middleware
-    app.add_middleware(GZIPMiddleware, minimum_size=1000)
+    app.add_middleware(GZipMiddleware, minimum_size=1000)
+    
+    # Saturated or slow executor pools surface as retryable errors
+    @app.exception_handler(ExecutorBusyError)
+    async def executor_busy(request: Request, exc: ExecutorBusyError):
+        return JSONResponse(status_code=503, content={'detail': str(exc)}, headers={'Retry-After': '1'})
+    
+    @app.exception_handler(ExecutorTimeoutError)
+    async def executor_timeout(request: Request, exc: ExecutorTimeoutError):
+        return JSONResponse(status_code=504, content={'detail': str(exc)})
     
     # Configure logging
     logging.basicConfig(
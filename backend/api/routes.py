@@ -2,76 +2,153 @@
 Jobs API endpoints
 """
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from backend.models.schemas import (
     JobListingResponse, JobSearchQuery, DashboardStats,
-    MLPredictionRequest, MLPredictionResponse
-)
-from backend.utils.database import get_db, DatabaseService
-from backend.models.ml_models import (
-    JobRecommendationModel, SalaryPredictionModel, SkillTrendModel
+    MLPredictionRequest, MLPredictionResponse, JobRankingRequest,
+    SalaryPredictionBatchRequest
 )
+from backend.models.responses import PaginatedResponse
+from backend.utils.cache import response_cache
+from backend.utils.executor import get_task_executor
+from backend.utils.async_database import get_async_db, AsyncDatabaseService
+from backend.utils.pagination import InvalidCursorError
+from backend.models.ml_models import DEFAULT_USER_PREFERENCES, JobRecommendationModel
+from backend.models.registry import salary_models
+from backend.pipelines.enrichment import salary_scores
 
 router = APIRouter(prefix="/api/jobs", tags=["jobs"])
 
-# Initialize ML models
+# Initialize ML models; the salary model is served from the registry via salary_models
 recommendation_model = JobRecommendationModel()
-salary_model = SalaryPredictionModel()
 
 
-@router.get("/", response_model=List[JobListingResponse])
+def _salary_features(job) -> dict:
+    """Salary model inputs for a stored job"""
+    return {
+        'experience_level': job.experience_level,
+        'skills_required': job.skill_names,
+        'remote_type': job.remote_type,
+        'company': job.company,
+        'location': job.location
+    }
+
+
+def _recommendation_scores(job_dict: dict, stored: dict, user_preferences) -> tuple:
+    """(match, growth, salary) scores, reusing precomputed columns where they apply"""
+    # Precomputed columns cover the default profile; only custom preferences are scored live
+    if user_preferences is None and stored['match_score'] is not None:
+        match_score = stored['match_score']
+    else:
+        match_score = recommendation_model.calculate_match_score(
+            job_dict, user_preferences or DEFAULT_USER_PREFERENCES
+        )
+    
+    growth_potential = stored['growth_potential']
+    if growth_potential is None:
+        growth_potential = recommendation_model.calculate_growth_potential(job_dict)
+    salary_score = stored['salary_score']
+    if salary_score is None:
+        # Not enriched yet; score it the way JobEnricher will
+        salary_score = float(salary_scores([job_dict], salary_models.current)[0])
+    return match_score, growth_potential, salary_score
+
+
+@router.get("/", response_model=PaginatedResponse)
 async def search_jobs(
     keyword: str = Query(None),
     experience_level: str = Query(None),
     remote_type: str = Query(None),
     salary_min: float = Query(None),
     location: str = Query(None),
+    skills: List[str] = Query(None),
+    skills_match: str = Query('any', pattern='^(any|all)$'),
+    category: str = Query(None),
+    min_salary_score: float = Query(None),
+    min_growth_potential: float = Query(None),
+    min_match_score: float = Query(None),
+    sort_by: str = Query(None, pattern='^(relevance|posted_date|salary_score|growth_potential|match_score)$'),
     limit: int = Query(20, le=100),
     offset: int = Query(0),
-    db: Session = Depends(get_db)
+    cursor: str = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Search jobs with filters"""
+    """Search jobs with filters, paginated by cursor"""
     query = {
         'keyword': keyword,
         'experience_level': experience_level,
         'remote_type': remote_type,
         'salary_min': salary_min,
         'location': location,
+        'skills': skills,
+        'skills_match': skills_match,
+        'category': category,
+        'min_salary_score': min_salary_score,
+        'min_growth_potential': min_growth_potential,
+        'min_match_score': min_match_score,
+        'sort_by': sort_by,
         'limit': limit,
-        'offset': offset
+        'offset': offset,
+        'cursor': cursor
     }
     
-    jobs = DatabaseService.search_jobs(db, query)
-    return [JobListingResponse.model_validate(job) for job in jobs]
+    async def search():
+        page = await AsyncDatabaseService.search_jobs_page(db, query)
+        return PaginatedResponse(
+            data=[JobListingResponse.model_validate(job) for job in page['jobs']],
+            page_size=limit,
+            next_cursor=page['next_cursor']
+        ).model_dump(mode='json')
+    
+    try:
+        return await response_cache.aget_or_set('jobs.search', query, search)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/stats", response_model=DashboardStats)
+async def get_stats(db: AsyncSession = Depends(get_async_db)):
+    """Get job market statistics for dashboard"""
+    async def dashboard():
+        stats = await AsyncDatabaseService.get_statistics(db)
+        analytics = await AsyncDatabaseService.get_market_analytics(db)
+        
+        return DashboardStats(
+            total_jobs=stats['total_jobs'],
+            avg_salary=stats['avg_salary'],
+            top_companies=[c['name'] for c in stats['top_companies'][:5] if c['name']],
+            top_skills=[s['skill_name'] for s in analytics['top_skills']],
+            avg_salary_by_experience=stats['avg_salary_by_experience'],
+            remote_job_percentage=stats['remote_percentage'],
+            job_growth_rate=analytics['job_growth_rate']
+        ).model_dump(mode='json')
+    
+    return await response_cache.aget_or_set('jobs.stats', {}, dashboard)
 
 
 @router.get("/{job_id}", response_model=JobListingResponse)
-async def get_job(job_id: str, db: Session = Depends(get_db)):
+async def get_job(job_id: str, db: AsyncSession = Depends(get_async_db)):
     """Get job by ID"""
-    job = DatabaseService.get_job_by_id(db, job_id)
+    async def lookup():
+        job = await AsyncDatabaseService.get_job_by_id(db, job_id)
+        return JobListingResponse.model_validate(job).model_dump(mode='json') if job else None
+    
+    job = await response_cache.aget_or_set('jobs.get', {'id': job_id}, lookup)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
-    return JobListingResponse.model_validate(job)
+    return job
 
 
 @router.post("/predict-salary")
-async def predict_salary(job_id: str, db: Session = Depends(get_db)):
+async def predict_salary(job_id: str, db: AsyncSession = Depends(get_async_db)):
     """Predict salary for a job"""
-    job = DatabaseService.get_job_by_id(db, job_id)
+    job = await AsyncDatabaseService.get_job_by_id(db, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    job_dict = {
-        'experience_level': job.experience_level,
-        'skills_required': job.skills_required.split(',') if job.skills_required else [],
-        'remote_type': job.remote_type,
-        'company': job.company,
-        'location': job.location
-    }
-    
-    salary_min, salary_max = salary_model.predict(job_dict)
+    salary_min, salary_max = await get_task_executor().run_inference(salary_models.current.predict, _salary_features(job))
     
     return {
         'job_id': job_id,
@@ -81,63 +158,77 @@ async def predict_salary(job_id: str, db: Session = Depends(get_db)):
     }
 
 
+@router.post("/predict-salary/batch")
+async def predict_salary_batch(request: SalaryPredictionBatchRequest, db: AsyncSession = Depends(get_async_db)):
+    """Predict salaries for many stored jobs and/or raw job payloads in one model call"""
+    jobs = await AsyncDatabaseService.get_jobs_by_ids(db, request.job_ids) if request.job_ids else []
+    found = {job.id for job in jobs}
+    
+    job_ids = [job.id for job in jobs] + [payload.get('id') for payload in request.jobs]
+    features = [_salary_features(job) for job in jobs] + request.jobs
+    predictions = await get_task_executor().run_inference(salary_models.current.predict_batch, features)
+    
+    return {
+        'predictions': [
+            {
+                'job_id': job_id,
+                'predicted_salary_min': salary_min,
+                'predicted_salary_max': salary_max,
+                'currency': 'USD'
+            }
+            for job_id, (salary_min, salary_max) in zip(job_ids, predictions)
+        ],
+        'missing_job_ids': [job_id for job_id in request.job_ids if job_id not in found]
+    }
+
+
 @router.post("/recommendation")
 async def get_recommendation(
     request: MLPredictionRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get job recommendation with match score"""
-    job = DatabaseService.get_job_by_id(db, request.job_id)
+    job = await AsyncDatabaseService.get_job_by_id(db, request.job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
     job_dict = {
         'experience_level': job.experience_level,
-        'skills_required': job.skills_required.split(',') if job.skills_required else [],
+        'skills_required': job.skill_names,
         'remote_type': job.remote_type,
         'company': job.company,
         'location': job.location,
-        'salary_max': job.salary_max or 100000
-    }
-    
-    user_prefs = request.user_preferences or {
-        'experience_level': 'mid',
-        'skills': [],
-        'salary_min': 60000,
-        'location': '',
-        'remote_preference': 'any'
+        'salary_max': job.salary_max
     }
+    stored = {'match_score': job.match_score, 'growth_potential': job.growth_potential,
+              'salary_score': job.salary_score}
     
-    match_score = recommendation_model.calculate_match_score(job_dict, user_prefs)
-    growth_potential = recommendation_model.calculate_growth_potential(job_dict)
+    match_score, growth_potential, salary_score = await get_task_executor().run_inference(
+        _recommendation_scores, job_dict, stored, request.user_preferences
+    )
     
     recommendation = 'highly_recommended' if match_score > 0.7 else 'recommended' if match_score > 0.5 else 'maybe'
     
     return MLPredictionResponse(
         job_id=request.job_id,
         match_score=match_score,
-        salary_score=(job.salary_max or 100000) / 150000,
+        salary_score=salary_score,
         growth_potential=growth_potential,
         recommendation=recommendation,
-        confidence=min(match_score + growth_potential) / 2
+        confidence=min(1.0, (match_score + growth_potential) / 2)
     )
 
 
-@router.get("/stats", response_model=DashboardStats)
-async def get_stats(db: Session = Depends(get_db)):
-    """Get job market statistics for dashboard"""
-    stats = DatabaseService.get_statistics(db)
+@router.post("/rank", response_model=List[JobListingResponse])
+async def rank_jobs(request: JobRankingRequest, db: AsyncSession = Depends(get_async_db)):
+    """Rank every job against the user's preferences and return the top k"""
+    user_prefs = request.user_preferences or DEFAULT_USER_PREFERENCES
+    candidates = await AsyncDatabaseService.get_ranking_candidates(db)
+    ranked = await get_task_executor().run_inference(recommendation_model.rank_jobs, candidates, user_prefs, request.k)
     
-    return DashboardStats(
-        total_jobs=stats['total_jobs'],
-        avg_salary=stats['avg_salary'],
-        top_companies=[c['name'] for c in stats['top_companies'][:5]],
-        top_skills=['Python', 'SQL', 'AWS', 'Spark', 'Kubernetes'],
-        avg_salary_by_experience={
-            'entry': 60000,
-            'mid': 100000,
-            'senior': 150000
-        },
-        remote_job_percentage=stats['remote_percentage'],
-        job_growth_rate=5.2
-    )
+    jobs = await AsyncDatabaseService.get_jobs_by_ids(db, [job_id for job_id, _ in ranked])
+    scores = dict(ranked)
+    return [
+        JobListingResponse.model_validate(job).model_copy(update={'match_score': scores[job.id]})
+        for job in jobs
+    ]
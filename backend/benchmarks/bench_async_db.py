@@ -0,0 +1,118 @@
+"""
+Benchmark concurrent search throughput: blocking session vs AsyncDatabaseService.
+
+Seeds a temporary SQLite database and runs the same batch of concurrent
+searches (a) through the sync session inside the event loop, as the routes
+used to, and (b) through async engines with growing pool sizes. Each
+statement gets ``latency_ms`` of simulated network round trip, spent off the
+GIL like a real database wait, so the numbers reflect a remote PostgreSQL
+rather than a local file on one core. Run with:
+python -m backend.benchmarks.bench_async_db
+"""
+import asyncio
+import os
+import sqlite3
+import tempfile
+import time
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from backend.models.database import Base
+from backend.utils.async_database import AsyncDatabaseService, async_database_url
+from backend.utils.database import DatabaseService
+from backend.utils.search import install_fulltext_index, install_fulltext_index_async
+from backend.benchmarks.bench_job_ranking import make_jobs
+
+LATENCY_SECONDS = 0.0
+
+
+class LatencyCursor(sqlite3.Cursor):
+    def execute(self, *args):
+        time.sleep(LATENCY_SECONDS)
+        return super().execute(*args)
+
+
+class LatencyConnection(sqlite3.Connection):
+    def cursor(self, factory=LatencyCursor):
+        return super().cursor(factory)
+
+
+QUERY = {'keyword': 'python', 'experience_level': 'senior', 'limit': 50}
+
+
+def seed(url: str, n: int) -> None:
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    install_fulltext_index(engine)
+    jobs = [
+        {**job, 'title': f"Engineer {i}", 'company': f"Company {i % 50}",
+         'job_url': f"https://example.com/{i}", 'description': ' '.join(job['skills_required'])}
+        for i, job in enumerate(make_jobs(n))
+    ]
+    db = sessionmaker(bind=engine)()
+    DatabaseService.upsert_jobs(db, jobs)
+    db.close()
+    engine.dispose()
+
+
+async def run_blocking(url: str, requests: int, concurrency: int) -> float:
+    engine = create_engine(url, connect_args={'factory': LatencyConnection, 'check_same_thread': False})
+    install_fulltext_index(engine)
+    sessions = sessionmaker(bind=engine)
+    gate = asyncio.Semaphore(concurrency)
+    
+    async def request(i):
+        async with gate:
+            db = sessions()
+            try:
+                DatabaseService.search_jobs_page(db, {**QUERY, 'offset': i % 200})
+            finally:
+                db.close()
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(request(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+    engine.dispose()
+    return requests / elapsed
+
+
+async def run_async(url: str, pool_size: int, requests: int, concurrency: int) -> float:
+    engine = create_async_engine(
+        async_database_url(url),
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=pool_size,
+        max_overflow=0,
+        connect_args={'factory': LatencyConnection}
+    )
+    await install_fulltext_index_async(engine)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    gate = asyncio.Semaphore(concurrency)
+    
+    async def request(i):
+        async with gate, sessions() as session:
+            await AsyncDatabaseService.search_jobs_page(session, {**QUERY, 'offset': i % 200})
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(request(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+    await engine.dispose()
+    return requests / elapsed
+
+
+def main(n: int = 20_000, requests: int = 400, concurrency: int = 32, latency_ms: float = 5.0) -> None:
+    global LATENCY_SECONDS
+    LATENCY_SECONDS = latency_ms / 1000
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        seed(url, n)
+        print(f"{requests} searches over {n} jobs, {concurrency} in flight, {latency_ms}ms per statement")
+        print(f"  blocking session:  {asyncio.run(run_blocking(url, requests, concurrency)):8.1f} req/s")
+        for pool_size in (1, 2, 4, 8, 16):
+            throughput = asyncio.run(run_async(url, pool_size, requests, concurrency))
+            print(f"  async pool_size={pool_size:<2}: {throughput:8.1f} req/s")
+
+
+if __name__ == "__main__":
+    main()
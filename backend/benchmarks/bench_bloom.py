@@ -0,0 +1,80 @@
+"""
+Benchmark ingesting brand-new jobs with and without the known jobs filter.
+
+Fills a temporary SQLite table with N jobs, then writes the same batch of
+new jobs into two copies of it the way DataPipeline.run_into does: without
+the filter (changed_jobs lookup, then upsert_jobs with its own pre-select
+and ON CONFLICT insert) and with it (KnownJobsIndex.split, then a plain
+INSERT through insert_new_jobs). Also reports the filter's memory and
+measured false positive rate. Run with:
+python -m backend.benchmarks.bench_bloom
+"""
+import os
+import shutil
+import tempfile
+import time
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from backend.models.database import Base
+from backend.utils.bloom import KnownJobsIndex
+from backend.utils.database import DatabaseService
+
+
+def make_job(i: int) -> dict:
+    return {
+        'id': f"job_{i}",
+        'title': f"Engineer {i % 500}",
+        'company': f"Company {i % 3000}",
+        'location': 'Remote',
+        'job_url': f"https://example.com/jobs/{i}",
+        'description': f"Posting {i}",
+        'skills_required': ['python', 'sql'],
+        'source': 'bench'
+    }
+
+
+def session(path: str):
+    engine = create_engine(f"sqlite:///{path}")
+    return engine, sessionmaker(bind=engine)()
+
+
+def main(stored: int = 100_000, batch: int = 20_000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        seeded = os.path.join(tmp, 'seeded.db')
+        engine, db = session(seeded)
+        Base.metadata.create_all(bind=engine)
+        DatabaseService.upsert_jobs(db, [make_job(i) for i in range(stored)], chunk_size=5_000)
+
+        index = KnownJobsIndex(path=os.path.join(tmp, 'known_jobs.bloom'))
+        start = time.perf_counter()
+        index.rebuild(db)
+        print(f"Rebuilt filter over {stored} jobs in {time.perf_counter() - start:.2f} s")
+        db.close()
+        engine.dispose()
+
+        jobs = [make_job(stored + i) for i in range(batch)]
+        for label, use_filter in (("lookup + upsert", False), ("filter + append", True)):
+            path = os.path.join(tmp, f"{use_filter}.db")
+            shutil.copy(seeded, path)
+            engine, db = session(path)
+            start = time.perf_counter()
+            if use_filter:
+                new, maybe = index.split(jobs)
+                DatabaseService.insert_new_jobs(db, new)
+            else:
+                new, maybe = [], jobs
+            DatabaseService.upsert_jobs(db, DatabaseService.changed_jobs(db, maybe))
+            print(f"  {label:<18} {time.perf_counter() - start:8.3f} s per {batch} new jobs ({len(maybe)} looked up)")
+            db.close()
+            engine.dispose()
+
+        stats = index.stats()
+        print(
+            f"  filter: {stats['bytes'] / 2 ** 20:.2f} MiB, {stats['hashes']} hashes, "
+            f"estimated false positive rate {stats['estimated_false_positive_rate']:.4%}, "
+            f"measured {stats['maybe_seen'] / batch:.4%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark near-duplicate lookups against a growing LSH index.
+
+Stores and indexes N canonical postings in a temporary SQLite database, then times
+NearDuplicateDetector.filter on a batch of new jobs (half of them reposts of
+indexed postings). Time per batch should stay flat as N grows, since only
+jobs sharing an LSH bucket are compared. Run with:
+python -m backend.benchmarks.bench_dedup
+"""
+import os
+import random
+import tempfile
+import time
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from backend.models.database import Base
+from backend.pipelines.dedup import NearDuplicateDetector
+from backend.utils.database import DatabaseService
+
+WORDS = [f"word{i}" for i in range(2_000)]
+
+
+def posting(i: int, source: str = 'a') -> dict:
+    rng = random.Random(i)
+    return {
+        'id': f"{source}_{i}",
+        'title': f"Engineer {i % 500}",
+        'company': f"Company {i % 3000}",
+        'description': ' '.join(rng.choice(WORDS) for _ in range(120)),
+        'source': source
+    }
+
+
+def main(sizes=(5_000, 20_000, 80_000), batch: int = 500) -> None:
+    detector = NearDuplicateDetector()
+    print(f"{detector.bands} bands x {detector.rows} rows, threshold {detector.threshold}")
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        indexed = 0
+        for size in sizes:
+            for start in range(indexed, size, 1_000):
+                kept, _, signatures = detector.filter(db, [posting(i) for i in range(start, min(start + 1_000, size))])
+                DatabaseService.insert_new_jobs(db, kept, on_stored=signatures.write)
+            indexed = size
+
+            rng = random.Random(size)
+            reposts = [{**posting(rng.randrange(size)), 'source': 'b'} for _ in range(batch // 2)]
+            jobs = [{**job, 'id': f"b_{size}_{n}"} for n, job in enumerate(reposts)]
+            jobs += [posting(10_000_000 + size + n, 'c') for n in range(batch - len(jobs))]
+
+            start = time.perf_counter()
+            _, duplicates, _ = detector.filter(db, jobs)
+            elapsed = time.perf_counter() - start
+            print(f"  index {size:>7}: {elapsed * 1000:8.1f} ms per {batch} jobs, {len(duplicates)} duplicates found")
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
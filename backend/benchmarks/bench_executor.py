@@ -0,0 +1,92 @@
+"""
+Benchmark /api/jobs/ latency while a model retrain is running.
+
+Serves searches from a seeded temporary database through the ASGI app and
+reports p50/p99/max with no background work, with a RandomForest fit running
+inline on the event loop (how /refresh-data used to run the pipeline), and
+with the same fit submitted to the executor's process pool. Run with:
+python -m backend.benchmarks.bench_executor
+"""
+import asyncio
+import logging
+import os
+import tempfile
+import time
+import httpx
+import numpy as np
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from backend.benchmarks.bench_async_db import seed
+from backend.main import app
+from backend.utils.async_database import create_async_db_engine, get_async_db
+from backend.utils.cache import response_cache
+from backend.utils.executor import TaskExecutor
+from backend.utils.search import install_fulltext_index_async
+
+
+def train_forest(n: int = 20_000) -> float:
+    from sklearn.ensemble import RandomForestRegressor
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(n, 6))
+    y = X @ rng.normal(size=6)
+    return RandomForestRegressor(n_estimators=60, random_state=0).fit(X, y).score(X, y)
+
+
+async def measure(client: httpx.AsyncClient, requests: int, background=None) -> tuple:
+    task = asyncio.ensure_future(background()) if background else None
+    await asyncio.sleep(0.05)  # let the background work start
+    latencies = []
+    for i in range(requests):
+        start = time.perf_counter()
+        # Distinct offsets so every request misses the response cache
+        response = await client.get("/api/jobs/", params={'experience_level': 'senior', 'offset': i})
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+    if task:
+        await task
+    ms = np.array(latencies) * 1000
+    return np.percentile(ms, 50), np.percentile(ms, 99), ms.max()
+
+
+async def run(url: str, requests: int) -> None:
+    engine = create_async_db_engine(url)
+    await install_fulltext_index_async(engine)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    
+    async def override():
+        async with sessions() as session:
+            yield session
+    
+    app.dependency_overrides[get_async_db] = override
+    executor = TaskExecutor(process_workers=1)
+    await executor.run_background(sum, [1])  # start the worker process before measuring
+    
+    async def inline():
+        await asyncio.sleep(0.2)  # start once requests are flowing, then hold the loop
+        train_forest()
+    
+    async def offloaded():
+        await executor.run_background(train_forest)
+    
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for label, background in (('idle', None), ('retrain inline', inline), ('retrain in process pool', offloaded)):
+            response_cache.invalidate()
+            p50, p99, worst = await measure(client, requests, background)
+            print(f"  {label:<24} p50 {p50:7.1f} ms   p99 {p99:7.1f} ms   max {worst:7.1f} ms")
+    
+    executor.shutdown()
+    app.dependency_overrides.clear()
+    await engine.dispose()
+
+
+def main(n: int = 20_000, requests: int = 200) -> None:
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        seed(url, n)
+        print(f"{requests} sequential /api/jobs/ requests over {n} jobs")
+        asyncio.run(run(url, requests))
+
+
+if __name__ == "__main__":
+    main()
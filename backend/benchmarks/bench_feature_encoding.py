@@ -0,0 +1,74 @@
+"""
+Benchmark salary feature encoding on a million rows.
+
+Compares the row-by-row encoding SalaryPredictionModel used to do (tier sets
+rebuilt and scanned on every call) with SalaryFeatureEncoder.encode on the
+same columns, first with cold caches and then warm. Run with:
+python -m backend.benchmarks.bench_feature_encoding
+"""
+import random
+import time
+import numpy as np
+from backend.models.features import SalaryFeatureEncoder
+
+
+def row_by_row(level, skills, remote, company, location) -> list:
+    """The per-job encoding before SalaryFeatureEncoder"""
+    faang = {'google', 'amazon', 'apple', 'facebook', 'meta', 'microsoft', 'netflix', 'tesla'}
+    if any(f in company.lower() for f in faang):
+        company_tier = 0.95
+    elif any(x in company.lower() for x in ['inc', 'corp', 'llc', 'inc.']):
+        company_tier = 0.7
+    else:
+        company_tier = 0.5
+    tier1 = {'san francisco', 'new york', 'seattle', 'boston', 'los angeles'}
+    tier2 = {'chicago', 'denver', 'austin', 'atlanta', 'miami'}
+    loc_lower = location.lower()
+    if any(t in loc_lower for t in tier1):
+        location_tier = 1.0
+    elif any(t in loc_lower for t in tier2):
+        location_tier = 0.8
+    else:
+        location_tier = 0.6
+    return [
+        {'entry': 0.3, 'mid': 0.6, 'senior': 0.9, 'lead': 1.0}.get(level.lower(), 0.6),
+        len(skills),
+        1.15 if remote == 'fully-remote' else 1.0,
+        company_tier,
+        location_tier
+    ]
+
+
+def make_columns(n: int, companies: int = 20_000, locations: int = 2_000, seed: int = 0) -> tuple:
+    rng = random.Random(seed)
+    company_names = [f"{rng.choice(['Acme', 'Google', 'Initech', 'Globex'])} {i} {rng.choice(['Inc', 'Labs', 'LLC'])}" for i in range(companies)]
+    cities = ['Seattle', 'Denver', 'Boise', 'Austin', 'Omaha', 'New York', 'Remote']
+    location_names = [f"{rng.choice(cities)} {i}" for i in range(locations)]
+    skill_lists = [['python'] * k for k in range(9)]
+    return (
+        [rng.choice(['entry', 'mid', 'senior', 'lead']) for _ in range(n)],
+        [rng.choice(skill_lists) for _ in range(n)],
+        [rng.choice(['fully-remote', 'hybrid', 'on-site']) for _ in range(n)],
+        [rng.choice(company_names) for _ in range(n)],
+        [rng.choice(location_names) for _ in range(n)]
+    )
+
+
+def main(n: int = 1_000_000) -> None:
+    columns = make_columns(n)
+    print(f"Encoding {n} rows ({len(set(columns[3]))} companies, {len(set(columns[4]))} locations)")
+
+    start = time.perf_counter()
+    expected = np.array([row_by_row(*row) for row in zip(*columns)])
+    print(f"  row by row           {time.perf_counter() - start:8.3f} s")
+
+    encoder = SalaryFeatureEncoder()
+    for label in ("encoder, cold cache", "encoder, warm cache"):
+        start = time.perf_counter()
+        X = encoder.encode(*columns)
+        print(f"  {label:<20} {time.perf_counter() - start:8.3f} s")
+    print(f"  identical output: {(X == expected).all()}")
+
+
+if __name__ == "__main__":
+    main()
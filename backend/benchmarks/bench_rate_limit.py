@@ -0,0 +1,62 @@
+"""
+Benchmark the rate limiter against the old per-caller timestamp lists.
+
+Sends waves of requests from distinct callers, a new set every window, at
+a fixed request rate per caller, through the list-of-timestamps limiter
+rate_limit_decorator used to keep and through LocalRateLimitBackend.
+Reports time per request and the memory each holds after every wave;
+the lists keep every caller ever seen, the counters only the live ones.
+Run with:
+python -m backend.benchmarks.bench_rate_limit
+"""
+import time
+import tracemalloc
+from backend.utils.ratelimit import LocalRateLimitBackend
+
+CALLERS_PER_WAVE = 50_000
+REQUESTS_PER_CALLER = 5
+WAVES = 4
+WINDOW = 60.0
+LIMIT = 100
+
+
+class TimestampListLimiter:
+    """The previous decorator's bookkeeping: every call time per caller, filtered on each hit"""
+
+    def __init__(self):
+        self.calls = {}
+
+    def hit(self, key, limit, window, now):
+        calls = [call for call in self.calls.get(key, []) if now - call < window]
+        self.calls[key] = calls
+        if len(calls) >= limit:
+            return False
+        calls.append(now)
+        return True
+
+
+def run(name, limiter):
+    tracemalloc.start()
+    elapsed = 0.0
+    for wave in range(WAVES):
+        start_at = wave * 2 * WINDOW  # each wave arrives after the last one has gone idle
+        started = time.perf_counter()
+        for i in range(CALLERS_PER_WAVE):
+            key = f"10.{wave}.{i // 256}.{i % 256}"
+            for r in range(REQUESTS_PER_CALLER):
+                limiter.hit(key, LIMIT, WINDOW, start_at + r)
+        elapsed += time.perf_counter() - started
+        current, _ = tracemalloc.get_traced_memory()
+        print(f"{name:>16} wave {wave + 1}: {current / 1e6:7.1f} MB held")
+    tracemalloc.stop()
+    requests = WAVES * CALLERS_PER_WAVE * REQUESTS_PER_CALLER
+    print(f"{name:>16}: {elapsed / requests * 1e6:.2f} us per request")
+
+
+def main():
+    run('timestamp lists', TimestampListLimiter())
+    run('sliding window', LocalRateLimitBackend(max_keys=100_000))
+
+
+if __name__ == '__main__':
+    main()
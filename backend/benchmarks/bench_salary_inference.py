@@ -0,0 +1,51 @@
+"""
+Benchmark salary prediction: sklearn forest vs the compiled flat-array forest.
+
+Trains SalaryPredictionModel on synthetic jobs, checks that the compiled
+forest returns exactly what ``scaler.transform`` + ``RandomForestRegressor
+.predict`` return, and reports single-row latency (p50/p99) and batch
+throughput for both. Run with:
+python -m backend.benchmarks.bench_salary_inference
+"""
+import time
+import numpy as np
+from backend.benchmarks.bench_job_ranking import make_jobs
+from backend.models.ml_models import SalaryPredictionModel
+
+
+def latencies(fn, rows) -> np.ndarray:
+    out = []
+    for row in rows:
+        start = time.perf_counter()
+        fn(row)
+        out.append(time.perf_counter() - start)
+    return np.array(out) * 1e6
+
+
+def main(n: int = 20_000, requests: int = 1_000, batch: int = 1_000) -> None:
+    model = SalaryPredictionModel()
+    model.save = lambda: None
+    model.train(make_jobs(n))
+    model.model.set_params(n_jobs=1)  # sequential tree sums, as the compiled forest does
+    forest, scaler, compiled = model.model, model.scaler, model.forest
+
+    X = model.encoder.encode_jobs(make_jobs(batch, seed=7))
+    exact = (compiled.predict(X) == forest.predict(scaler.transform(X))).all()
+    print(f"{forest.n_estimators} trees, depth {compiled.depth}, {compiled.feature.size} nodes; "
+          f"identical predictions on {batch} unseen rows: {exact}")
+
+    rows = X[np.arange(requests) % batch]
+    sklearn_us = latencies(lambda row: forest.predict(scaler.transform(row[None, :])), rows)
+    compiled_us = latencies(compiled.predict_one, rows)
+    for label, us in (("sklearn", sklearn_us), ("compiled", compiled_us)):
+        print(f"  single row {label:<9} p50 {np.percentile(us, 50):8.1f} us  p99 {np.percentile(us, 99):8.1f} us")
+    print(f"  single-row speedup: {np.median(sklearn_us) / np.median(compiled_us):.1f}x")
+
+    for label, fn in (("sklearn", lambda: forest.predict(scaler.transform(X))), ("compiled", lambda: compiled.predict(X))):
+        start = time.perf_counter()
+        fn()
+        print(f"  batch of {batch} {label:<9} {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark salary model training: time and memory per million rows.
+
+Seeds a temporary SQLite database and compares building the training set from
+ORM objects and per-job dicts (how retraining used to load jobs) with the
+streamed, preallocated matrix, then times a full fit and an incremental fit
+of 1% new rows. Time is extrapolated per million rows; peak Python
+allocations (tracemalloc) are reported as measured, since the streamed build
+peaks at one chunk plus the matrix rather than growing per row. Run with:
+python -m backend.benchmarks.bench_training
+"""
+import os
+import tempfile
+import time
+import tracemalloc
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from backend.benchmarks.bench_async_db import seed
+from backend.benchmarks.bench_job_ranking import make_jobs
+from backend.models.ml_models import SalaryPredictionModel
+from backend.utils.database import DatabaseService
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def orm_matrix(db):
+    model = SalaryPredictionModel()
+    jobs = DatabaseService.get_all_jobs(db, limit=None)
+    return model.encoder.encode_jobs([
+        {
+            'experience_level': job.experience_level,
+            'skills_required': job.skill_names,
+            'remote_type': job.remote_type,
+            'company': job.company,
+            'location': job.location
+        }
+        for job in jobs
+    ])
+
+
+def report(label: str, rows: int, seconds: float, peak: int) -> None:
+    print(f"  {label:<22} {seconds * 1_000_000 / rows:8.2f} s/M rows {peak / 2**20:9.1f} MiB peak")
+
+
+def main(n: int = 50_000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        seed(url, n)
+        engine = create_engine(url)
+        db = sessionmaker(bind=engine)()
+        print(f"Salary training over {n} jobs")
+
+        _, seconds, peak = measure(lambda: orm_matrix(db))
+        report("ORM + dicts build", n, seconds, peak)
+        db.expunge_all()
+
+        _, seconds, peak = measure(lambda: SalaryPredictionModel().training_matrix(db))
+        report("streamed build", n, seconds, peak)
+
+        model = SalaryPredictionModel(models_dir=os.path.join(tmp, 'models'))
+        full, seconds, peak = measure(lambda: model.train_from_db(db))
+        report("full train", n, seconds, peak)
+        print(f"  training matrix        {full['matrix_bytes'] * 1_000_000 / n / 2**20:8.1f} MiB/M rows")
+
+        extra = [
+            {**job, 'id': f"new_{i}", 'job_url': f"https://example.com/new/{i}"}
+            for i, job in enumerate(make_jobs(n // 100, seed=7))
+        ]
+        DatabaseService.upsert_jobs(db, extra)
+        update, seconds, _ = measure(lambda: model.train_from_db(db))
+        print(f"  incremental train      {seconds:8.2f} s for {update['rows']} new rows "
+              f"({update['trees']} trees, full train took {full['build_seconds'] + full['fit_seconds']:.2f} s)")
+
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@
 Backend configuration management
 """
 import os
-from typing import Literal
+from typing import Literal, Optional
 from pydantic_settings import BaseSettings
 
 
@@ -21,13 +21,73 @@ class Settings(BaseSettings):
     
     # Database
     database_url: str = "sqlite:///./jobs.db"
+    bulk_insert_chunk_size: int = 500  # rows per INSERT ... ON CONFLICT batch
+    db_pool_size: int = 10  # async engine connections serving concurrent requests
+    db_max_overflow: int = 10
     
     # Data Pipeline
     data_refresh_interval: int = 3600  # 1 hour in seconds
     max_jobs_per_scrape: int = 1000
+    scrape_concurrency: int = 8  # scrapers run in parallel; 1 runs them sequentially
+    scrape_source_timeout: float = 30.0  # seconds allowed per source
+    scrape_total_timeout: float = 60.0  # seconds allowed for the whole fan-out
+    scrape_max_per_host: int = 2  # concurrent HTTP requests per host
+    pipeline_queue_size: int = 1000  # scraped jobs buffered ahead of the DB sink
+    skill_vocabulary_path: Optional[str] = None  # JSON {skill: [aliases]}; built-in list if unset
+    dedup_enabled: bool = True  # drop near-duplicate postings across sources
+    dedup_threshold: float = 0.8  # estimated Jaccard similarity of shingles to count as a duplicate
+    dedup_num_perm: int = 128  # MinHash permutations per signature
+    dedup_shingle_size: int = 3  # words per shingle
+    bloom_enabled: bool = True  # skip the existing-row lookup for jobs the filter has never seen
+    bloom_path: str = "./known_jobs.bloom"  # persisted filter of stored job ids and urls
+    bloom_capacity: int = 1_000_000  # keys the filter is sized for; grows on rebuild
+    bloom_error_rate: float = 0.01  # false positive rate at capacity
+    refresh_progress_interval: float = 2.0  # seconds between progress reports of a running refresh
+    refresh_stale_after: float = 900.0  # an active refresh silent this long is presumed dead
+    scheduler_enabled: bool = False  # run periodic refresh/retrain; safe on every replica
+    scheduler_lease_ttl: float = 30.0  # seconds a replica leads the scheduler without renewing
+    scheduler_heartbeat_interval: float = 10.0  # seconds between leadership renewals
+    
+    # Response cache
+    cache_enabled: bool = True
+    cache_backend: Literal["local", "redis"] = "local"  # redis shares entries across workers
+    cache_ttl_seconds: float = 300.0
+    cache_max_bytes: int = 64 * 1024 * 1024  # memory budget of the local backend
+    cache_shared_generation: bool = True  # local backend: invalidations from any process reach all via the database
+    cache_generation_check_seconds: float = 1.0  # how often each process polls the shared generation
+    redis_url: Optional[str] = None
+    
+    # Rate limiting
+    rate_limit_enabled: bool = True
+    rate_limit_backend: Literal["local", "redis"] = "local"  # redis shares counts across workers
+    rate_limit_requests: int = 300  # requests allowed per caller per window
+    rate_limit_window_seconds: float = 60.0
+    rate_limit_max_keys: int = 100_000  # callers tracked per worker by the local backend
+    rate_limit_trust_proxy: bool = False  # key on X-Forwarded-For when behind a trusted proxy
+    rate_limit_proxy_hops: int = 1  # trusted proxies in front of the app, each appending to X-Forwarded-For
+    rate_limit_exempt_paths: list = ["/api/admin/health"]
+    
+    # Executors for CPU-bound work off the event loop
+    executor_thread_workers: int = 4  # short model inference
+    executor_process_workers: int = 2  # training and pipeline runs; 0 uses a thread instead
+    executor_max_pending: int = 64  # queued + running tasks per pool before rejecting
+    executor_inference_timeout: float = 10.0
+    executor_background_timeout: float = 1800.0
+    executor_process_nice: int = 10  # background workers run at lower CPU priority
     
     # ML Models
-    models_dir: str = "backend/models/saved"
+    models_dir: str = "backend/models/saved"  # model registry root
+    models_keep_versions: int = 5  # versions kept per model
+    models_reload_interval: float = 30.0  # seconds between checks for a newer version
+    feature_cache_size: int = 65536  # distinct values memoized per feature lookup
+    training_chunk_size: int = 2000  # rows streamed per fetch when building the training matrix
+    training_n_jobs: int = -1  # cores used to fit trees; -1 uses all of them
+    training_trees: int = 100  # trees in a full retrain
+    training_trees_per_update: int = 10  # fewest trees added per incremental retrain
+    training_min_update_fraction: float = 0.05  # smaller batches of changed rows wait for the next retrain
+    training_max_update_fraction: float = 0.5  # larger batches rebuild from scratch
+    training_replay_ratio: float = 1.0  # already-fitted rows sampled per changed row into new trees
+    training_max_trees: int = 300  # past this an incremental retrain rebuilds from scratch
     
     # CORS
     cors_origins: list = ["http://localhost:5173", "http://localhost:3000"]
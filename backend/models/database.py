@@ -3,13 +3,27 @@ Database models for job listings and analysis
 """
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import Column, String, Integer, Float, DateTime, Text, Boolean, Index
+from sqlalchemy import (
+    BigInteger, Column, String, Integer, Float, DateTime, Text, Boolean, Index, ForeignKey, LargeBinary, Table
+)
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, relationship
 
 Base = declarative_base()
 
 
+# Many-to-many link between job listings and the JobSkill dictionary. The
+# primary key serves job -> skills lookups, idx_job_listing_skills_skill
+# serves skill -> jobs filters.
+job_listing_skills = Table(
+    "job_listing_skills",
+    Base.metadata,
+    Column("job_id", String, ForeignKey("job_listings.id", ondelete="CASCADE"), primary_key=True),
+    Column("skill_id", String, ForeignKey("job_skills.id", ondelete="CASCADE"), primary_key=True),
+    Index("idx_job_listing_skills_skill", "skill_id", "job_id"),
+)
+
+
 class JobListing(Base):
     """Job listing database model"""
     __tablename__ = "job_listings"
@@ -25,28 +39,100 @@ class JobListing(Base):
     salary_currency = Column(String, default="USD")
     job_type = Column(String)  # full-time, part-time, contract
     experience_level = Column(String)  # entry, mid, senior
-    skills_required = Column(Text)  # JSON string
+    skills_required = Column(Text)  # comma-joined copy; read skills through `skills`
     remote_type = Column(String)  # fully-remote, hybrid, on-site
     posted_date = Column(DateTime)
     source = Column(String)  # LinkedIn, Indeed, etc
+    company_type = Column(String, nullable=True)  # startup, scale-up, enterprise
     is_featured = Column(Boolean, default=False)
     
-    # ML Features
+    # ML Features (precomputed at ingest by JobEnricher)
     salary_score = Column(Float, nullable=True)
     growth_potential = Column(Float, nullable=True)
     match_score = Column(Float, nullable=True)
-    category = Column(String, nullable=True)
+    category = Column(String, nullable=True, index=True)
+    features_version = Column(String, nullable=True)  # enrichment + model version that wrote them
     
     # Metadata
+    content_hash = Column(String(32), nullable=True)  # fingerprint of the scraped fields, see upsert_jobs
     created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # last content change
+
+    skills = relationship("JobSkill", secondary=job_listing_skills)
 
     __table_args__ = (
         Index('idx_company_location', 'company', 'location'),
-        Index('idx_posted_date', 'posted_date'),
+        Index('idx_posted_date', 'posted_date', 'id'),
+        Index('idx_created_at', 'created_at'),
         Index('idx_experience_level', 'experience_level'),
+        Index('idx_salary_score', 'salary_score', 'id'),
+        Index('idx_growth_potential', 'growth_potential', 'id'),
+        Index('idx_match_score', 'match_score', 'id'),
     )
 
+    @property
+    def skill_names(self) -> list:
+        """Names of the skills linked to this job"""
+        return [skill.skill_name for skill in self.skills]
+
+
+class JobSignature(Base):
+    """MinHash signature of every job the pipeline has seen, mapped to its canonical posting"""
+    __tablename__ = "job_signatures"
+
+    job_id = Column(String, primary_key=True)
+    canonical_id = Column(String, nullable=False, index=True)  # job_id itself for canonical postings
+    source = Column(String)
+    title_key = Column(String)  # normalized title; duplicates must share it
+    signature = Column(LargeBinary, nullable=False)  # uint32 MinHash values
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+# LSH band buckets of canonical postings. The primary key serves the
+# bucket -> jobs lookups that find near-duplicate candidates.
+job_lsh_buckets = Table(
+    "job_lsh_buckets",
+    Base.metadata,
+    Column("bucket", BigInteger, primary_key=True),
+    Column("job_id", String, ForeignKey("job_signatures.job_id", ondelete="CASCADE"), primary_key=True),
+)
+
+
+class RefreshRun(Base):
+    """A data refresh submitted through the admin API or the scheduler"""
+    __tablename__ = "refresh_runs"
+
+    id = Column(String, primary_key=True)
+    trigger = Column(String)  # api, schedule
+    status = Column(String, nullable=False, index=True)  # queued, running, succeeded, failed, cancelled
+    active = Column(Boolean, unique=True)  # True while queued or running, NULL after: one active run at a time
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+    progress = Column(Text)  # JSON pipeline totals so far
+    result = Column(Text)  # JSON pipeline totals of a finished run
+    error = Column(Text)
+    requested_at = Column(DateTime, default=datetime.utcnow, index=True)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    heartbeat_at = Column(DateTime)  # last progress report
+
+
+class SchedulerLease(Base):
+    """Time-limited lease letting one replica lead or run a task, see backend.utils.lease"""
+    __tablename__ = "scheduler_leases"
+
+    name = Column(String, primary_key=True)
+    holder = Column(String, nullable=False)  # host:pid:nonce of the replica holding it
+    acquired_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+
+class CacheGeneration(Base):
+    """Shared generation of the response cache, see backend.utils.cache.DatabaseGeneration"""
+    __tablename__ = "cache_generations"
+
+    name = Column(String, primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
 
 class JobAnalysis(Base):
     """Analysis and insights on job market"""
@@ -60,6 +146,21 @@ class JobAnalysis(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
 
+class JobStatRollup(Base):
+    """Running totals behind the dashboard statistics, kept current by every job write"""
+    __tablename__ = "job_stat_rollups"
+
+    dimension = Column(String, primary_key=True)  # total, company, experience_level, remote_type
+    value = Column(String, primary_key=True)  # '' for the total row and missing values
+    job_count = Column(Integer, nullable=False, default=0)
+    salary_sum = Column(Float, nullable=False, default=0.0)  # over jobs with a salary_max
+    salary_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index('idx_job_stat_rollups_count', 'dimension', 'job_count'),
+    )
+
+
 class JobSkill(Base):
     """In-demand skills analysis"""
     __tablename__ = "job_skills"
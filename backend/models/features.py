@@ -0,0 +1,145 @@
+"""
+Salary feature encoding shared by training and serving
+"""
+import json
+import re
+from functools import lru_cache
+from itertools import repeat
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from backend.config import settings
+
+# Scores behind each salary feature. Saved with every trained model so a
+# version is always served with the vocabulary it was trained on.
+DEFAULT_SALARY_VOCABULARY: Dict = {
+    'experience_levels': {'entry': 0.3, 'mid': 0.6, 'senior': 0.9, 'lead': 1.0},
+    'experience_default': 0.6,
+    'remote_bonus': {'fully-remote': 1.15},
+    'remote_default': 1.0,
+    # [score, substrings], first match wins
+    'company_tiers': [
+        [0.95, ['google', 'amazon', 'apple', 'facebook', 'meta', 'microsoft', 'netflix', 'tesla']],
+        [0.7, ['inc', 'corp', 'llc', 'inc.']],
+    ],
+    'company_default': 0.5,
+    'location_tiers': [
+        [1.0, ['san francisco', 'new york', 'seattle', 'boston', 'los angeles']],
+        [0.8, ['chicago', 'denver', 'austin', 'atlanta', 'miami']],
+    ],
+    'location_default': 0.6,
+}
+
+
+def _tier_patterns(tiers: List) -> List:
+    """One alternation regex per tier; ``search`` matches any substring like ``any(t in s)``"""
+    return [(float(score), re.compile('|'.join(re.escape(term.lower()) for term in terms))) for score, terms in tiers]
+
+
+def _skill_count(skills) -> int:
+    if skills is None:
+        return 0
+    if isinstance(skills, (int, np.integer)):
+        return int(skills)
+    return len(skills)
+
+
+class SalaryFeatureEncoder:
+    """
+    Encode job columns into the salary model's feature matrix.
+
+    The vocabulary is copied at construction and never changes afterwards.
+    Experience, company and location scores are computed once per distinct
+    value and kept in bounded LRU caches, so encoding a column costs one C
+    level cache lookup per row.
+    """
+
+    FEATURE_NAMES = (
+        'experience_level_encoded',
+        'skills_count',
+        'remote_type_bonus',
+        'company_tier',
+        'location_tier'
+    )
+
+    def __init__(self, vocabulary: Optional[Dict] = None, cache_size: Optional[int] = None):
+        vocabulary = vocabulary if vocabulary is not None else DEFAULT_SALARY_VOCABULARY
+        self._vocabulary = json.loads(json.dumps(vocabulary))
+
+        self._experience = {level.lower(): float(score) for level, score in self._vocabulary['experience_levels'].items()}
+        self._experience_default = float(self._vocabulary['experience_default'])
+        self._remote = {remote: float(bonus) for remote, bonus in self._vocabulary['remote_bonus'].items()}
+        self._remote_default = float(self._vocabulary['remote_default'])
+        self._company_tiers = _tier_patterns(self._vocabulary['company_tiers'])
+        self._company_default = float(self._vocabulary['company_default'])
+        self._location_tiers = _tier_patterns(self._vocabulary['location_tiers'])
+        self._location_default = float(self._vocabulary['location_default'])
+
+        cache_size = cache_size or settings.feature_cache_size
+        self.experience_score = lru_cache(maxsize=cache_size)(self._experience_score)
+        self.company_tier = lru_cache(maxsize=cache_size)(self._company_tier)
+        self.location_tier = lru_cache(maxsize=cache_size)(self._location_tier)
+
+    @property
+    def vocabulary(self) -> Dict:
+        """Copy of the vocabulary, JSON-serializable for model metadata"""
+        return json.loads(json.dumps(self._vocabulary))
+
+    def encode(
+        self,
+        experience: Sequence[Optional[str]],
+        skills: Sequence,
+        remote: Sequence[Optional[str]],
+        company: Sequence[Optional[str]],
+        location: Sequence[Optional[str]]
+    ) -> np.ndarray:
+        """
+        Feature matrix (rows x ``FEATURE_NAMES``) from equal-length columns.
+        ``skills`` holds skill lists or precomputed counts.
+        """
+        n = len(experience)
+        X = np.empty((n, len(self.FEATURE_NAMES)), dtype=np.float64)
+        X[:, 0] = np.fromiter(map(self.experience_score, experience), np.float64, n)
+        if isinstance(skills, np.ndarray) and skills.dtype.kind in 'iuf':
+            X[:, 1] = skills
+        else:
+            try:
+                X[:, 1] = np.fromiter(map(len, skills), np.float64, n)
+            except TypeError:  # counts or missing lists mixed in
+                X[:, 1] = np.fromiter(map(_skill_count, skills), np.float64, n)
+        X[:, 2] = np.fromiter(map(self._remote.get, remote, repeat(self._remote_default)), np.float64, n)
+        X[:, 3] = np.fromiter(map(self.company_tier, company), np.float64, n)
+        X[:, 4] = np.fromiter(map(self.location_tier, location), np.float64, n)
+        return X
+
+    def encode_jobs(self, jobs: Sequence[Dict]) -> np.ndarray:
+        """Feature matrix for job dicts (``experience_level``, ``skills_required``, ...)"""
+        return self.encode(
+            [job.get('experience_level') for job in jobs],
+            [job.get('skills_required') for job in jobs],
+            [job.get('remote_type') for job in jobs],
+            [job.get('company') for job in jobs],
+            [job.get('location') for job in jobs]
+        )
+
+    def cache_info(self) -> Dict:
+        """Hits, misses and size of each lookup cache"""
+        return {
+            name: getattr(self, name).cache_info()._asdict()
+            for name in ('experience_score', 'company_tier', 'location_tier')
+        }
+
+    def _experience_score(self, level: Optional[str]) -> float:
+        return self._experience.get((level or '').lower(), self._experience_default)
+
+    def _company_tier(self, company: Optional[str]) -> float:
+        return self._tier((company or '').lower(), self._company_tiers, self._company_default)
+
+    def _location_tier(self, location: Optional[str]) -> float:
+        return self._tier((location or '').lower(), self._location_tiers, self._location_default)
+
+    @staticmethod
+    def _tier(value: str, tiers: List, default: float) -> float:
+        for score, pattern in tiers:
+            if pattern.search(value):
+                return score
+        return default
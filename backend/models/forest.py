@@ -0,0 +1,148 @@
+"""
+Random forest compiled to flat arrays for low-overhead inference.
+
+``RandomForestRegressor.predict`` spends most of a single-row call on input
+validation and joblib dispatch. ``CompiledForest`` concatenates every tree
+into one set of node arrays and walks all trees at once with a fixed number
+of vectorized steps, so one row costs a few dozen small NumPy operations.
+"""
+from typing import Dict
+import numpy as np
+
+TREE_LEAF = -1  # sklearn's child index for leaves
+
+
+class CompiledForest:
+    """
+    Every tree of a fitted forest as contiguous node arrays.
+
+    ``children`` interleaves each node's left and right child, so a step is
+    ``children[2 * node + (x > threshold)]``. Leaves point to themselves with
+    an infinite threshold, so traversal can step all trees together without
+    tracking which ones finished.
+    When a ``StandardScaler`` is folded in, thresholds are in raw feature
+    units and predictions equal ``forest.predict(scaler.transform(X))``.
+    """
+
+    ARRAYS = ('feature', 'threshold', 'children', 'value', 'roots', 'depth')
+
+    def __init__(self, feature, threshold, children, value, roots, depth):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.depth = int(depth)
+
+    @classmethod
+    def from_sklearn(cls, forest, scaler=None) -> "CompiledForest":
+        """Compile a fitted ``RandomForestRegressor`` (and optional scaler)"""
+        features, thresholds, children, values, roots = [], [], [], [], []
+        offset = 0
+        depth = 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            nodes = np.arange(tree.node_count, dtype=np.int32) + offset
+            leaf = tree.children_left == TREE_LEAF
+
+            features.append(np.where(leaf, 0, tree.feature).astype(np.int32))
+            thresholds.append(np.where(leaf, np.inf, tree.threshold))
+            children.append(np.column_stack([
+                np.where(leaf, nodes, tree.children_left + offset),
+                np.where(leaf, nodes, tree.children_right + offset)
+            ]).astype(np.int32).ravel())
+            values.append(tree.value[:, 0, 0].astype(np.float64))
+            roots.append(offset)
+            depth = max(depth, tree.max_depth)
+            offset += tree.node_count
+
+        feature = np.concatenate(features)
+        threshold = np.concatenate(thresholds)
+        if scaler is not None:
+            internal = np.isfinite(threshold)
+            threshold[internal] = _raw_thresholds(
+                threshold[internal], scaler.mean_[feature[internal]], scaler.scale_[feature[internal]]
+            )
+
+        return cls(
+            feature, threshold, np.concatenate(children),
+            np.concatenate(values), np.array(roots, dtype=np.int32), depth
+        )
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> "CompiledForest":
+        """Rebuild from ``to_arrays`` output (e.g. memory-mapped from the registry)"""
+        return cls(**{name: arrays[name] for name in cls.ARRAYS})
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        return {
+            'feature': self.feature,
+            'threshold': self.threshold,
+            'children': self.children,
+            'value': self.value,
+            'roots': self.roots,
+            'depth': np.array(self.depth)
+        }
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def predict(self, X) -> np.ndarray:
+        """Mean leaf value over trees for each row of ``X``"""
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[None, :]
+        # Index the flattened rows so every step is a plain np.take
+        row_offsets = (np.arange(len(X)) * X.shape[1])[:, None]
+        flat = X.ravel()
+        nodes = np.broadcast_to(self.roots, (len(X), self.n_trees))
+        for _ in range(self.depth):
+            values = np.take(flat, row_offsets + np.take(self.feature, nodes))
+            nodes = np.take(self.children, 2 * nodes + (values > np.take(self.threshold, nodes)))
+        # cumsum adds trees left to right like sklearn, keeping results identical
+        return np.cumsum(np.take(self.value, nodes), axis=1)[:, -1] / self.n_trees
+
+    def predict_one(self, x) -> float:
+        """``predict`` for a single feature vector, without the batch bookkeeping"""
+        x = np.asarray(x, dtype=np.float64)
+        nodes = self.roots
+        for _ in range(self.depth):
+            go_right = np.take(x, np.take(self.feature, nodes)) > np.take(self.threshold, nodes)
+            nodes = np.take(self.children, 2 * nodes + go_right)
+        return float(np.cumsum(np.take(self.value, nodes))[-1] / self.n_trees)
+
+
+def _raw_thresholds(threshold: np.ndarray, mean: np.ndarray, scale: np.ndarray) -> np.ndarray:
+    """
+    Largest raw value ``x`` per node with ``float32((x - mean) / scale) <=
+    threshold``, the comparison sklearn makes on scaled input. The map is
+    monotonic, so ``x <= result`` decides the same split for every input.
+    Found by bisection over the ordered bit patterns of float64.
+    """
+    def passes(x):
+        return ((x - mean) / scale).astype(np.float32) <= threshold
+
+    guess = threshold * scale + mean
+    margin = (np.abs(guess) + 1.0) * 1e-3  # far wider than float32 rounding
+    low, high = guess - margin, guess + margin
+    if not (passes(low).all() and not passes(high).any()):
+        raise ValueError("Could not bracket the raw split thresholds; the scaler cannot be folded in")
+
+    low, high = _ordered(low), _ordered(high)
+    for _ in range(64):
+        mid = low + (high - low) // 2
+        ok = passes(_unordered(mid))
+        low = np.where(ok, mid, low)
+        high = np.where(ok, high, mid)
+    return _unordered(low)
+
+
+def _ordered(x: np.ndarray) -> np.ndarray:
+    """float64 -> int64 keys with the same ordering"""
+    bits = x.view(np.int64)
+    return np.where(bits < 0, -(bits & 0x7FFFFFFFFFFFFFFF), bits)
+
+
+def _unordered(keys: np.ndarray) -> np.ndarray:
+    return np.where(keys < 0, (-keys) | np.int64(-0x8000000000000000), keys).view(np.float64)
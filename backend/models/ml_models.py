@@ -2,109 +2,285 @@
 ML models for job market analysis and predictions
 """
 import json
-import pickle
 from datetime import datetime
 from typing import List, Dict, Optional, Tuple
 import numpy as np
 from sklearn.preprocessing import StandardScaler
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingClassifier
+from backend.config import settings
+from backend.models.features import SalaryFeatureEncoder
+from backend.models.forest import CompiledForest
 import os
 
 
 class SalaryPredictionModel:
-    """Predict salary ranges for jobs"""
+    """
+    Predict salary ranges for jobs.
     
-    def __init__(self):
-        self.model = None
-        self.scaler = StandardScaler()
-        self.feature_names = [
-            'experience_level_encoded',
-            'skills_count',
-            'remote_type_bonus',
-            'company_tier',
-            'location_tier'
-        ]
-        self.models_dir = "backend/models/saved"
-        self._ensure_models_dir()
+    Predictions only use the compiled ``forest``. The sklearn ``model`` and
+    its ``scaler`` are needed to train and grow it, so a loaded version
+    reads them from the registry on first access instead of in ``load``.
+    """
     
-    def _ensure_models_dir(self):
-        """Ensure models directory exists"""
-        os.makedirs(self.models_dir, exist_ok=True)
+    REGISTRY_NAME = 'salary'
+    TRAINING_ARTIFACTS = ['model', 'scaler']
+    
+    def __init__(self, models_dir: Optional[str] = None):
+        self._model = None
+        self._scaler = StandardScaler()
+        self._training_source = None  # (registry, version) to read model and scaler from
+        self.forest: Optional[CompiledForest] = None  # model + scaler compiled for inference
+        self.encoder = SalaryFeatureEncoder()
+        self.feature_names = list(SalaryFeatureEncoder.FEATURE_NAMES)
+        self.models_dir = models_dir or settings.models_dir
+        self.version = "baseline"
+        self.training_samples = 0
+        self.trained_through: Optional[datetime] = None
+    
+    @property
+    def registry(self):
+        from backend.models.registry import ModelRegistry
+        return ModelRegistry(self.models_dir)
+    
+    @property
+    def model(self) -> Optional[RandomForestRegressor]:
+        self._load_training_artifacts()
+        return self._model
+    
+    @model.setter
+    def model(self, model: Optional[RandomForestRegressor]) -> None:
+        self._load_training_artifacts()
+        self._model = model
+    
+    @property
+    def scaler(self) -> StandardScaler:
+        self._load_training_artifacts()
+        return self._scaler
+    
+    @scaler.setter
+    def scaler(self, scaler: StandardScaler) -> None:
+        self._load_training_artifacts()
+        self._scaler = scaler
+    
+    def _load_training_artifacts(self) -> None:
+        if self._training_source is None:
+            return
+        registry, version = self._training_source
+        artifacts, _ = registry.load(self.REGISTRY_NAME, version, only=self.TRAINING_ARTIFACTS)
+        self._model, self._scaler = artifacts['model'], artifacts['scaler']
+        self._training_source = None
     
     def train(self, training_data: List[Dict]) -> None:
         """Train salary prediction model"""
         if not training_data:
             return
         
-        X = []
-        y = []
-        
-        for record in training_data:
-            features = [
-                self._encode_experience(record.get('experience_level', 'mid')),
-                len(record.get('skills_required', [])),
-                1.15 if record.get('remote_type') == 'fully-remote' else 1.0,
-                self._company_tier_score(record.get('company', '')),
-                self._location_tier_score(record.get('location', ''))
-            ]
-            X.append(features)
-            
-            salary_max = record.get('salary_max', 100000)
-            y.append(salary_max)
-        
-        if X and y:
-            X_scaled = self.scaler.fit_transform(np.array(X))
-            self.model = RandomForestRegressor(n_estimators=100, random_state=42)
-            self.model.fit(X_scaled, np.array(y))
-            self.save()
+        X = self.encoder.encode_jobs(training_data)
+        y = np.array([record.get('salary_max', 100000) for record in training_data], dtype=np.float64)
+        self.fit_arrays(X, y)
+        self.version = self.save() or datetime.utcnow().strftime("%Y%m%d%H%M%S%f")
+    
+    def fit_arrays(self, X: np.ndarray, y: np.ndarray) -> None:
+        """Fit the scaler and a fresh forest on a feature matrix"""
+        # Replaces both, so a loaded version's training artifacts are never read
+        self._training_source = None
+        self.scaler = StandardScaler()
+        X_scaled = self.scaler.fit_transform(X)
+        self.model = RandomForestRegressor(
+            n_estimators=settings.training_trees,
+            random_state=42,
+            n_jobs=settings.training_n_jobs
+        )
+        self.model.fit(X_scaled, y)
+        self.forest = CompiledForest.from_sklearn(self.model, self.scaler)
+        self.training_samples = len(y)
+    
+    def update_arrays(self, X: np.ndarray, y: np.ndarray, replay: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> None:
+        """
+        Grow the fitted forest with trees trained on changed rows, mixed with
+        ``replay`` rows already fitted so the new trees see the whole
+        distribution rather than one small batch. Trees are added in
+        proportion to the changed rows' share of the data (at least
+        ``training_trees_per_update``). The scaler stays fixed so the
+        existing trees keep seeing the inputs they were fitted on.
+        """
+        added = max(
+            settings.training_trees_per_update,
+            round(len(self.model.estimators_) * len(y) / max(1, self.training_samples))
+        )
+        if replay is not None and len(replay[1]):
+            X, y_fit = np.vstack([X, replay[0]]), np.concatenate([y, replay[1]])
+        else:
+            y_fit = y
+        self.model.set_params(
+            warm_start=True,
+            n_estimators=len(self.model.estimators_) + added,
+            n_jobs=settings.training_n_jobs
+        )
+        self.model.fit(self.scaler.transform(X), y_fit)
+        self.model.set_params(warm_start=False)
+        self.forest = CompiledForest.from_sklearn(self.model, self.scaler)
+        self.training_samples += len(y)
+    
+    def train_from_db(self, db, incremental: bool = True, chunk_size: Optional[int] = None) -> Dict:
+        """
+        Train on every stored job with a salary, streaming the table.
+        
+        With ``incremental`` and a loaded model, only rows updated since the
+        model's ``trained_through`` watermark are read and fitted as extra
+        trees, together with a random sample of older rows. Fewer changed
+        rows than ``training_min_update_fraction`` of the data are
+        ``deferred``: the watermark stays put so they are picked up with the
+        next batch. A full retrain runs when there is no model yet, the
+        forest has reached ``training_max_trees``, or more than
+        ``training_max_update_fraction`` changed, since rows that were
+        updated rather than added still sit in the old trees with their
+        previous salary.
+        """
+        import time
+        
+        start = time.perf_counter()
+        until = datetime.utcnow()
+        grow = (
+            incremental and self.model is not None and self.trained_through is not None
+            and len(self.model.estimators_) + settings.training_trees_per_update <= settings.training_max_trees
+        )
+        mode = 'incremental' if grow else 'full'
+        X, y = self.training_matrix(db, since=self.trained_through if grow else None, until=until, chunk_size=chunk_size)
+        replay = None
+        
+        if grow and len(y):
+            share = len(y) / max(1, self.training_samples)
+            if share < settings.training_min_update_fraction:
+                mode = 'deferred'
+            elif share > settings.training_max_update_fraction:
+                mode = 'full'
+                X, y = self.training_matrix(db, until=until, chunk_size=chunk_size)
+            else:
+                replay = self.training_matrix(
+                    db, until=self.trained_through, chunk_size=chunk_size,
+                    sample=round(len(y) * settings.training_replay_ratio)
+                )
+        built = time.perf_counter()
+        
+        if not len(y):
+            mode = 'skipped'
+        elif mode == 'incremental':
+            self.update_arrays(X, y, replay)
+        elif mode == 'full':
+            self.fit_arrays(X, y)
+        
+        if mode in ('full', 'incremental'):
+            self.trained_through = until
+            self.version = self.save() or until.strftime("%Y%m%d%H%M%S%f")
+        
+        return {
+            'mode': mode,
+            'rows': len(y),
+            'replayed_rows': len(replay[1]) if replay is not None else 0,
+            'training_samples': self.training_samples,
+            'trees': len(self.model.estimators_) if self.model is not None else 0,
+            'matrix_bytes': X.nbytes + y.nbytes,
+            'build_seconds': built - start,
+            'fit_seconds': time.perf_counter() - built,
+            'model_version': self.version
+        }
+    
+    def training_matrix(
+        self,
+        db,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        chunk_size: Optional[int] = None,
+        sample: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Build ``(X, y)`` for jobs with a salary, optionally limited to rows
+        updated in ``(since, until]`` and to a random ``sample`` of them.
+        
+        Rows are streamed ``chunk_size`` at a time with only the needed
+        columns, straight into arrays sized from a count query, so memory is
+        the final matrix plus one chunk.
+        """
+        from sqlalchemy import func, select
+        from backend.models.database import JobListing, job_listing_skills
+        
+        conditions = [JobListing.salary_max.isnot(None)]
+        if since is not None:
+            conditions.append(JobListing.updated_at > since)
+        if until is not None:
+            conditions.append(JobListing.updated_at <= until)
+        
+        total = db.execute(select(func.count()).select_from(JobListing).where(*conditions)).scalar()
+        if sample is not None:
+            total = min(total, sample)
+        X = np.empty((total, len(self.feature_names)), dtype=np.float64)
+        y = np.empty(total, dtype=np.float64)
+        if not total:
+            return X, y
+        
+        skill_count = (
+            select(func.count())
+            .where(job_listing_skills.c.job_id == JobListing.id)
+            .correlate(JobListing)
+            .scalar_subquery()
+        )
+        statement = (
+            select(
+                JobListing.experience_level,
+                skill_count,
+                JobListing.remote_type,
+                JobListing.company,
+                JobListing.location,
+                JobListing.salary_max
+            )
+            .where(*conditions)
+            .order_by(func.random() if sample is not None else JobListing.id)
+            .execution_options(yield_per=chunk_size or settings.training_chunk_size)
+        )
+        if sample is not None:
+            statement = statement.limit(total)
+        
+        filled = 0
+        for rows in db.execute(statement).partitions():
+            # Rows committed after the count query can't be placed
+            rows = rows[:total - filled]
+            if not rows:
+                break
+            levels, skills, remote, company, location, salary = zip(*rows)
+            X[filled:filled + len(rows)] = self.encoder.encode(levels, skills, remote, company, location)
+            y[filled:filled + len(rows)] = salary
+            filled += len(rows)
+        
+        return X[:filled], y[:filled]
     
     def predict(self, job_data: Dict) -> Tuple[float, float]:
         """Predict salary range for a job"""
-        if self.model is None:
+        if self.forest is None:
             return self._baseline_salary(job_data), self._baseline_salary(job_data) * 1.2
         
-        features = [
-            self._encode_experience(job_data.get('experience_level', 'mid')),
-            len(job_data.get('skills_required', [])),
-            1.15 if job_data.get('remote_type') == 'fully-remote' else 1.0,
-            self._company_tier_score(job_data.get('company', '')),
-            self._location_tier_score(job_data.get('location', ''))
-        ]
-        
-        X_scaled = self.scaler.transform(np.array([features]))
-        predicted_max = self.model.predict(X_scaled)[0]
+        predicted_max = self.forest.predict_one(self.encoder.encode_jobs([job_data])[0])
         predicted_min = predicted_max * 0.85
         
         return max(40000, predicted_min), max(60000, predicted_max)
     
-    @staticmethod
-    def _encode_experience(level: str) -> float:
-        """Encode experience level to numeric value"""
-        mapping = {'entry': 0.3, 'mid': 0.6, 'senior': 0.9, 'lead': 1.0}
-        return mapping.get(level.lower(), 0.6)
-    
-    @staticmethod
-    def _company_tier_score(company: str) -> float:
-        """Score company tier (FAANG, enterprise, startup, etc)"""
-        faang = {'google', 'amazon', 'apple', 'facebook', 'meta', 'microsoft', 'netflix', 'tesla'}
-        if any(f in company.lower() for f in faang):
-            return 0.95
-        if any(x in company.lower() for x in ['inc', 'corp', 'llc', 'inc.']):
-            return 0.7
-        return 0.5
-    
-    @staticmethod
-    def _location_tier_score(location: str) -> float:
-        """Score location tier for salary"""
-        tier1 = {'san francisco', 'new york', 'seattle', 'boston', 'los angeles'}
-        tier2 = {'chicago', 'denver', 'austin', 'atlanta', 'miami'}
-        
-        loc_lower = location.lower()
-        if any(t in loc_lower for t in tier1):
-            return 1.0
-        if any(t in loc_lower for t in tier2):
-            return 0.8
-        return 0.6
+    def predict_batch(self, jobs: List[Dict]) -> List[Tuple[float, float]]:
+        """
+        Predict salary ranges for many jobs with one feature matrix and a
+        single model call. Each result equals ``predict`` for that job.
+        """
+        if not jobs:
+            return []
+        if self.forest is None:
+            return [(self._baseline_salary(job), self._baseline_salary(job) * 1.2) for job in jobs]
+        
+        predicted_max = self.forest.predict(self.encoder.encode_jobs(jobs))
+        predicted_min = predicted_max * 0.85
+        
+        return [
+            (max(40000, low), max(60000, high))
+            for low, high in zip(predicted_min, predicted_max)
+        ]
     
     @staticmethod
     def _baseline_salary(job_data: Dict) -> float:
@@ -122,19 +298,67 @@ class SalaryPredictionModel:
         
         return base
     
-    def save(self) -> None:
-        """Save model to disk"""
-        if self.model:
-            pickle.dump(self.model, open(f"{self.models_dir}/salary_model.pkl", "wb"))
-            pickle.dump(self.scaler, open(f"{self.models_dir}/salary_scaler.pkl", "wb"))
+    def save(self) -> Optional[str]:
+        """Publish the trained model as a new registry version, returning it"""
+        if self.model is None:
+            return None
+        return self.registry.publish(
+            self.REGISTRY_NAME,
+            {'model': self.model, 'scaler': self.scaler, 'forest': self.forest.to_arrays()},
+            metadata={
+                'model_class': type(self.model).__name__,
+                'feature_names': self.feature_names,
+                'feature_vocabulary': self.encoder.vocabulary,
+                'training_samples': self.training_samples,
+                'trained_through': self.trained_through.isoformat() if self.trained_through else None
+            }
+        )
     
-    def load(self) -> None:
-        """Load model from disk"""
+    def load(self, version: Optional[str] = None, registry=None) -> bool:
+        """
+        Load a registry version (the latest by default) for serving; False
+        if none is published. Only the compiled forest is read here.
+        """
+        from backend.models.registry import ModelNotFoundError
+        
+        registry = registry or self.registry
         try:
-            self.model = pickle.load(open(f"{self.models_dir}/salary_model.pkl", "rb"))
-            self.scaler = pickle.load(open(f"{self.models_dir}/salary_scaler.pkl", "rb"))
-        except FileNotFoundError:
-            pass
+            metadata = registry.metadata(self.REGISTRY_NAME, version)
+            if 'forest' in metadata['artifacts']:
+                artifacts, _ = registry.load(self.REGISTRY_NAME, metadata['version'], only=['forest'])
+                self.forest = CompiledForest.from_arrays(artifacts['forest'])
+                self._model = None
+                self._training_source = (registry, metadata['version'])
+            else:
+                # Published before forests were compiled at training time
+                artifacts, _ = registry.load(self.REGISTRY_NAME, metadata['version'])
+                self._training_source = None
+                self._model, self._scaler = artifacts['model'], artifacts['scaler']
+                self.forest = CompiledForest.from_sklearn(self._model, self._scaler)
+        except ModelNotFoundError:
+            return False
+        self.version = metadata['version']
+        # Serve with the vocabulary the version was trained on
+        self.encoder = SalaryFeatureEncoder(metadata.get('feature_vocabulary'))
+        self.training_samples = metadata.get('training_samples', 0)
+        trained_through = metadata.get('trained_through')
+        self.trained_through = datetime.fromisoformat(trained_through) if trained_through else None
+        return True
+
+
+# Profile used when a request carries no user preferences, and for the
+# match_score precomputed at ingest time
+DEFAULT_USER_PREFERENCES = {
+    'experience_level': 'mid',
+    'skills': [],
+    'salary_min': 60000,
+    'location': '',
+    'remote_preference': 'any'
+}
+
+
+# Salary assumed for a job posted without one, by every scoring path
+DEFAULT_SALARY_MAX = 100000
 
 
 class JobRecommendationModel:
@@ -142,23 +366,25 @@ class JobRecommendationModel:
     
     def __init__(self):
         self.model = None
-        self.models_dir = "backend/models/saved"
+        self.models_dir = settings.models_dir
         self._ensure_models_dir()
     
     def _ensure_models_dir(self):
         """Ensure models directory exists"""
         os.makedirs(self.models_dir, exist_ok=True)
     
+    MATCH_WEIGHTS = {
+        'experience_match': 0.25,
+        'skills_match': 0.30,
+        'salary_match': 0.20,
+        'location_match': 0.15,
+        'remote_match': 0.10
+    }
+    
     def calculate_match_score(self, job: Dict, user_prefs: Dict) -> float:
         """Calculate job match score for user preferences"""
         score = 0.0
-        weights = {
-            'experience_match': 0.25,
-            'skills_match': 0.30,
-            'salary_match': 0.20,
-            'location_match': 0.15,
-            'remote_match': 0.10
-        }
+        weights = self.MATCH_WEIGHTS
         
         # Experience match
         user_exp = user_prefs.get('experience_level', 'mid')
@@ -177,7 +403,7 @@ class JobRecommendationModel:
         
         # Salary match
         user_sal_min = user_prefs.get('salary_min', 50000)
-        job_sal_max = job.get('salary_max', 150000)
+        job_sal_max = job.get('salary_max') or DEFAULT_SALARY_MAX
         sal_match = 1.0 if job_sal_max >= user_sal_min else (job_sal_max / user_sal_min)
         score += sal_match * weights['salary_match']
         
@@ -195,37 +421,166 @@ class JobRecommendationModel:
         
         return min(1.0, max(0.0, score))
     
+    def score_candidates(self, candidates: 'JobCandidates', user_prefs: Dict) -> np.ndarray:
+        """
+        Match scores for every candidate in one vectorized pass.
+        
+        Mirrors ``calculate_match_score`` term by term (same weights, same
+        order of additions), so each score equals the single-job result.
+        """
+        weights = self.MATCH_WEIGHTS
+        n = len(candidates)
+        score = np.zeros(n)
+        
+        # Experience match
+        user_exp = user_prefs.get('experience_level', 'mid')
+        exp_match = np.where(candidates.experience_levels == user_exp, 1.0, 0.6)
+        score += exp_match * weights['experience_match']
+        
+        # Skills match: Jaccard over the sparse job x skill matrix
+        user_skills = set(s.lower() for s in user_prefs.get('skills', []))
+        job_skill_counts = np.diff(candidates.skill_indptr)
+        if user_skills:
+            user_columns = [candidates.skill_columns[s] for s in user_skills if s in candidates.skill_columns]
+            hits = np.isin(candidates.skill_indices, user_columns)
+            intersection = np.bincount(candidates.skill_rows[hits], minlength=n)
+            union = len(user_skills) + job_skill_counts - intersection
+            skills_match = np.where(job_skill_counts > 0, intersection / np.maximum(union, 1), 0.5)
+        else:
+            skills_match = np.full(n, 0.5)
+        score += skills_match * weights['skills_match']
+        
+        # Salary match
+        user_sal_min = user_prefs.get('salary_min', 50000)
+        salary = candidates.salary_max
+        sal_match = np.where(salary >= user_sal_min, 1.0, salary / (user_sal_min or 1))
+        score += sal_match * weights['salary_match']
+        
+        # Location match, evaluated once per distinct location
+        user_loc = user_prefs.get('location', '').lower()
+        loc_values = np.array([1.0 if user_loc in loc.lower() else 0.3 for loc in candidates.location_values])
+        score += loc_values[candidates.location_codes] * weights['location_match']
+        
+        # Remote match, evaluated once per distinct remote type
+        user_remote = user_prefs.get('remote_preference', 'any')
+        remote_values = np.array([
+            1.0 if user_remote == 'any' or user_remote in remote else 0.3
+            for remote in candidates.remote_values
+        ])
+        score += remote_values[candidates.remote_codes] * weights['remote_match']
+        
+        return np.clip(score, 0.0, 1.0)
+    
+    def rank_jobs(self, candidates: 'JobCandidates', user_prefs: Dict, k: int = 20) -> List[Tuple[str, float]]:
+        """Top-k (job_id, match_score) pairs, best first, via a partial sort"""
+        if len(candidates) == 0 or k <= 0:
+            return []
+        scores = self.score_candidates(candidates, user_prefs)
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.lexsort((top, -scores[top]))]
+        return [(candidates.ids[i], float(scores[i])) for i in top]
+    
+    COMPANY_GROWTH = {
+        'startup': 0.9,
+        'growth-stage': 0.8,
+        'scale-up': 0.7,
+        'enterprise': 0.5
+    }
+    GROWTH_SKILLS = {'AI', 'ML', 'cloud', 'kubernetes', 'aws', 'python', 'go', 'rust'}
+    EXPERIENCE_GROWTH = {'entry': 0.4, 'mid': 0.7, 'senior': 0.9, 'lead': 0.95}
+    
     def calculate_growth_potential(self, job: Dict) -> float:
         """Calculate career growth potential score"""
         score = 0.0
         
         # Company growth potential
-        company_growth = {
-            'startup': 0.9,
-            'growth-stage': 0.8,
-            'scale-up': 0.7,
-            'enterprise': 0.5
-        }
         company_type = job.get('company_type', 'growth-stage')
-        score += company_growth.get(company_type, 0.6) * 0.3
+        score += self.COMPANY_GROWTH.get(company_type, 0.6) * 0.3
         
         # Skill development potential (based on required skills)
         skills_count = len(job.get('skills_required', []))
-        growth_skills = {'AI', 'ML', 'cloud', 'kubernetes', 'aws', 'python', 'go', 'rust'}
-        growth_skill_count = len(set(s.lower() for s in job.get('skills_required', [])) & growth_skills)
+        growth_skill_count = len(set(s.lower() for s in job.get('skills_required', [])) & self.GROWTH_SKILLS)
         score += (growth_skill_count / max(skills_count, 1) * 0.4) * 0.4
         
         # Career level advancement
         exp_level = job.get('experience_level', 'mid')
-        exp_growth = {'entry': 0.4, 'mid': 0.7, 'senior': 0.9, 'lead': 0.95}
-        score += exp_growth.get(exp_level, 0.7) * 0.3
+        score += self.EXPERIENCE_GROWTH.get(exp_level, 0.7) * 0.3
         
         return min(1.0, score)
+    
+    def growth_potential_batch(self, candidates: 'JobCandidates') -> np.ndarray:
+        """``calculate_growth_potential`` for every candidate in one vectorized pass"""
+        n = len(candidates)
+        score = np.zeros(n)
+        
+        company_growth = np.array([self.COMPANY_GROWTH.get(t, 0.6) for t in candidates.company_type_values])
+        score += company_growth[candidates.company_type_codes] * 0.3
+        
+        growth_columns = [col for name, col in candidates.skill_columns.items() if name in self.GROWTH_SKILLS]
+        hits = np.isin(candidates.skill_indices, growth_columns)
+        growth_skill_count = np.bincount(candidates.skill_rows[hits], minlength=n)
+        score += (growth_skill_count / np.maximum(candidates.skill_counts, 1) * 0.4) * 0.4
+        
+        exp_growth = np.array([self.EXPERIENCE_GROWTH.get(level, 0.7) for level in candidates.experience_levels])
+        score += exp_growth * 0.3
+        
+        return np.minimum(1.0, score)
+
+
+class JobCandidates:
+    """
+    Columnar view of jobs for vectorized scoring.
+    
+    Skills are stored as a CSR sparse matrix (``skill_indptr`` /
+    ``skill_indices`` over ``skill_columns``); locations and remote types are
+    dictionary-encoded so string predicates run once per distinct value.
+    """
+    
+    def __init__(self, jobs: List[Dict]):
+        n = len(jobs)
+        self.ids = np.array([job['id'] for job in jobs], dtype=object)
+        self.experience_levels = np.array([job.get('experience_level', 'mid') for job in jobs], dtype=object)
+        self.salary_max = np.array([job.get('salary_max') or DEFAULT_SALARY_MAX for job in jobs], dtype=float)
+        
+        self.location_values, self.location_codes = self._encode([job.get('location') or '' for job in jobs])
+        self.remote_values, self.remote_codes = self._encode([job.get('remote_type') or 'on-site' for job in jobs])
+        self.company_type_values, self.company_type_codes = self._encode(
+            [job.get('company_type', 'growth-stage') for job in jobs]
+        )
+        self.skill_counts = np.array([len(job.get('skills_required', [])) for job in jobs], dtype=np.int64)
+        
+        self.skill_columns: Dict[str, int] = {}
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        indices = []
+        for row, job in enumerate(jobs):
+            names = {s.lower() for s in job.get('skills_required', [])}
+            for name in names:
+                indices.append(self.skill_columns.setdefault(name, len(self.skill_columns)))
+            indptr[row + 1] = indptr[row] + len(names)
+        self.skill_indptr = indptr
+        self.skill_indices = np.array(indices, dtype=np.int64)
+        self.skill_rows = np.repeat(np.arange(n), np.diff(indptr))
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    @staticmethod
+    def _encode(values: List[str]) -> Tuple[List[str], np.ndarray]:
+        """Dictionary-encode strings into (distinct values, integer codes)"""
+        lookup: Dict[str, int] = {}
+        codes = np.array([lookup.setdefault(v, len(lookup)) for v in values], dtype=np.int64)
+        return list(lookup), codes
 
 
 class SkillTrendModel:
     """Analyze skill trends and demand"""
     
+    @staticmethod
+    def trend_direction(frequency: float) -> str:
+        """Trend label for the share of jobs that require a skill"""
+        return 'up' if frequency > 0.15 else 'down' if frequency < 0.05 else 'stable'
+    
     @staticmethod
     def calculate_skill_score(skill: str, job_market_data: List[Dict]) -> Dict:
         """Calculate demand and trend for a skill"""
@@ -245,11 +600,9 @@ class SkillTrendModel:
         frequency = occurrences / len(job_market_data)
         avg_salary_impact = np.mean(salary_impacts) if salary_impacts else 0
         
-        trend = 'up' if frequency > 0.15 else 'down' if frequency < 0.05 else 'stable'
-        
         return {
             'frequency': frequency,
-            'trend': trend,
+            'trend': SkillTrendModel.trend_direction(frequency),
             'avg_salary_impact': avg_salary_impact,
             'count': occurrences
         }
@@ -0,0 +1,196 @@
+"""
+Versioned on-disk model registry and hot-swappable model handles
+"""
+import asyncio
+import json
+import os
+import shutil
+import threading
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import joblib
+from backend.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+LATEST = "LATEST"
+METADATA = "metadata.json"
+
+
+class ModelNotFoundError(LookupError):
+    """Raised when a model or version has not been published"""
+
+
+class ModelRegistry:
+    """
+    Models stored as ``<root>/<name>/<version>/`` directories, one uncompressed
+    joblib file per artifact plus ``metadata.json``, and a ``LATEST`` file
+    naming the current version.
+    
+    Version directories are written under a temporary name and renamed into
+    place, and ``LATEST`` is replaced with ``os.replace``, so readers only
+    ever see complete versions. Artifacts load with ``mmap_mode='r'``:
+    numpy arrays are mapped read-only from the page cache and shared by every
+    worker process that loads the same version.
+    """
+    
+    def __init__(self, root: Optional[str] = None, keep: Optional[int] = None):
+        self.root = root or settings.models_dir
+        self.keep = keep or settings.models_keep_versions
+    
+    def _path(self, name: str, *parts: str) -> str:
+        return os.path.join(self.root, name, *parts)
+    
+    def publish(
+        self,
+        name: str,
+        artifacts: Dict[str, Any],
+        metadata: Optional[Dict] = None,
+        version: Optional[str] = None
+    ) -> str:
+        """Write a new version and point ``LATEST`` at it"""
+        version = version or f"{datetime.utcnow():%Y%m%d%H%M%S%f}-{uuid.uuid4().hex[:6]}"
+        os.makedirs(self._path(name), exist_ok=True)
+        staging = self._path(name, f".tmp-{version}")
+        os.makedirs(staging)
+        try:
+            for artifact, value in artifacts.items():
+                joblib.dump(value, os.path.join(staging, f"{artifact}.joblib"))
+            with open(os.path.join(staging, METADATA), "w") as f:
+                json.dump({
+                    'name': name,
+                    'version': version,
+                    'created_at': datetime.utcnow().isoformat(),
+                    'artifacts': sorted(artifacts),
+                    **(metadata or {})
+                }, f, indent=2, default=str)
+            os.rename(staging, self._path(name, version))
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        
+        pointer = self._path(name, f".{LATEST}-{version}")
+        with open(pointer, "w") as f:
+            f.write(version)
+        os.replace(pointer, self._path(name, LATEST))
+        
+        logger.info(f"Published {name} model version {version}")
+        self.prune(name)
+        return version
+    
+    def latest_version(self, name: str) -> Optional[str]:
+        try:
+            with open(self._path(name, LATEST)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+    
+    def versions(self, name: str) -> List[str]:
+        """Published versions, oldest first"""
+        try:
+            entries = os.listdir(self._path(name))
+        except FileNotFoundError:
+            return []
+        return sorted(e for e in entries if not e.startswith('.') and e != LATEST)
+    
+    def metadata(self, name: str, version: Optional[str] = None) -> Dict:
+        version = version or self.latest_version(name)
+        if version is None:
+            raise ModelNotFoundError(f"No {name} model has been published")
+        try:
+            with open(self._path(name, version, METADATA)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise ModelNotFoundError(f"{name} model version {version} not found") from None
+    
+    def load(
+        self,
+        name: str,
+        version: Optional[str] = None,
+        mmap_mode: Optional[str] = 'r',
+        only: Optional[List[str]] = None
+    ) -> Tuple[Dict[str, Any], Dict]:
+        """(artifacts, metadata) of a version, the latest by default; ``only`` limits which artifacts are read"""
+        metadata = self.metadata(name, version)
+        directory = self._path(name, metadata['version'])
+        artifacts = {
+            artifact: joblib.load(os.path.join(directory, f"{artifact}.joblib"), mmap_mode=mmap_mode)
+            for artifact in metadata['artifacts']
+            if only is None or artifact in only
+        }
+        return artifacts, metadata
+    
+    def prune(self, name: str) -> List[str]:
+        """Delete all but the newest ``keep`` versions (never the latest)"""
+        latest = self.latest_version(name)
+        stale = [v for v in self.versions(name)[:-self.keep] if v != latest]
+        for version in stale:
+            # Workers still mapping these files keep their pages until they swap
+            shutil.rmtree(self._path(name, version), ignore_errors=True)
+        return stale
+
+
+class ModelHandle:
+    """
+    The model instance currently serving predictions for one registry name.
+    
+    Request handlers read ``handle.current`` once and use that object; a
+    refresh builds and loads the new version off to the side and then
+    rebinds ``current`` in a single assignment, so the predict path takes no
+    lock and in-flight requests finish on the version they started with.
+    """
+    
+    def __init__(self, name: str, factory: Callable[[], Any], registry: Optional[ModelRegistry] = None):
+        self.name = name
+        self.factory = factory
+        self._registry = registry
+        self._current = None
+        self._refresh_lock = threading.Lock()
+    
+    @property
+    def registry(self) -> ModelRegistry:
+        if self._registry is None:
+            self._registry = ModelRegistry()
+        return self._registry
+    
+    @property
+    def current(self):
+        model = self._current
+        if model is None:
+            # Not preloaded (scripts, tests): serve the model's untrained fallback
+            model = self._current = self.factory()
+        return model
+    
+    def refresh(self) -> bool:
+        """Swap in the registry's latest version if it differs from the served one"""
+        with self._refresh_lock:
+            latest = self.registry.latest_version(self.name)
+            current = self._current
+            if latest is None or (current is not None and current.version == latest):
+                return False
+            model = self.factory()
+            model.load(version=latest, registry=self.registry)
+            self._current = model
+            logger.info(f"Serving {self.name} model version {latest}")
+            return True
+    
+    async def watch(self, interval: Optional[float] = None) -> None:
+        """Poll the registry and hot-swap new versions until cancelled"""
+        interval = interval or settings.models_reload_interval
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await loop.run_in_executor(None, self.refresh)
+            except Exception as e:
+                logger.error(f"Error reloading {self.name} model: {e}")
+
+
+def _salary_model():
+    from backend.models.ml_models import SalaryPredictionModel
+    return SalaryPredictionModel()
+
+
+salary_models = ModelHandle('salary', _salary_model)
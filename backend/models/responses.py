@@ -25,10 +25,11 @@ class ErrorResponse(BaseModel):
 class PaginatedResponse(BaseModel):
     """Paginated response wrapper"""
     data: List[Any]
-    total: int
-    page: int
+    total: Optional[int] = None
+    page: Optional[int] = None
     page_size: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None  # opaque keyset cursor; None on the last page
 
 
 class MetricsResponse(BaseModel):
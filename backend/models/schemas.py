@@ -2,7 +2,7 @@
 Pydantic schemas for API validation and serialization
 """
 from datetime import datetime
-from typing import Optional, List
+from typing import Literal, Optional, List
 from pydantic import BaseModel, Field
 
 
@@ -11,7 +11,7 @@ class JobListingBase(BaseModel):
     title: str
     company: str
     location: str
-    job_url: str
+    job_url: Optional[str] = None  # some sources publish postings without a link
     description: str
     salary_min: Optional[float] = None
     salary_max: Optional[float] = None
@@ -84,6 +84,7 @@ class JobSearchQuery(BaseModel):
     location: Optional[str] = None
     remote_type: Optional[str] = None
     skills: Optional[List[str]] = None
+    skills_match: Literal['any', 'all'] = 'any'
     limit: int = Field(default=20, le=100)
     offset: int = Field(default=0)
 
@@ -102,3 +103,15 @@ class MLPredictionResponse(BaseModel):
     growth_potential: float
     recommendation: str
     confidence: float
+
+
+class JobRankingRequest(BaseModel):
+    """Request to rank all jobs against user preferences"""
+    user_preferences: Optional[dict] = None
+    k: int = Field(default=20, ge=1, le=100)
+
+
+class SalaryPredictionBatchRequest(BaseModel):
+    """Predict salaries for stored jobs and/or raw job payloads"""
+    job_ids: List[str] = Field(default_factory=list, max_length=1000)
+    jobs: List[dict] = Field(default_factory=list, max_length=1000)
@@ -3,14 +3,40 @@ Data pipeline for scraping and processing job listings
 """
 import json
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from itertools import islice
+from queue import Queue, Empty, Full
+from typing import Callable, Iterable, Iterator, List, Dict, Optional
+from urllib.parse import urlparse
 import requests
 from bs4 import BeautifulSoup
+from backend.config import settings
+from backend.pipelines.dedup import NearDuplicateDetector
+from backend.utils.bloom import KnownJobsIndex
+from backend.pipelines.enrichment import JobEnricher
+from backend.pipelines.skills import get_skill_matcher
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Per-host request caps shared by every scraper in the process
+_host_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+_host_semaphores_lock = threading.Lock()
+
+
+def _host_semaphore(url: str) -> threading.BoundedSemaphore:
+    """Get the semaphore limiting concurrent requests to a URL's host"""
+    host = urlparse(url).netloc
+    with _host_semaphores_lock:
+        semaphore = _host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = threading.BoundedSemaphore(settings.scrape_max_per_host)
+            _host_semaphores[host] = semaphore
+    return semaphore
+
 
 class JobScraperBase:
     """Base class for job scrapers"""
@@ -24,6 +50,15 @@ class JobScraperBase:
     def scrape(self) -> List[Dict]:
         """Scrape jobs - to be implemented by subclasses"""
         raise NotImplementedError
+    
+    def iter_jobs(self) -> Iterator[Dict]:
+        """Yield jobs one at a time; streaming scrapers override this"""
+        yield from self.scrape()
+    
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """HTTP GET honouring the per-host concurrency cap"""
+        with _host_semaphore(url):
+            return self.session.get(url, **kwargs)
 
 
 class RemoteJobsScraperAPI(JobScraperBase):
@@ -36,9 +71,12 @@ class RemoteJobsScraperAPI(JobScraperBase):
     
     def scrape(self) -> List[Dict]:
         """Scrape remote jobs from RemoteOK API"""
-        jobs = []
+        return list(self.iter_jobs())
+    
+    def iter_jobs(self) -> Iterator[Dict]:
+        """Yield parsed RemoteOK jobs as they are read from the response"""
         try:
-            response = self.session.get(self.api_url, params={'search': 'python'}, timeout=10)
+            response = self.get(self.api_url, params={'search': 'python'}, timeout=10)
             response.raise_for_status()
             
             data = response.json()
@@ -47,11 +85,9 @@ class RemoteJobsScraperAPI(JobScraperBase):
                 if isinstance(item, dict) and 'job_title' in item:
                     job = self._parse_job(item)
                     if job:
-                        jobs.append(job)
+                        yield job
         except Exception as e:
             logger.error(f"Error scraping RemoteOK: {e}")
-        
-        return jobs
     
     @staticmethod
     def _parse_job(item: Dict) -> Optional[Dict]:
@@ -67,8 +103,7 @@ class RemoteJobsScraperAPI(JobScraperBase):
                 if len(salary_parts) >= 2:
                     salary_min = int(salary_parts[1])
             
-            skills = re.findall(r'\b(python|javascript|java|go|rust|c\+\+|react|vue|angular|aws|gcp|azure|kubernetes|docker|sql|postgresql|mongodb)\b', 
-                               item.get('job_description', '').lower())
+            skills = get_skill_matcher().extract(item.get('job_description', ''))
             
             return {
                 'id': f"remoteok_{item.get('id')}",
@@ -82,7 +117,7 @@ class RemoteJobsScraperAPI(JobScraperBase):
                 'job_type': 'full-time',
                 'experience_level': 'mid',
                 'remote_type': 'fully-remote',
-                'skills_required': list(set(skills)),
+                'skills_required': skills,
                 'posted_date': datetime.utcnow(),
                 'source': 'remoteok'
             }
@@ -102,9 +137,18 @@ class LinkedInScraperSimulation(JobScraperBase):
         """Generate realistic job data for demonstration"""
         return self._generate_sample_jobs()
     
+    def iter_jobs(self) -> Iterator[Dict]:
+        """Yield sample jobs one at a time"""
+        return self._iter_sample_jobs()
+    
     @staticmethod
     def _generate_sample_jobs() -> List[Dict]:
         """Generate sample job data"""
+        return list(LinkedInScraperSimulation._iter_sample_jobs())
+    
+    @staticmethod
+    def _iter_sample_jobs() -> Iterator[Dict]:
+        """Lazily generate sample job data"""
         companies = ['Google', 'Amazon', 'Microsoft', 'Apple', 'Meta', 'Netflix', 'Stripe', 'Figma', 'Notion', 'GitLab']
         locations = ['San Francisco, CA', 'New York, NY', 'Seattle, WA', 'Austin, TX', 'Denver, CO', 'Remote']
         titles = [
@@ -118,7 +162,6 @@ class LinkedInScraperSimulation(JobScraperBase):
             'ML Operations Engineer'
         ]
         
-        jobs = []
         for i, (company, title) in enumerate([(companies[i % len(companies)], titles[i % len(titles)]) for i in range(30)]):
             location = locations[i % len(locations)]
             skills = ['Python', 'SQL', 'AWS', 'Spark', 'Kubernetes', 'TensorFlow', 'PyTorch', 'Airflow']
@@ -140,9 +183,7 @@ class LinkedInScraperSimulation(JobScraperBase):
                 'source': 'linkedin',
                 'company_type': ['startup', 'scale-up', 'enterprise'][i % 3]
             }
-            jobs.append(job)
-        
-        return jobs
+            yield job
 
 
 class DataProcessor:
@@ -151,7 +192,7 @@ class DataProcessor:
     @staticmethod
     def clean_job_data(job: Dict) -> Dict:
         """Clean and normalize job data"""
-        job['skills_required'] = list(set([s.lower().strip() for s in job.get('skills_required', [])]))
+        job['skills_required'] = get_skill_matcher().normalize(job.get('skills_required', []))
         job['title'] = job.get('title', '').strip()
         job['company'] = job.get('company', '').strip()
         job['location'] = job.get('location', '').strip()
@@ -179,20 +220,26 @@ class DataProcessor:
     @staticmethod
     def extract_skills(description: str) -> List[str]:
         """Extract skills from job description"""
-        common_skills = {
-            'python', 'java', 'javascript', 'go', 'rust', 'c++', 'sql',
-            'aws', 'gcp', 'azure', 'kubernetes', 'docker', 'terraform',
-            'spark', 'hadoop', 'kafka', 'flink',
-            'tensorflow', 'pytorch', 'scikit-learn', 'pandas', 'numpy',
-            'react', 'vue', 'angular', 'node.js', 'django', 'flask',
-            'postgresql', 'mongodb', 'redis', 'elasticsearch',
-            'git', 'ci/cd', 'jenkins', 'gitlab', 'github',
-            'agile', 'scrum', 'jira'
-        }
-        
-        description_lower = description.lower()
-        found_skills = [skill for skill in common_skills if skill in description_lower]
-        return list(set(found_skills))
+        return get_skill_matcher().extract(description)
+    
+    def process(self, jobs: Iterable[Dict]) -> Iterator[Dict]:
+        """Lazily clean jobs and fill in missing skills"""
+        for job in jobs:
+            try:
+                # Clean data
+                job = self.clean_job_data(job)
+                
+                # Extract additional skills if not provided
+                if not job.get('skills_required'):
+                    job['skills_required'] = self.extract_skills(job.get('description', ''))
+                
+                yield job
+            except Exception as e:
+                logger.error(f"Error processing job: {e}")
+
+
+# Marks the end of one source's stream on the fan-out queue
+_SOURCE_DONE = object()
 
 
 class DataPipeline:
@@ -203,34 +250,288 @@ class DataPipeline:
             LinkedInScraperSimulation(),  # Using simulation for demo
         ]
         self.processor = DataProcessor()
+        self.enricher = JobEnricher()
+        self.deduplicator = NearDuplicateDetector() if settings.dedup_enabled else None
+        self.known_jobs = KnownJobsIndex() if settings.bloom_enabled else None
+        self.scraped = 0  # raw jobs received from sources by the current run
     
-    def run(self) -> List[Dict]:
+    def run(self, concurrent: Optional[bool] = None) -> List[Dict]:
         """Run the complete data pipeline"""
-        all_jobs = []
+        processed_jobs = list(self.stream(concurrent))
+        logger.info(f"Processed {len(processed_jobs)} jobs")
+        return processed_jobs
+    
+    def run_into(
+        self,
+        db,
+        batch_size: Optional[int] = None,
+        concurrent: Optional[bool] = None,
+        progress: Optional[Callable[[Dict], None]] = None
+    ) -> Dict:
+        """
+        Stream the pipeline into the database in fixed-size batches.
+        
+        Only one batch is held in memory at a time; scrapers block on the
+        bounded fan-out queue while a batch is being committed, so memory
+        stays flat however many jobs the sources produce. Near-duplicates of
+        postings already stored (or earlier in the run) are dropped, and so
+        are jobs whose content hash matches the stored row, so an unchanged
+        refresh writes nothing; ML feature columns are computed for the rest
+        of each batch before it is written. Jobs the known jobs filter has
+        never seen skip the existing-row lookup and are appended directly.
+        
+        ``progress`` receives a snapshot of the totals after every batch and
+        at least every ``refresh_progress_interval`` seconds while jobs flow;
+        an exception it raises (e.g. on cancellation) stops the run, leaving
+        the batches already committed in place.
+        """
+        from backend.utils.database import DatabaseService
+        
+        batch_size = batch_size or settings.bulk_insert_chunk_size
+        totals = {
+            'scraped': 0, 'processed': 0, 'inserted': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0,
+            'duplicates': 0, 'definitely_new': 0, 'maybe_seen': 0, 'batches': 0,
+            'timings': {'scrape': 0.0, 'dedup': 0.0, 'lookup': 0.0, 'enrich': 0.0, 'write': 0.0}
+        }
+        timings = totals['timings']
+        run_started = time.perf_counter()
+        last_report = run_started
+        self.scraped = 0
+        if self.known_jobs is not None:
+            self.known_jobs.sync(db)
+        
+        def report():
+            nonlocal last_report
+            last_report = time.perf_counter()
+            totals['scraped'] = self.scraped
+            # Scraping and cleaning overlap with the sink; they get the rest of the wall time
+            timings['scrape'] = last_report - run_started - sum(
+                seconds for stage, seconds in timings.items() if stage != 'scrape'
+            )
+            if progress is not None:
+                progress({**totals, 'timings': dict(timings)})
+        
+        def write(result):
+            for key in ('inserted', 'updated', 'unchanged', 'skipped'):
+                totals[key] += result[key]
+        
+        def timed(stage, fn, *args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                timings[stage] += time.perf_counter() - started
+        
+        def flush(batch):
+            started = datetime.utcnow()
+            on_stored = None
+            if self.deduplicator is not None:
+                batch, duplicates, signatures = timed('dedup', self.deduplicator.filter, db, batch)
+                totals['duplicates'] += len(duplicates)
+                # Recorded with the rows they point at, so an unstored posting never absorbs reposts
+                on_stored = signatures.write
+            new, maybe = self.known_jobs.split(batch) if self.known_jobs is not None else ([], batch)
+            totals['definitely_new'] += len(new)
+            totals['maybe_seen'] += len(maybe)
+            changed = timed('lookup', DatabaseService.changed_jobs, db, maybe, chunk_size=batch_size)
+            totals['unchanged'] += len(maybe) - len(changed)
+            if new or changed:
+                timed('enrich', self.enricher.enrich, new + changed)
+            if new:
+                write(timed('write', DatabaseService.insert_new_jobs, db, new, chunk_size=batch_size, on_stored=on_stored))
+            if changed:
+                write(timed('write', DatabaseService.upsert_jobs, db, changed, chunk_size=batch_size, on_stored=on_stored))
+            if self.known_jobs is not None:
+                self.known_jobs.add_jobs(new + changed, created_at=started)
+            totals['batches'] += 1
+            report()
+        
+        batch = []
+        jobs = self.stream(concurrent)
+        try:
+            for job in jobs:
+                batch.append(job)
+                totals['processed'] += 1
+                if len(batch) >= batch_size:
+                    flush(batch)
+                    batch = []
+                elif time.perf_counter() - last_report >= settings.refresh_progress_interval:
+                    report()
+            if batch:
+                flush(batch)
+        finally:
+            # Stop the scrapers now rather than when the generator is collected
+            jobs.close()
+        report()
+        if self.known_jobs is not None:
+            if self.known_jobs.needs_rebuild():
+                self.known_jobs.rebuild(db)
+            else:
+                self.known_jobs.save()
+        totals['dedup_ratio'] = totals['duplicates'] / totals['processed'] if totals['processed'] else 0.0
+        
+        logger.info(
+            f"Pipeline wrote {totals['processed']} jobs in {totals['batches']} batches "
+            f"({totals['inserted']} inserted, {totals['updated']} updated, "
+            f"{totals['unchanged']} unchanged, {totals['skipped']} skipped, "
+            f"{totals['duplicates']} near-duplicates, dedup ratio {totals['dedup_ratio']:.1%}, "
+            f"{totals['definitely_new']} appended without a lookup)"
+        )
+        return totals
+    
+    def stream(self, concurrent: Optional[bool] = None) -> Iterator[Dict]:
+        """Lazily scrape, clean and yield jobs from all sources"""
+        if concurrent is None:
+            concurrent = settings.scrape_concurrency > 1
         
         # Scrape from all sources
+        if concurrent:
+            scraped = self._scrape_concurrently()
+        else:
+            scraped = self._scrape_sequentially()
+        
+        # Clean and enrich data
+        return self.processor.process(self._count_scraped(scraped))
+    
+    def _count_scraped(self, jobs: Iterable[Dict]) -> Iterator[Dict]:
+        """Pass jobs through, counting them in ``self.scraped``"""
+        for job in jobs:
+            self.scraped += 1
+            yield job
+    
+    def _source_jobs(self, scraper: JobScraperBase) -> Iterator[Dict]:
+        """Jobs from one source, capped at ``max_jobs_per_scrape``"""
+        return islice(scraper.iter_jobs(), settings.max_jobs_per_scrape)
+    
+    def _scrape_sequentially(self) -> Iterator[Dict]:
+        """Scrape each source one after another"""
         for scraper in self.scrapers:
+            count = 0
             try:
-                jobs = scraper.scrape()
-                all_jobs.extend(jobs)
-                logger.info(f"Scraped {len(jobs)} jobs from {scraper.source}")
+                for job in self._source_jobs(scraper):
+                    count += 1
+                    yield job
+                logger.info(f"Scraped {count} jobs from {scraper.source}")
             except Exception as e:
                 logger.error(f"Error in scraper: {e}")
+    
+    def _scrape_concurrently(self) -> Iterator[Dict]:
+        """
+        Fan scrapers out over a thread pool feeding a bounded queue.
         
-        # Clean and enrich data
-        processed_jobs = []
-        for job in all_jobs:
+        Each source gets ``scrape_source_timeout`` seconds from the moment it
+        starts, and the whole fan-out is capped at ``scrape_total_timeout``.
+        Time the consumer spends downstream of this generator (e.g. flushing
+        a batch) extends both, so a slow sink never costs a source its turn;
+        sources that finished scraping are never dropped. Producers check
+        their own deadline between jobs, so a slow source stops even while
+        the consumer is busy. Sources that miss their deadline are
+        abandoned; jobs they queued before that still flow downstream.
+        """
+        jobs_queue = Queue(maxsize=settings.pipeline_queue_size)
+        started = {}
+        sink_before = {}  # sink time when each source started
+        queued = {}  # jobs each source has put on the queue
+        received = {}  # of those, jobs taken off it
+        owed = {}  # jobs an abandoned source queued before it was abandoned, still to pass on
+        finished = set()
+        abandoned = set()
+        stop = threading.Event()
+        executor = ThreadPoolExecutor(
+            max_workers=max(1, min(settings.scrape_concurrency, len(self.scrapers))),
+            thread_name_prefix="scraper"
+        )
+        fan_out_started = time.monotonic()
+        sink_seconds = 0.0  # consumer time spent outside this generator in finished hand-offs
+        handed_off_at = None  # start of the hand-off in progress, if any
+        
+        def sink_time() -> float:
+            handed_off = handed_off_at
+            return sink_seconds + (time.monotonic() - handed_off if handed_off is not None else 0.0)
+        
+        def deadline(index) -> float:
+            sink = sink_time()
+            global_deadline = fan_out_started + settings.scrape_total_timeout + sink
+            if index not in started:
+                return global_deadline
+            source_deadline = started[index] + settings.scrape_source_timeout + sink - sink_before[index]
+            return min(source_deadline, global_deadline)
+        
+        def put(item) -> bool:
+            # Block while the consumer is behind, but give up once it goes away
+            while not stop.is_set():
+                try:
+                    jobs_queue.put(item, timeout=0.1)
+                    return True
+                except Full:
+                    continue
+            return False
+        
+        def produce(index, scraper):
+            sink_before[index] = sink_time()
+            started[index] = time.monotonic()
+            count = 0
             try:
-                # Clean data
-                job = self.processor.clean_job_data(job)
-                
-                # Extract additional skills if not provided
-                if not job.get('skills_required'):
-                    job['skills_required'] = self.processor.extract_skills(job.get('description', ''))
-                
-                processed_jobs.append(job)
+                for job in self._source_jobs(scraper):
+                    if index in abandoned:
+                        return
+                    if time.monotonic() >= deadline(index):
+                        logger.warning(f"Scraper {scraper.source} missed its deadline, stopping")
+                        return
+                    queued[index] = count + 1  # counted before the put so an abandonment can't miss it
+                    if not put((index, job)):
+                        return
+                    count += 1
+                finished.add(index)
+                logger.info(f"Scraped {count} jobs from {scraper.source}")
             except Exception as e:
-                logger.error(f"Error processing job: {e}")
+                logger.error(f"Error in scraper {scraper.source}: {e}")
+            finally:
+                put((index, _SOURCE_DONE))
         
-        logger.info(f"Processed {len(processed_jobs)} jobs")
-        return processed_jobs
+        pending = set()
+        for index, scraper in enumerate(self.scrapers):
+            executor.submit(produce, index, scraper)
+            pending.add(index)
+        
+        try:
+            while pending or any(owed.values()):
+                now = time.monotonic()
+                
+                # Drop sources past their own or the global deadline
+                for index in list(pending - finished):
+                    if now >= deadline(index):
+                        pending.discard(index)
+                        abandoned.add(index)
+                        owed[index] = queued.get(index, 0) - received.get(index, 0)
+                        logger.warning(f"Scraper {self.scrapers[index].source} missed its deadline, skipping")
+                if not pending and not any(owed.values()):
+                    break
+                
+                # Queued sources get their deadline once a worker picks them up
+                wake_at = min(
+                    (deadline(index) if index in started else now + 0.1 for index in pending - finished),
+                    default=now + 0.1
+                )
+                try:
+                    index, job = jobs_queue.get(timeout=max(0.0, wake_at - now))
+                except Empty:
+                    continue
+                
+                if job is _SOURCE_DONE:
+                    pending.discard(index)
+                    continue
+                if index in abandoned:
+                    # Pass on what it queued in time, drop what it put after
+                    if owed.get(index, 0) <= 0:
+                        continue
+                    owed[index] -= 1
+                else:
+                    received[index] = received.get(index, 0) + 1
+                handed_off_at = time.monotonic()
+                yield job
+                sink_seconds += time.monotonic() - handed_off_at
+                handed_off_at = None
+        finally:
+            stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,284 @@
+"""
+Near-duplicate job detection across sources with MinHash signatures and LSH
+"""
+import hashlib
+import zlib
+from typing import Dict, List, Optional, Set, Tuple
+import numpy as np
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+from backend.config import settings
+from backend.pipelines.skills import _tokenize
+import logging
+
+logger = logging.getLogger(__name__)
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+
+
+def lsh_params(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    Bands and rows per band for ``num_perm`` permutations, minimising the
+    probability mass of false positives below ``threshold`` plus false
+    negatives above it
+    """
+    similarity = np.linspace(0.0, 1.0, 201)
+    below = similarity < threshold
+    best, best_error = (1, num_perm), float('inf')
+    for bands in range(1, num_perm + 1):
+        rows = num_perm // bands
+        candidate = 1 - (1 - similarity ** rows) ** bands
+        error = np.trapz(np.where(below, candidate, 0.0), similarity) + \
+            np.trapz(np.where(below, 0.0, 1 - candidate), similarity)
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+class MinHasher:
+    """
+    MinHash signatures over word shingles.
+
+    Shingles are hashed with crc32 and permuted with fixed universal hash
+    functions, so signatures are stable across processes and runs.
+    """
+
+    def __init__(self, num_perm: Optional[int] = None, shingle_size: Optional[int] = None, seed: int = 1):
+        self.num_perm = num_perm or settings.dedup_num_perm
+        self.shingle_size = shingle_size or settings.dedup_shingle_size
+        rng = np.random.RandomState(seed)
+        # a * hash + b stays below 2**64 with 32-bit operands
+        self._a = rng.randint(1, 1 << 32, size=self.num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 32, size=self.num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> Set[bytes]:
+        """Distinct runs of ``shingle_size`` tokens (the whole text if shorter)"""
+        tokens = _tokenize(text or '')
+        size = self.shingle_size
+        if len(tokens) <= size:
+            return {b' '.join(tokens)} if tokens else set()
+        return {b' '.join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """uint32 signature of ``num_perm`` values, or None for text without tokens"""
+        shingles = self.shingles(text)
+        if not shingles:
+            return None
+        hashes = np.fromiter(map(zlib.crc32, shingles), np.uint64, len(shingles))
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=1).astype(np.uint32)
+
+    @staticmethod
+    def similarity(left: np.ndarray, right: np.ndarray) -> float:
+        """Estimated Jaccard similarity of the shingle sets behind two signatures"""
+        return np.count_nonzero(left == right) / len(left)
+
+
+class NearDuplicateDetector:
+    """
+    Group incoming jobs into canonical postings.
+
+    Every job seen gets a ``JobSignature`` row pointing at its canonical job
+    once that job is stored in ``job_listings``; canonical postings are also
+    indexed in ``job_lsh_buckets`` under one key
+    per LSH band. A new job is compared only with the canonical postings
+    sharing at least one bucket (indexed lookups, independent of table size)
+    and becomes a duplicate of the most similar one at or above
+    ``threshold`` with the same normalized title, so different roles sharing
+    a boilerplate description stay apart. Assignments are sticky: a job id
+    seen before keeps its canonical posting while that is stored.
+    """
+
+    def __init__(
+        self,
+        threshold: Optional[float] = None,
+        num_perm: Optional[int] = None,
+        shingle_size: Optional[int] = None
+    ):
+        self.threshold = threshold if threshold is not None else settings.dedup_threshold
+        self.hasher = MinHasher(num_perm, shingle_size)
+        self.bands, self.rows = lsh_params(self.threshold, self.hasher.num_perm)
+
+    @staticmethod
+    def text(job: Dict) -> str:
+        """The fields two postings of the same job share"""
+        return ' '.join(job.get(field) or '' for field in ('title', 'company', 'description'))
+
+    @staticmethod
+    def title_key(job: Dict) -> str:
+        return b' '.join(_tokenize(job.get('title') or '')).decode('utf-8')
+
+    def bucket_keys(self, signature: np.ndarray) -> List[int]:
+        """One signed 64-bit key per band"""
+        keys = []
+        for band in range(self.bands):
+            values = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            digest = hashlib.blake2b(band.to_bytes(2, 'little') + values, digest_size=8).digest()
+            keys.append(int.from_bytes(digest, 'little', signed=True))
+        return keys
+
+    def filter(self, db: Session, jobs: List[Dict]) -> Tuple[List[Dict], Dict[str, str], 'PendingSignatures']:
+        """
+        Split ``jobs`` into the postings to store and a map of duplicate id
+        to canonical id. Only postings present in ``job_listings`` count as
+        canonical. Signatures of jobs that belong to one are recorded here;
+        those of new canonical postings, and of jobs grouped under them, are
+        returned for the write that stores the posting to record. Jobs
+        without an id or any text are always kept.
+        """
+        from backend.models.database import JobSignature, job_lsh_buckets
+        from backend.utils.database import _chunks
+
+        chunk_size = settings.bulk_insert_chunk_size
+        signatures, by_id = {}, {}
+        for job in jobs:
+            if job.get('id') and job['id'] not in signatures:
+                signature = self.hasher.signature(self.text(job))
+                if signature is not None:
+                    signatures[job['id']] = signature
+                    by_id[job['id']] = job
+
+        known = {}
+        for chunk in _chunks(list(signatures), chunk_size):
+            known.update((row.job_id, row) for row in db.execute(
+                select(JobSignature.job_id, JobSignature.canonical_id, JobSignature.signature)
+                .where(JobSignature.job_id.in_(chunk))
+            ))
+        listed = self._listed(db, set(signatures) | {row.canonical_id for row in known.values()})
+        # Grouped under a posting that is not stored (anymore): judge afresh
+        stale = [job_id for job_id, row in known.items() if row.canonical_id not in listed]
+        for job_id in stale:
+            del known[job_id]
+
+        keys = {job_id: self.bucket_keys(signature) for job_id, signature in signatures.items() if job_id not in known}
+        bucket_jobs = {}
+        for chunk in _chunks(list({key for job_keys in keys.values() for key in job_keys}), chunk_size):
+            for bucket, job_id in db.execute(
+                select(job_lsh_buckets.c.bucket, job_lsh_buckets.c.job_id).where(job_lsh_buckets.c.bucket.in_(chunk))
+            ):
+                bucket_jobs.setdefault(bucket, []).append(job_id)
+
+        candidates = {}
+        bucketed = list({job_id for ids in bucket_jobs.values() for job_id in ids})
+        listed |= self._listed(db, bucketed)
+        for chunk in _chunks([job_id for job_id in bucketed if job_id in listed], chunk_size):
+            candidates.update(
+                (job_id, (title_key, np.frombuffer(signature, dtype=np.uint32)))
+                for job_id, title_key, signature in db.execute(
+                    select(JobSignature.job_id, JobSignature.title_key, JobSignature.signature)
+                    .where(JobSignature.job_id.in_(chunk))
+                )
+            )
+
+        canonical_of = {}
+        new_signatures, new_buckets, moved = [], [], []
+        pending = PendingSignatures()
+        for job_id, signature in signatures.items():
+            stored = known.get(job_id)
+            if stored is not None:
+                canonical_of[job_id] = stored.canonical_id
+                if stored.canonical_id == job_id and stored.signature != signature.tobytes():
+                    moved.append((job_id, self.title_key(by_id[job_id]), signature))
+                continue
+
+            title_key = self.title_key(by_id[job_id])
+            best, best_similarity = None, 0.0
+            for candidate in sorted({job for key in keys[job_id] for job in bucket_jobs.get(key, ())}):
+                if candidate not in candidates:
+                    continue
+                candidate_title, candidate_signature = candidates[candidate]
+                if candidate_title != title_key:
+                    continue
+                similarity = self.hasher.similarity(candidate_signature, signature)
+                if similarity >= self.threshold and similarity > best_similarity:
+                    best, best_similarity = candidate, similarity
+
+            if best is None:
+                # New canonical posting, visible to the rest of this batch too
+                best = job_id
+                candidates[job_id] = (title_key, signature)
+                buckets = new_buckets if job_id in listed else pending.buckets
+                for key in keys[job_id]:
+                    bucket_jobs.setdefault(key, []).append(job_id)
+                    buckets.append({'bucket': key, 'job_id': job_id})
+            canonical_of[job_id] = best
+            (new_signatures if best in listed else pending.signatures).append({
+                'job_id': job_id, 'canonical_id': best, 'source': by_id[job_id].get('source'),
+                'title_key': title_key, 'signature': signature.tobytes()
+            })
+
+        if new_signatures or moved or stale:
+            self._forget(db, stale)
+            if new_signatures:
+                db.execute(insert(JobSignature.__table__), new_signatures)
+            if new_buckets:
+                db.execute(job_lsh_buckets.insert(), new_buckets)
+            self._reindex(db, moved)
+            db.commit()
+
+        duplicates = {job_id: canonical for job_id, canonical in canonical_of.items() if canonical != job_id}
+        kept = [job for job in jobs if job.get('id') not in duplicates]
+        return kept, duplicates, pending
+
+    @staticmethod
+    def _listed(db: Session, job_ids) -> Set[str]:
+        """The ids among ``job_ids`` stored in ``job_listings``"""
+        from backend.models.database import JobListing
+        from backend.utils.database import _chunks
+
+        listed = set()
+        for chunk in _chunks(list(job_ids), settings.bulk_insert_chunk_size):
+            listed.update(db.execute(select(JobListing.id).where(JobListing.id.in_(chunk))).scalars())
+        return listed
+
+    @staticmethod
+    def _forget(db: Session, job_ids: List[str]) -> None:
+        """Drop the signatures and buckets of jobs about to be judged afresh"""
+        from backend.models.database import JobSignature, job_lsh_buckets
+
+        if not job_ids:
+            return
+        db.execute(delete(job_lsh_buckets).where(job_lsh_buckets.c.job_id.in_(job_ids)))
+        db.execute(delete(JobSignature).where(JobSignature.job_id.in_(job_ids)))
+
+    def _reindex(self, db: Session, moved: List[Tuple[str, str, np.ndarray]]) -> None:
+        """Store new signatures and buckets for canonical postings whose text changed"""
+        from backend.models.database import JobSignature, job_lsh_buckets
+
+        if not moved:
+            return
+        ids = [job_id for job_id, _, _ in moved]
+        db.execute(delete(job_lsh_buckets).where(job_lsh_buckets.c.job_id.in_(ids)))
+        for job_id, title_key, signature in moved:
+            db.execute(
+                update(JobSignature).where(JobSignature.job_id == job_id)
+                .values(title_key=title_key, signature=signature.tobytes())
+            )
+        db.execute(job_lsh_buckets.insert(), [
+            {'bucket': key, 'job_id': job_id} for job_id, _, signature in moved for key in self.bucket_keys(signature)
+        ])
+
+
+class PendingSignatures:
+    """
+    Signatures and LSH buckets of new canonical postings and of the jobs
+    grouped under them. ``write`` adds the ones whose canonical posting was
+    just stored to the transaction storing it, so a posting that is skipped
+    or fails leaves nothing behind and its reposts are judged afresh.
+    """
+
+    def __init__(self):
+        self.signatures: List[Dict] = []
+        self.buckets: List[Dict] = []
+
+    def write(self, db: Session, stored_ids: List[str]) -> None:
+        from backend.models.database import JobSignature, job_lsh_buckets
+
+        stored = set(stored_ids)
+        signatures = [row for row in self.signatures if row['canonical_id'] in stored]
+        if signatures:
+            db.execute(insert(JobSignature.__table__), signatures)
+        buckets = [row for row in self.buckets if row['job_id'] in stored]
+        if buckets:
+            db.execute(job_lsh_buckets.insert(), buckets)
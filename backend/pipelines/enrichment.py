@@ -0,0 +1,167 @@
+"""
+Precompute ML feature columns for job listings
+"""
+from typing import Dict, List, Optional
+import numpy as np
+from sqlalchemy import bindparam, or_, select, update
+from sqlalchemy.orm import Session
+from backend.config import settings
+from backend.models.ml_models import (
+    DEFAULT_USER_PREFERENCES, JobCandidates, JobRecommendationModel, SalaryPredictionModel
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Bump when the scoring or categorization logic below changes
+ENRICHMENT_VERSION = "1"
+
+# First matching keyword (in title) decides the category
+CATEGORY_KEYWORDS = [
+    ('machine-learning', ('machine learning', 'ml ', 'mlops', 'ai ', 'deep learning')),
+    ('data-science', ('data scientist', 'data science', 'research scientist')),
+    ('data-engineering', ('data engineer', 'analytics engineer', 'etl', 'data platform')),
+    ('infrastructure', ('devops', 'sre', 'site reliability', 'platform', 'infrastructure', 'cloud')),
+    ('frontend', ('frontend', 'front-end', 'front end', 'ui ')),
+    ('full-stack', ('full stack', 'full-stack', 'fullstack')),
+    ('backend', ('backend', 'back-end', 'back end', 'api')),
+    ('analytics', ('analyst', 'analytics', 'business intelligence')),
+]
+
+FEATURE_COLUMNS = ('salary_score', 'growth_potential', 'match_score', 'category', 'features_version')
+
+# Salary that scores 1.0
+SALARY_SCORE_SCALE = 150000
+
+
+def salary_scores(jobs: List[Dict], salary_model: SalaryPredictionModel) -> np.ndarray:
+    """``salary_score`` per job: the listed ``salary_max`` where present, the model's prediction otherwise"""
+    salary = np.array([job.get('salary_max') or np.nan for job in jobs], dtype=float)
+    missing = np.flatnonzero(np.isnan(salary))
+    if len(missing):
+        predictions = salary_model.predict_batch([jobs[i] for i in missing])
+        salary[missing] = [high for _, high in predictions]
+    return salary / SALARY_SCORE_SCALE
+
+
+def categorize_title(title: Optional[str]) -> str:
+    """Coarse job category from the title"""
+    padded = f" {(title or '').lower()} "
+    for category, keywords in CATEGORY_KEYWORDS:
+        if any(keyword in padded for keyword in keywords):
+            return category
+    return 'other'
+
+
+class JobEnricher:
+    """
+    Fill a job's ``salary_score``, ``growth_potential``, ``match_score`` and
+    ``category`` in vectorized batches so read endpoints never run the
+    models per request.
+    """
+    
+    def __init__(
+        self,
+        recommendation_model: Optional[JobRecommendationModel] = None,
+        salary_model: Optional[SalaryPredictionModel] = None
+    ):
+        self.recommendation_model = recommendation_model or JobRecommendationModel()
+        if salary_model is None:
+            from backend.models.registry import salary_models
+            salary_models.refresh()
+            salary_model = salary_models.current
+        self.salary_model = salary_model
+    
+    @property
+    def version(self) -> str:
+        """Identifies the logic and models the stored features came from"""
+        return f"{ENRICHMENT_VERSION}:{self.salary_model.version}"
+    
+    def enrich(self, jobs: List[Dict]) -> List[Dict]:
+        """Set feature keys on each job dict in place and return the list"""
+        if not jobs:
+            return jobs
+        
+        candidates = JobCandidates([{'id': i, **job} for i, job in enumerate(jobs)])
+        match_scores = self.recommendation_model.score_candidates(candidates, DEFAULT_USER_PREFERENCES)
+        growth = self.recommendation_model.growth_potential_batch(candidates)
+        
+        scores = salary_scores(jobs, self.salary_model)
+        
+        categories = {}
+        version = self.version
+        for i, job in enumerate(jobs):
+            title = job.get('title')
+            if title not in categories:
+                categories[title] = categorize_title(title)
+            job['salary_score'] = float(scores[i])
+            job['growth_potential'] = float(growth[i])
+            job['match_score'] = float(match_scores[i])
+            job['category'] = categories[title]
+            job['features_version'] = version
+        return jobs
+    
+    def refresh_stale(self, db: Session, chunk_size: Optional[int] = None) -> int:
+        """
+        Recompute features for rows written by an older enrichment/model
+        version (or never enriched), walking the table in id order.
+        """
+        from backend.models.database import JobListing, JobSkill, job_listing_skills
+        
+        chunk_size = chunk_size or settings.bulk_insert_chunk_size
+        version = self.version
+        table = JobListing.__table__
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam('job_id'))
+            .values({column: bindparam(f"new_{column}") for column in FEATURE_COLUMNS})
+            # Derived columns aren't a source change; keep updated_at for incremental training
+            .values(updated_at=table.c.updated_at)
+        )
+        
+        refreshed = 0
+        last_id = ''
+        while True:
+            rows = db.execute(
+                select(
+                    JobListing.id, JobListing.title, JobListing.company, JobListing.location,
+                    JobListing.experience_level, JobListing.remote_type, JobListing.salary_max,
+                    JobListing.company_type
+                )
+                .where(JobListing.id > last_id)
+                .where(or_(JobListing.features_version.is_(None), JobListing.features_version != version))
+                .order_by(JobListing.id)
+                .limit(chunk_size)
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            
+            link = job_listing_skills.c
+            skills_by_job = {}
+            for job_id, skill_name in db.execute(
+                select(link.job_id, JobSkill.skill_name)
+                .join(JobSkill, JobSkill.id == link.skill_id)
+                .where(link.job_id.in_([row.id for row in rows]))
+            ):
+                skills_by_job.setdefault(job_id, []).append(skill_name)
+            
+            jobs = []
+            for row in rows:
+                job = {key: value for key, value in row._mapping.items() if value is not None}
+                job['skills_required'] = skills_by_job.get(row.id, [])
+                jobs.append(job)
+            self.enrich(jobs)
+            
+            db.execute(stmt, [
+                {'job_id': job['id'], **{f"new_{column}": job[column] for column in FEATURE_COLUMNS}}
+                for job in jobs
+            ])
+            db.commit()
+            refreshed += len(jobs)
+        
+        if refreshed:
+            from backend.utils.cache import response_cache
+            response_cache.invalidate()
+            logger.info(f"Refreshed ML features for {refreshed} jobs (version {version})")
+        return refreshed
@@ -0,0 +1,163 @@
+"""
+Shared skill vocabulary and single-pass skill matcher
+"""
+import json
+import string
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+from backend.config import settings
+
+# Canonical skill name -> aliases that should resolve to it
+DEFAULT_SKILL_VOCABULARY: Dict[str, List[str]] = {
+    'python': [],
+    'java': [],
+    'javascript': ['js'],
+    'typescript': [],
+    'go': ['golang'],
+    'rust': [],
+    'c++': ['cpp'],
+    'sql': [],
+    'aws': ['amazon web services'],
+    'gcp': ['google cloud', 'google cloud platform'],
+    'azure': [],
+    'kubernetes': ['k8s'],
+    'docker': [],
+    'terraform': [],
+    'spark': ['pyspark', 'apache spark'],
+    'hadoop': [],
+    'kafka': [],
+    'flink': [],
+    'airflow': [],
+    'tensorflow': [],
+    'pytorch': [],
+    'scikit-learn': ['sklearn', 'scikit learn'],
+    'pandas': [],
+    'numpy': [],
+    'react': ['react.js', 'reactjs'],
+    'vue': ['vue.js', 'vuejs'],
+    'angular': [],
+    'node.js': ['nodejs'],
+    'django': [],
+    'flask': [],
+    'postgresql': ['postgres'],
+    'mongodb': ['mongo'],
+    'redis': [],
+    'elasticsearch': ['elastic search'],
+    'git': [],
+    'ci/cd': ['cicd'],
+    'jenkins': [],
+    'gitlab': [],
+    'github': [],
+    'agile': [],
+    'scrum': [],
+    'jira': [],
+}
+
+# Everything except letters, digits, '+' and '#' separates tokens, so "c++" and
+# "c#" stay whole while "go" never matches inside "google". Tokenizing works on
+# UTF-8 bytes because bytes.translate with a 256-entry table is much cheaper
+# than str.translate.
+_SEPARATORS = string.punctuation.replace('+', '').replace('#', '').encode()
+_TO_SPACE = bytes.maketrans(_SEPARATORS, b' ' * len(_SEPARATORS))
+
+
+def _tokenize(text: str) -> List[bytes]:
+    """Lowercase and split text on separators"""
+    return text.lower().encode('utf-8').translate(_TO_SPACE).split()
+
+
+class SkillMatcher:
+    """
+    Find all vocabulary skills in a text in a single pass.
+    
+    The text is tokenized once (``translate`` + ``split`` run in C) and the
+    token set is intersected with the vocabulary, so the cost depends on the
+    text length and not on the vocabulary size. Multi-token terms such as
+    "node.js" or "google cloud" are only verified with a phrase lookup when
+    their first token is present.
+    """
+
+    def __init__(self, vocabulary: Optional[Dict[str, List[str]]] = None):
+        vocabulary = vocabulary if vocabulary is not None else DEFAULT_SKILL_VOCABULARY
+        self.canonical: Dict[str, str] = {}
+        for skill, aliases in vocabulary.items():
+            skill = skill.lower().strip()
+            self.canonical[skill] = skill
+            for alias in aliases:
+                self.canonical[alias.lower().strip()] = skill
+
+        self._tokens: Dict[bytes, str] = {}
+        self._phrases: Dict[bytes, List[Tuple[bytes, List[bytes], str]]] = {}
+        for term, skill in self.canonical.items():
+            tokens = _tokenize(term)
+            if len(tokens) == 1:
+                self._tokens[tokens[0]] = skill
+            elif tokens:
+                phrase = b' ' + b' '.join(tokens) + b' '
+                self._phrases.setdefault(tokens[0], []).append((phrase, tokens, skill))
+        self._token_set = frozenset(self._tokens)
+        self._phrase_starts = frozenset(self._phrases)
+        self._vocabulary_tokens = set(self._token_set).union(
+            token for entries in self._phrases.values() for _, tokens, _ in entries for token in tokens
+        )
+
+    @property
+    def skills(self) -> List[str]:
+        """Canonical skill names in the vocabulary"""
+        return sorted(set(self.canonical.values()))
+
+    def extract(self, text: str) -> List[str]:
+        """Sorted canonical skills mentioned in text"""
+        if not text:
+            return []
+        tokens = _tokenize(text)
+        present = self._vocabulary_tokens.intersection(tokens)
+        matched = present & self._token_set
+        found = set()
+
+        padded = None
+        shadowed = {}
+        for start in present & self._phrase_starts:
+            for phrase, phrase_tokens, skill in self._phrases[start]:
+                if not present.issuperset(phrase_tokens):
+                    continue
+                if padded is None:
+                    padded = b' ' + b' '.join(tokens) + b' '
+                occurrences = padded.count(phrase)
+                if occurrences:
+                    found.add(skill)
+                    for token in phrase_tokens:
+                        shadowed[token] = shadowed.get(token, 0) + occurrences
+
+        # A token only counts on its own if it also appears outside the
+        # phrases ("js" in "node.js" is not javascript)
+        for token, count in shadowed.items():
+            if token in matched and tokens.count(token) <= count:
+                matched.discard(token)
+
+        found.update(self._tokens[token] for token in matched)
+        return sorted(found)
+
+    def normalize(self, skills: Iterable[str]) -> List[str]:
+        """Map skill names and aliases onto canonical names, keeping unknown skills as-is"""
+        normalized = {}
+        for skill in skills:
+            skill = skill.lower().strip()
+            if skill:
+                normalized.setdefault(self.canonical.get(skill, skill), None)
+        return list(normalized)
+
+
+def load_skill_vocabulary(path: Optional[str] = None) -> Dict[str, List[str]]:
+    """Load a {skill: [aliases]} vocabulary from JSON, or the built-in default"""
+    path = path or settings.skill_vocabulary_path
+    if not path:
+        return DEFAULT_SKILL_VOCABULARY
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+@lru_cache(maxsize=1)
+def get_skill_matcher() -> SkillMatcher:
+    """Process-wide matcher, compiled once from the configured vocabulary"""
+    return SkillMatcher(load_skill_vocabulary())
@@ -0,0 +1,106 @@
+"""
+Long-running jobs, runnable in a worker process.
+
+Each task opens its own session so it can be shipped to a process pool, and
+returns only plain data.
+"""
+from typing import Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def refresh_job_data(run_id: Optional[str] = None) -> Dict:
+    """Scrape all sources into the database; ``run_id`` names the refresh run to report to"""
+    from backend.utils.database import SessionLocal
+    
+    db = SessionLocal()
+    try:
+        return run_refresh(db, run_id)
+    finally:
+        db.close()
+
+
+def run_refresh(db, run_id: Optional[str] = None, pipeline=None) -> Dict:
+    """
+    Run the pipeline into ``db`` and recompute analytics if anything changed.
+    
+    With ``run_id`` the refresh run row is marked running, receives the
+    pipeline's progress, and records the outcome; a cancellation request
+    stops the run at its next progress report. The returned totals carry
+    the final ``status``.
+    """
+    from backend.pipelines.data_pipeline import DataPipeline
+    from backend.utils.database import DatabaseService
+    from backend.utils.refresh_runs import (
+        CANCELLED, FAILED, SUCCEEDED, RefreshCancelled,
+        finish_refresh_run, report_refresh_run, start_refresh_run
+    )
+    
+    pipeline = pipeline or DataPipeline()
+    if run_id is None:
+        result = pipeline.run_into(db)
+        if result['inserted'] or result['updated']:
+            DatabaseService.refresh_analytics(db)
+        return {**result, 'status': SUCCEEDED}
+    
+    if not start_refresh_run(db, run_id):
+        logger.info(f"Refresh {run_id} was cancelled before it started")
+        return {'status': CANCELLED}
+    
+    latest = {}
+    
+    def progress(totals):
+        latest.update(totals)
+        report_refresh_run(db, run_id, totals)
+    
+    try:
+        result, status = pipeline.run_into(db, progress=progress), SUCCEEDED
+    except RefreshCancelled:
+        db.rollback()
+        result, status = latest, CANCELLED
+        logger.info(f"Refresh {run_id} cancelled after {result.get('processed', 0)} jobs")
+    except Exception as e:
+        db.rollback()
+        finish_refresh_run(db, run_id, FAILED, result=latest or None, error=str(e))
+        raise
+    
+    # Batches written before a cancellation stay, so analytics follow them too
+    if result.get('inserted') or result.get('updated'):
+        DatabaseService.refresh_analytics(db)
+    finish_refresh_run(db, run_id, status, result=result)
+    return {**result, 'status': status}
+
+
+def retrain_models(incremental: bool = True) -> Dict:
+    """
+    Train the salary model on stored jobs and refresh features it produced.
+    Incremental runs only fit rows changed since the published version.
+    """
+    from backend.models.ml_models import SalaryPredictionModel
+    from backend.pipelines.enrichment import JobEnricher
+    from backend.utils.database import SessionLocal
+    
+    db = SessionLocal()
+    try:
+        model = SalaryPredictionModel()
+        if incremental:
+            model.load()
+        result = model.train_from_db(db, incremental=incremental)
+        logger.info(
+            f"Salary model {result['mode']} training on {result['rows']} rows: "
+            f"{result['build_seconds']:.2f}s building, {result['fit_seconds']:.2f}s fitting"
+        )
+        
+        # Rewrite feature columns that came from the previous model
+        refreshed = 0
+        if result['mode'] in ('full', 'incremental'):
+            refreshed = JobEnricher(salary_model=model).refresh_stale(db)
+        return {
+            'trained_on': result['rows'],
+            'mode': result['mode'],
+            'model_version': model.version,
+            'features_refreshed': refreshed
+        }
+    finally:
+        db.close()
@@ -0,0 +1,128 @@
+"""
+Shared pytest fixtures and test helpers
+"""
+import asyncio
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from backend.config import settings
+from backend.models.database import Base
+from backend.pipelines.data_pipeline import DataPipeline, JobScraperBase
+from backend.utils.cache import DatabaseGeneration, response_cache
+from backend.utils.ratelimit import rate_limiter
+from backend.utils.search import install_fulltext_index, install_fulltext_index_async
+
+
+def make_job(i, **overrides):
+    """A scraped job distinct enough from every other ``i`` not to be grouped as a near-duplicate"""
+    job = {
+        'id': f"test_{i}",
+        'title': f"Engineer {i}",
+        'company': f"Company {i}",
+        'location': 'Remote',
+        'job_url': f"https://example.com/jobs/{i}",
+        'description': f"Posting number {i} for a backend engineer",
+        'salary_max': 100000 + i,
+        'experience_level': 'mid',
+        'remote_type': 'fully-remote',
+        'skills_required': ['python', 'sql'],
+        'source': 'test'
+    }
+    job.update(overrides)
+    return job
+
+
+class ListScraper(JobScraperBase):
+    """Yields the given jobs, calling ``on_job(index)`` before each"""
+
+    def __init__(self, jobs, source='test', on_job=None):
+        super().__init__()
+        self.jobs = jobs
+        self.source = source
+        self.on_job = on_job
+
+    def scrape(self):
+        return list(self.iter_jobs())
+
+    def iter_jobs(self):
+        for i, job in enumerate(self.jobs):
+            if self.on_job:
+                self.on_job(i)
+            yield job
+
+
+def make_pipeline(*scrapers):
+    pipeline = DataPipeline()
+    pipeline.scrapers = list(scrapers)
+    return pipeline
+
+
+def run_pipeline(db, *scrapers):
+    """Scrape sequentially into ``db`` and return the totals"""
+    return make_pipeline(*scrapers).run_into(db, concurrent=False)
+
+
+@pytest.fixture(autouse=True)
+def no_rate_limit(monkeypatch):
+    """Tests share one client address; rate limiting has its own tests"""
+    monkeypatch.setattr(rate_limiter, 'enabled', False)
+
+
+@pytest.fixture(autouse=True)
+def process_local_cache(monkeypatch):
+    """Without a test database the response cache keeps its generation in-process"""
+    monkeypatch.setattr(response_cache.backend, 'shared', None)
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """Isolated SQLite session with all tables created"""
+    monkeypatch.setattr(settings, 'bloom_path', str(tmp_path / 'known_jobs.bloom'))
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'jobs.db'}",
+        connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+    install_fulltext_index(engine)
+    sessions = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    monkeypatch.setattr(response_cache.backend, 'shared', DatabaseGeneration(check_interval=0, session_factory=sessions))
+    response_cache.invalidate()  # entries from another test's database
+    session = sessions()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+@pytest.fixture
+def async_engine(db):
+    """Async engine on the same database file as ``db``"""
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{db.get_bind().url.database}",
+        poolclass=NullPool  # TestClient runs each request on its own event loop
+    )
+    asyncio.run(install_fulltext_index_async(engine))
+    yield engine
+    asyncio.run(engine.dispose())
+
+
+@pytest.fixture
+def api_db(db, async_engine):
+    """Point the app's sync and async session dependencies at the test database"""
+    from backend.main import app
+    from backend.utils.async_database import get_async_db
+    from backend.utils.database import get_db
+
+    sessions = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    async def override_async_db():
+        async with sessions() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_async_db] = override_async_db
+    yield db
+    app.dependency_overrides.clear()
@@ -4,10 +4,16 @@ Integration tests for API endpoints
 import pytest
 from fastapi.testclient import TestClient
 from backend.main import app
+from backend.utils.database import DatabaseService
 
 client = TestClient(app)
 
 
+@pytest.fixture(autouse=True)
+def override_db(api_db):
+    yield
+
+
 def test_health_check():
     response = client.get("/api/admin/health")
     assert response.status_code == 200
@@ -26,6 +32,115 @@ def test_get_stats():
     assert response.status_code in [200, 404]
 
 
+def test_stats_follow_ingest(db):
+    DatabaseService.upsert_jobs(db, [
+        {'id': f"job_{i}", 'title': 'Engineer', 'company': 'Acme', 'remote_type': 'fully-remote',
+         'salary_max': 100000, 'job_url': f"https://example.com/{i}"}
+        for i in range(3)
+    ])
+    response = client.get("/api/jobs/stats")
+    assert response.status_code == 200
+    assert response.json()['total_jobs'] == 3
+    assert response.json()['top_companies'] == ['Acme']
+    assert response.json()['avg_salary_by_experience'] == {'mid': 100000}
+    
+    assert client.post("/api/admin/analytics/refresh").status_code == 200
+    response = client.post("/api/admin/stats/rebuild")
+    assert response.status_code == 200
+    assert client.get("/api/admin/stats").json()['total_jobs'] == 3
+
+
 def test_search_jobs_empty():
     response = client.get("/api/jobs?limit=10")
     assert response.status_code == 200
+
+
+def test_search_jobs_cursor_pagination(db):
+    DatabaseService.upsert_jobs(db, [
+        {'id': f"job_{i}", 'title': 'Engineer', 'company': 'Acme', 'location': 'Remote',
+         'job_url': f"https://example.com/{i}", 'description': 'Build things'}
+        for i in range(5)
+    ])
+    seen = []
+    cursor = None
+    while True:
+        params = {'limit': 2, **({'cursor': cursor} if cursor else {})}
+        body = client.get("/api/jobs/", params=params).json()
+        seen.extend(job['id'] for job in body['data'])
+        cursor = body['next_cursor']
+        if not cursor:
+            break
+    assert sorted(seen) == [f"job_{i}" for i in range(5)]
+    assert len(seen) == 5
+
+
+def test_job_without_url_is_served(api_db):
+    # e.g. a RemoteOK item without a url
+    DatabaseService.upsert_jobs(api_db, [
+        {'id': 'no_url', 'title': 'Engineer', 'company': 'Acme', 'location': 'Remote',
+         'job_url': '', 'description': 'Build things'}
+    ])
+    response = client.get("/api/jobs/")
+    assert response.status_code == 200
+    assert [job['job_url'] for job in response.json()['data']] == [None]
+    assert client.get("/api/jobs/no_url").json()['job_url'] is None
+
+
+def test_search_jobs_rejects_bad_cursor():
+    response = client.get("/api/jobs/", params={'cursor': 'not-a-cursor'})
+    assert response.status_code == 400
+
+
+def test_search_jobs_rejects_cursor_with_wrong_key_size():
+    from backend.utils.pagination import encode_cursor
+    response = client.get("/api/jobs/", params={'cursor': encode_cursor('posted_date', [1])})
+    assert response.status_code == 400
+
+
+def test_rank_jobs_returns_top_k_with_scores(db):
+    DatabaseService.upsert_jobs(db, [
+        {'id': 'py', 'title': 'Python Engineer', 'company': 'Acme', 'location': 'Remote',
+         'job_url': 'https://example.com/py', 'description': 'x', 'salary_max': 150000,
+         'skills_required': ['python', 'sql'], 'remote_type': 'fully-remote'},
+        {'id': 'go', 'title': 'Go Engineer', 'company': 'Acme', 'location': 'Austin, TX',
+         'job_url': 'https://example.com/go', 'description': 'x', 'salary_max': 90000,
+         'skills_required': ['go'], 'remote_type': 'on-site'},
+    ])
+    response = client.post("/api/jobs/rank", json={
+        'user_preferences': {'skills': ['python'], 'salary_min': 120000, 'location': 'remote'},
+        'k': 1
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert [job['id'] for job in body] == ['py']
+    assert body[0]['match_score'] > 0.7
+
+
+def test_predict_salary_batch(db):
+    DatabaseService.upsert_jobs(db, [
+        {'id': 'a', 'title': 'Engineer', 'company': 'Google', 'location': 'Seattle, WA',
+         'job_url': 'https://example.com/a', 'description': 'x', 'experience_level': 'senior',
+         'skills_required': ['python', 'go'], 'remote_type': 'fully-remote'},
+    ])
+    response = client.post("/api/jobs/predict-salary/batch", json={
+        'job_ids': ['a', 'missing'],
+        'jobs': [{'id': 'raw', 'experience_level': 'entry', 'remote_type': 'on-site'}]
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert [p['job_id'] for p in body['predictions']] == ['a', 'raw']
+    assert body['missing_job_ids'] == ['missing']
+    single = client.post("/api/jobs/predict-salary", params={'job_id': 'a'}).json()
+    assert body['predictions'][0]['predicted_salary_max'] == single['predicted_salary_max']
+
+
+def test_recommendation_scores_missing_salary_like_ingest(db):
+    from backend.pipelines.enrichment import JobEnricher
+    job = {'id': 'no_salary', 'title': 'Engineer', 'company': 'Google', 'location': 'Seattle, WA',
+           'job_url': 'https://example.com/no_salary', 'description': 'x', 'experience_level': 'senior',
+           'skills_required': ['python', 'go'], 'remote_type': 'fully-remote'}
+    DatabaseService.upsert_jobs(db, [dict(job)])  # stored without features
+    response = client.post("/api/jobs/recommendation", json={'job_id': 'no_salary'})
+    assert response.status_code == 200
+    enriched = JobEnricher().enrich([dict(job)])[0]
+    assert response.json()['salary_score'] == pytest.approx(enriched['salary_score'])
@@ -0,0 +1,106 @@
+"""
+Unit tests for the async database path
+"""
+import asyncio
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from backend.utils import async_database
+from backend.utils.async_database import AsyncDatabaseService, async_database_url
+from backend.utils.database import DatabaseService
+from backend.tests.conftest import make_job
+
+
+def test_async_database_url():
+    assert async_database_url("sqlite:///./jobs.db") == "sqlite+aiosqlite:///./jobs.db"
+    assert async_database_url("postgresql+psycopg2://u:p@db/jobs") == "postgresql+asyncpg://u:p@db/jobs"
+
+
+def test_keyword_search_uses_fulltext_index(db, async_engine):
+    DatabaseService.upsert_jobs(db, [
+        make_job(1, title='Data Analyst', description='Some kubernetes work'),
+        make_job(2, title='Kubernetes Platform Engineer', description='Run clusters'),
+    ])
+    sessions = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    async def search():
+        async with sessions() as session:
+            return await AsyncDatabaseService.search_jobs(session, {'keyword': 'kubernetes'})
+
+    assert [job.id for job in asyncio.run(search())] == ['test_2', 'test_1']
+
+
+def test_concurrent_sessions(db, async_engine):
+    DatabaseService.upsert_jobs(db, [make_job(i) for i in range(30)])
+    sessions = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    async def page(offset):
+        async with sessions() as session:
+            result = await AsyncDatabaseService.search_jobs_page(session, {'limit': 10, 'offset': offset})
+            return [job.id for job in result['jobs']]
+
+    async def run():
+        return await asyncio.gather(*(page(offset) for offset in (0, 10, 20) * 4))
+
+    pages = asyncio.run(run())
+    assert len({job_id for ids in pages for job_id in ids}) == 30
+    assert pages[:3] == pages[3:6]
+
+
+def test_writes_through_async_session(db, async_engine):
+    sessions = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    async def write():
+        async with sessions() as session:
+            await AsyncDatabaseService.upsert_jobs(session, [make_job(1), make_job(2)])
+            return await AsyncDatabaseService.get_statistics(session)
+
+    assert asyncio.run(write())['total_jobs'] == 2
+    assert DatabaseService.get_job_by_id(db, 'test_1') is not None
+
+
+def test_database_without_async_driver_runs_sync_service_in_threads(db, monkeypatch):
+    from sqlalchemy.orm import sessionmaker
+    from backend.utils import database
+    monkeypatch.setattr(async_database, 'ASYNC_DRIVERS', {})
+    monkeypatch.setattr(async_database, '_async_engine', None)
+    monkeypatch.setattr(async_database, '_async_sessions', None)
+    monkeypatch.setattr(async_database, '_no_async_driver', False)
+    monkeypatch.setattr(database, 'SessionLocal', sessionmaker(bind=db.get_bind()))
+    DatabaseService.upsert_jobs(db, [make_job(1)])
+
+    async def search():
+        await async_database.init_async_db()
+        sessions = async_database.get_async_db()
+        session = await sessions.__anext__()
+        try:
+            return await AsyncDatabaseService.search_jobs(session, {'keyword': 'engineer'})
+        finally:
+            await sessions.aclose()
+
+    assert async_database.get_async_engine() is None
+    assert [job.id for job in asyncio.run(search())] == ['test_1']
+
+
+def test_ranking_candidates_are_built_off_the_event_loop(db, async_engine, monkeypatch):
+    import threading
+    from backend.models import ml_models
+    from backend.utils import database
+    built_on = []
+
+    class RecordingCandidates(ml_models.JobCandidates):
+        def __init__(self, jobs):
+            built_on.append(threading.get_ident())
+            super().__init__(jobs)
+
+    monkeypatch.setattr(ml_models, 'JobCandidates', RecordingCandidates)
+    monkeypatch.setattr(database, '_ranking_cache', {'key': None, 'candidates': None})
+    DatabaseService.upsert_jobs(db, [make_job(i) for i in range(3)])
+    sessions = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    async def candidates():
+        async with sessions() as session:
+            return await AsyncDatabaseService.get_ranking_candidates(session)
+
+    first = asyncio.run(candidates())
+    assert list(first.ids) == ['test_0', 'test_1', 'test_2']
+    assert asyncio.run(candidates()) is first
+    assert len(built_on) == 1 and built_on[0] != threading.get_ident()
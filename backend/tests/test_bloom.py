@@ -0,0 +1,80 @@
+"""
+Unit tests for the known jobs Bloom filter
+"""
+import pytest
+from backend.config import settings
+from backend.models.database import JobListing
+from backend.utils.bloom import BloomFilter, KnownJobsIndex
+from backend.utils.database import DatabaseService
+from backend.tests.conftest import ListScraper, make_job, run_pipeline
+
+
+def test_false_positive_rate_matches_configuration():
+    bloom = BloomFilter(capacity=5_000, error_rate=0.01)
+    bloom.add_many(f"id:{i}" for i in range(5_000))
+
+    assert bloom.contains_many(f"id:{i}" for i in range(5_000)).all()
+    false_positives = bloom.contains_many(f"id:other_{i}" for i in range(20_000)).mean()
+    assert false_positives < 0.02
+    assert bloom.stats()['estimated_false_positive_rate'] == pytest.approx(0.01, abs=0.005)
+
+
+def test_save_and_load_round_trip(tmp_path):
+    bloom = BloomFilter(capacity=100, error_rate=0.05)
+    bloom.add_many(['id:a', 'url:b'])
+    bloom.save(str(tmp_path / 'filter.bloom'), {'watermark': None})
+
+    loaded, metadata = BloomFilter.load(str(tmp_path / 'filter.bloom'))
+    assert (loaded.bits == bloom.bits).all() and loaded.count == 2
+    assert 'id:a' in loaded and 'id:c' not in loaded
+    assert metadata == {'watermark': None}
+
+
+def test_new_jobs_skip_the_lookup_and_known_jobs_do_not(db):
+    first = run_pipeline(db, ListScraper([make_job(i) for i in range(10)]))
+    assert (first['definitely_new'], first['maybe_seen'], first['inserted']) == (10, 0, 10)
+
+    second = run_pipeline(db, ListScraper([make_job(i) for i in range(12)]))
+    assert (second['definitely_new'], second['maybe_seen']) == (2, 10)
+    assert (second['inserted'], second['unchanged']) == (2, 10)
+    assert db.query(JobListing).count() == 12
+
+
+def test_restart_catches_up_on_rows_written_elsewhere(db):
+    run_pipeline(db, ListScraper([make_job(i) for i in range(5)]))
+    DatabaseService.upsert_jobs(db, [make_job(100)])
+
+    index = KnownJobsIndex()
+    index.sync(db)
+    new, maybe = index.split([make_job(100), make_job(4), make_job(200)])
+    assert [job['id'] for job in new] == ['test_200']
+    assert [job['id'] for job in maybe] == ['test_100', 'test_4']
+
+
+def test_missing_or_mismatched_file_is_rebuilt(db, tmp_path):
+    DatabaseService.upsert_jobs(db, [make_job(i) for i in range(3)])
+    (tmp_path / 'known_jobs.bloom').write_bytes(b'\x00\x00\x00\x00')
+
+    index = KnownJobsIndex()
+    index.sync(db)
+    assert index.stored_jobs == 3
+    assert BloomFilter.load(settings.bloom_path)[0].count == 6
+
+
+def test_stale_filter_falls_back_to_upsert(db):
+    DatabaseService.upsert_jobs(db, [make_job(1)])
+
+    result = DatabaseService.insert_new_jobs(db, [make_job(1, title='Staff Engineer'), make_job(2)])
+    assert (result['inserted'], result['updated']) == (1, 1)
+    assert db.get(JobListing, 'test_1').title == 'Staff Engineer'
+
+
+def test_admin_endpoint_reports_the_saved_filter(db):
+    from fastapi.testclient import TestClient
+    from backend.main import app
+    client = TestClient(app)
+    assert client.get("/api/admin/bloom").status_code == 404
+
+    run_pipeline(db, ListScraper([make_job(i) for i in range(4)]))
+    body = client.get("/api/admin/bloom").json()
+    assert body['enabled'] and body['count'] == 8  # an id and a url key per job
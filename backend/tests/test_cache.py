@@ -0,0 +1,154 @@
+"""
+Unit tests for the response cache
+"""
+import asyncio
+import threading
+import time
+from sqlalchemy import event
+from fastapi.testclient import TestClient
+from backend.main import app
+from sqlalchemy.orm import sessionmaker
+from backend.utils.cache import ENTRY_OVERHEAD, DatabaseGeneration, LocalCacheBackend, RedisCacheBackend, ResponseCache
+from backend.utils.database import DatabaseService
+
+
+class FakeRedis:
+    """Just enough of the redis client for RedisCacheBackend"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        value, expires_at = self.data.get(key, (None, None))
+        if expires_at is not None and expires_at <= time.monotonic():
+            return None
+        return value
+
+    def setex(self, key, ttl, value):
+        self.data[key] = (value, time.monotonic() + ttl)
+
+    def incr(self, key):
+        value = int(self.get(key) or 0) + 1
+        self.data[key] = (str(value).encode(), None)
+        return value
+
+
+class TestResponseCache:
+    def test_hit_after_miss(self):
+        cache = ResponseCache(LocalCacheBackend(1 << 20), ttl=60, enabled=True)
+        calls = []
+        compute = lambda: calls.append(1) or {'value': len(calls)}
+        assert cache.get_or_set('ns', {'a': 1}, compute) == {'value': 1}
+        assert cache.get_or_set('ns', {'a': 1}, compute) == {'value': 1}
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_key_normalization(self):
+        assert ResponseCache.make_key('ns', {'b': 2, 'a': None, 's': ['y', 'x']}) == \
+            ResponseCache.make_key('ns', {'s': ['x', 'y'], 'b': 2})
+        assert ResponseCache.make_key('ns', {'a': 1}) != ResponseCache.make_key('other', {'a': 1})
+
+    def test_generation_bump_invalidates(self):
+        cache = ResponseCache(LocalCacheBackend(1 << 20), ttl=60, enabled=True)
+        cache.get_or_set('ns', {}, lambda: 1)
+        cache.invalidate()
+        assert cache.get_or_set('ns', {}, lambda: 2) == 2
+
+    def test_ttl_expiry(self):
+        backend = LocalCacheBackend(1 << 20)
+        backend.set('k', b'v', ttl=0.01)
+        time.sleep(0.02)
+        assert backend.get('k') is None
+        assert backend.expirations == 1
+
+    def test_lru_eviction_under_budget(self):
+        backend = LocalCacheBackend(3 * (1 + 10 + ENTRY_OVERHEAD))
+        for key in 'abc':
+            backend.set(key, b'x' * 10, ttl=60)
+        backend.get('a')
+        backend.set('d', b'x' * 10, ttl=60)
+        assert backend.get('b') is None
+        assert all(backend.get(key) is not None for key in 'acd')
+        assert backend.info()['bytes'] <= backend.max_bytes
+        assert backend.evictions == 1
+
+    def test_shared_backend_generation_across_workers(self):
+        client = FakeRedis()
+        worker_a = ResponseCache(RedisCacheBackend(client=client), ttl=60, enabled=True)
+        worker_b = ResponseCache(RedisCacheBackend(client=client), ttl=60, enabled=True)
+        worker_a.get_or_set('ns', {}, lambda: 'old')
+        assert worker_b.get_or_set('ns', {}, lambda: 'unused') == 'old'
+        worker_b.invalidate()
+        assert worker_a.get_or_set('ns', {}, lambda: 'new') == 'new'
+
+    def test_database_generation_reaches_other_processes(self, db):
+        sessions = sessionmaker(bind=db.get_bind())
+        api_worker = ResponseCache(
+            LocalCacheBackend(1 << 20, DatabaseGeneration(check_interval=0, session_factory=sessions)), ttl=60, enabled=True
+        )
+        pipeline_worker = ResponseCache(
+            LocalCacheBackend(1 << 20, DatabaseGeneration(check_interval=0, session_factory=sessions)), ttl=60, enabled=True
+        )
+        api_worker.get_or_set('ns', {}, lambda: 'old')
+        pipeline_worker.invalidate()
+        assert api_worker.get_or_set('ns', {}, lambda: 'new') == 'new'
+
+    def test_database_generation_is_polled_at_most_once_per_interval(self, db):
+        sessions = sessionmaker(bind=db.get_bind())
+        reader = DatabaseGeneration(check_interval=60, session_factory=sessions)
+        before = reader.current()
+        DatabaseGeneration(session_factory=sessions).bump()
+        assert reader.current() == before
+        reader._checked_at -= 60
+        assert reader.current() == before + 1
+
+    def test_async_lookup_does_backend_io_off_the_event_loop(self, db):
+        sessions = sessionmaker(bind=db.get_bind())
+        threads = []
+        client = FakeRedis()
+        client_get = client.get
+        client.get = lambda key: threads.append(threading.get_ident()) or client_get(key)
+        shared = DatabaseGeneration(check_interval=0, session_factory=lambda: threads.append(threading.get_ident()) or sessions())
+        caches = [
+            ResponseCache(LocalCacheBackend(1 << 20, shared), ttl=60, enabled=True),
+            ResponseCache(RedisCacheBackend(client=client), ttl=60, enabled=True)
+        ]
+
+        async def compute():
+            return 'value'
+
+        for cache in caches:
+            assert asyncio.run(cache.aget_or_set('ns', {}, compute)) == 'value'
+            assert asyncio.run(cache.aget_or_set('ns', {}, compute)) == 'value'
+            assert cache.hits == 1
+        assert threads and threading.get_ident() not in threads
+
+
+JOB = {
+    'id': 'job_1', 'title': 'Engineer', 'company': 'Acme', 'location': 'Remote',
+    'job_url': 'https://example.com/jobs/1', 'description': 'Build things'
+}
+
+
+class TestCachedEndpoints:
+    def setup_method(self):
+        self.client = TestClient(app)
+
+    def test_repeated_dashboard_queries_skip_database(self, api_db, async_engine):
+        DatabaseService.upsert_jobs(api_db, [JOB])
+        statements = []
+        event.listen(async_engine.sync_engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+
+        first = self.client.get("/api/jobs/stats").json()
+        queried = len(statements)
+        assert queried > 0
+        for _ in range(3):
+            assert self.client.get("/api/jobs/stats").json() == first
+        assert len(statements) == queried
+
+    def test_ingest_invalidates_cached_search(self, api_db):
+        db = api_db
+        assert self.client.get("/api/jobs/").json()['data'] == []
+        DatabaseService.upsert_jobs(db, [JOB])
+        assert [job['id'] for job in self.client.get("/api/jobs/").json()['data']] == ['job_1']
+        assert self.client.get("/api/jobs/job_1").json()['title'] == 'Engineer'
+        assert self.client.get("/api/admin/cache").json()['hits'] >= 0
@@ -0,0 +1,333 @@
+"""
+Unit tests for database service operations
+"""
+from datetime import datetime
+import pytest
+from sqlalchemy.orm import sessionmaker
+from backend.models.database import JobListing, JobSkill
+from backend.utils.database import DatabaseService
+from backend.tests.conftest import make_job
+
+
+class TestUpsertJobs:
+    def test_inserts_in_chunks(self, db):
+        result = DatabaseService.upsert_jobs(db, [make_job(i) for i in range(5)], chunk_size=2)
+        assert result['inserted'] == 5
+        assert [b['inserted'] for b in result['batches']] == [2, 2, 1]
+        assert db.query(JobListing).count() == 5
+
+    def test_existing_ids_are_updated(self, db):
+        DatabaseService.upsert_jobs(db, [make_job(1), make_job(2)])
+        result = DatabaseService.upsert_jobs(db, [make_job(1, title='Staff Engineer'), make_job(3)])
+        assert (result['inserted'], result['updated'], result['skipped']) == (1, 1, 0)
+        assert db.query(JobListing).filter(JobListing.id == 'test_1').one().title == 'Staff Engineer'
+
+    def test_conflicting_url_is_skipped_not_fatal(self, db):
+        DatabaseService.upsert_jobs(db, [make_job(1)])
+        jobs = [make_job(2, job_url=make_job(1)['job_url']), make_job(3)]
+        result = DatabaseService.upsert_jobs(db, jobs)
+        assert (result['inserted'], result['skipped']) == (1, 1)
+        assert db.query(JobListing).count() == 2
+
+    def test_duplicates_within_batch(self, db):
+        jobs = [make_job(1), make_job(1, title='Later'), make_job(2, job_url=make_job(1)['job_url'])]
+        result = DatabaseService.upsert_jobs(db, jobs)
+        assert (result['inserted'], result['skipped']) == (1, 2)
+
+    def test_insert_jobs_returns_rows_written(self, db):
+        assert DatabaseService.insert_jobs(db, [make_job(1), make_job(2)]) == 2
+        assert DatabaseService.insert_jobs(db, [make_job(1), make_job(2)]) == 0
+
+    def test_unchanged_rows_are_not_written(self, db):
+        DatabaseService.upsert_jobs(db, [make_job(1), make_job(2)])
+        before = db.query(JobListing.id, JobListing.updated_at).order_by(JobListing.id).all()
+        
+        # Same content, only scrape-time fields differ
+        result = DatabaseService.upsert_jobs(db, [
+            make_job(1, posted_date=datetime(2020, 1, 1), salary_max=100001.0),
+            make_job(2, skills_required=['SQL', 'python']),
+            make_job(3)
+        ])
+        
+        assert (result['inserted'], result['updated'], result['unchanged']) == (1, 0, 2)
+        db.expire_all()
+        assert db.query(JobListing.id, JobListing.updated_at).filter(JobListing.id != 'test_3').order_by(JobListing.id).all() == before
+        
+        result = DatabaseService.upsert_jobs(db, [make_job(2, description='Now remote-first')])
+        assert (result['updated'], result['unchanged']) == (1, 0)
+
+    def test_changed_jobs_compares_stored_hashes(self, db):
+        DatabaseService.upsert_jobs(db, [make_job(1), make_job(2)])
+        jobs = [make_job(1), make_job(2, title='Staff Engineer'), make_job(3), {**make_job(4), 'id': None}]
+        assert [job['id'] for job in DatabaseService.changed_jobs(db, jobs, chunk_size=2)] == ['test_2', 'test_3', None]
+
+
+class TestKeywordSearch:
+    def test_ranks_title_matches_first(self, db):
+        DatabaseService.upsert_jobs(db, [
+            make_job(1, title='Data Analyst', description='Some kubernetes work'),
+            make_job(2, title='Kubernetes Platform Engineer', description='Run clusters'),
+            make_job(3, title='Designer', description='Figma'),
+        ])
+        results = DatabaseService.search_jobs(db, {'keyword': 'kubernetes'})
+        assert [job.id for job in results] == ['test_2', 'test_1']
+
+    def test_index_follows_updates(self, db):
+        DatabaseService.upsert_jobs(db, [make_job(1, title='Rust Engineer')])
+        DatabaseService.upsert_jobs(db, [make_job(1, title='Go Engineer')])
+        assert DatabaseService.search_jobs(db, {'keyword': 'rust'}) == []
+        assert [job.id for job in DatabaseService.search_jobs(db, {'keyword': 'go engineer'})] == ['test_1']
+
+    def test_prefix_and_other_filters(self, db):
+        DatabaseService.upsert_jobs(db, [
+            make_job(1, title='Machine Learning Engineer', experience_level='senior'),
+            make_job(2, title='Machine Learning Intern', experience_level='entry'),
+        ])
+        results = DatabaseService.search_jobs(db, {'keyword': 'learn', 'experience_level': 'senior'})
+        assert [job.id for job in results] == ['test_1']
+
+
+class TestKeysetPagination:
+    def walk(self, db, query):
+        pages = []
+        cursor = None
+        while True:
+            page = DatabaseService.search_jobs_page(db, {**query, 'cursor': cursor})
+            pages.append([job.id for job in page['jobs']])
+            cursor = page['next_cursor']
+            if not cursor:
+                return pages
+
+    def test_pages_are_stable_and_complete(self, db):
+        from datetime import datetime
+        DatabaseService.upsert_jobs(db, [make_job(i, posted_date=datetime(2024, 1, 1 + i % 3)) for i in range(10)])
+        pages = self.walk(db, {'limit': 3})
+        flat = [job_id for page in pages for job_id in page]
+        assert [len(page) for page in pages] == [3, 3, 3, 1]
+        assert sorted(flat) == sorted(f"test_{i}" for i in range(10))
+        assert flat == [job.id for job in DatabaseService.search_jobs(db, {'limit': 10})]
+
+    def test_relevance_order_paginates(self, db):
+        DatabaseService.upsert_jobs(db, [
+            make_job(i, title='Python Engineer' if i % 2 else 'Engineer', description='python ' * (i + 1))
+            for i in range(8)
+        ])
+        pages = self.walk(db, {'keyword': 'python', 'limit': 3})
+        flat = [job_id for page in pages for job_id in page]
+        assert len(flat) == len(set(flat)) == 8
+        assert flat == [job.id for job in DatabaseService.search_jobs(db, {'keyword': 'python', 'limit': 8})]
+
+    def test_cursor_is_bound_to_sort_order(self, db):
+        from backend.utils.pagination import InvalidCursorError
+        DatabaseService.upsert_jobs(db, [make_job(i) for i in range(3)])
+        cursor = DatabaseService.search_jobs_page(db, {'limit': 1})['next_cursor']
+        with pytest.raises(InvalidCursorError):
+            DatabaseService.search_jobs_page(db, {'keyword': 'engineer', 'cursor': cursor})
+    
+    def test_offset_still_pages(self, db):
+        DatabaseService.upsert_jobs(db, [make_job(i, posted_date=datetime(2024, 1, 1 + i)) for i in range(5)])
+        page = DatabaseService.search_jobs_page(db, {'limit': 2, 'offset': 2})
+        assert [job.id for job in page['jobs']] == ['test_2', 'test_1']
+
+
+class TestSkillAssociations:
+    def test_skills_are_linked_on_ingest(self, db):
+        DatabaseService.upsert_jobs(db, [make_job(1, skills_required=['Python', 'K8s'])])
+        job = DatabaseService.get_job_by_id(db, 'test_1')
+        assert sorted(job.skill_names) == ['kubernetes', 'python']
+        assert db.query(JobSkill).count() == 2
+
+    def test_updates_replace_links_and_reuse_dictionary(self, db):
+        DatabaseService.upsert_jobs(db, [make_job(1, skills_required=['python', 'sql'])])
+        DatabaseService.upsert_jobs(db, [make_job(1, skills_required=['python', 'aws']), make_job(2, skills_required=['sql'])])
+        assert sorted(DatabaseService.get_job_by_id(db, 'test_1').skill_names) == ['aws', 'python']
+        assert sorted(s.skill_name for s in db.query(JobSkill)) == ['aws', 'python', 'sql']
+
+    def test_skill_filter_any_and_all(self, db):
+        DatabaseService.upsert_jobs(db, [
+            make_job(1, skills_required=['python', 'sql']),
+            make_job(2, skills_required=['python']),
+            make_job(3, skills_required=['go']),
+        ])
+        def ids(**query):
+            return sorted(job.id for job in DatabaseService.search_jobs(db, query))
+        assert ids(skills=['python', 'sql']) == ['test_1', 'test_2']
+        assert ids(skills=['python', 'SQL'], skills_match='all') == ['test_1']
+        assert ids(skills=['golang']) == ['test_3']
+        assert ids(skills=['rust']) == []
+
+    def test_backfill_links_legacy_rows(self, db):
+        db.add(JobListing(id='legacy', title='Old', skills_required='python,sql'))
+        db.commit()
+        assert DatabaseService.backfill_job_skills(db) == 1
+        assert sorted(DatabaseService.get_job_by_id(db, 'legacy').skill_names) == ['python', 'sql']
+        assert DatabaseService.backfill_job_skills(db) == 0
+
+
+class TestPrecomputedFeatures:
+    def setup_method(self):
+        from backend.models.ml_models import SalaryPredictionModel
+        from backend.pipelines.enrichment import JobEnricher
+        self.enricher = JobEnricher(salary_model=SalaryPredictionModel())
+
+    def test_enriched_columns_are_stored(self, db):
+        jobs = self.enricher.enrich([make_job(1, title='Senior Data Engineer'), make_job(2, salary_max=None)])
+        DatabaseService.upsert_jobs(db, jobs)
+        stored = db.query(JobListing).filter(JobListing.id == 'test_1').one()
+        assert stored.category == 'data-engineering'
+        assert stored.salary_score == pytest.approx(100001 / 150000)
+        assert stored.features_version == self.enricher.version
+        assert db.query(JobListing).filter(JobListing.id == 'test_2').one().salary_score > 0
+
+    def test_refresh_stale_rewrites_old_versions_only(self, db):
+        DatabaseService.upsert_jobs(db, self.enricher.enrich([make_job(1)]) + [make_job(2)])
+        assert self.enricher.refresh_stale(db) == 1
+        assert self.enricher.refresh_stale(db) == 0
+        
+        self.enricher.salary_model.version = 'retrained'
+        assert self.enricher.refresh_stale(db, chunk_size=1) == 2
+        versions = {job.features_version for job in db.query(JobListing)}
+        assert versions == {self.enricher.version}
+
+    def test_sort_by_score_pages_descending(self, db):
+        jobs = self.enricher.enrich([make_job(i, salary_max=50000 + i * 10000) for i in range(5)])
+        DatabaseService.upsert_jobs(db, jobs + [make_job(9)])
+        first = DatabaseService.search_jobs_page(db, {'sort_by': 'salary_score', 'limit': 3})
+        second = DatabaseService.search_jobs_page(
+            db, {'sort_by': 'salary_score', 'limit': 3, 'cursor': first['next_cursor']}
+        )
+        ids = [job.id for job in first['jobs'] + second['jobs']]
+        assert ids == ['test_4', 'test_3', 'test_2', 'test_1', 'test_0']
+        assert second['next_cursor'] is None
+
+    def test_min_score_filter(self, db):
+        jobs = self.enricher.enrich([make_job(i, salary_max=50000 + i * 50000) for i in range(3)])
+        DatabaseService.upsert_jobs(db, jobs)
+        results = DatabaseService.search_jobs(db, {'min_salary_score': 0.6})
+        assert sorted(job.id for job in results) == ['test_1', 'test_2']
+
+
+class TestStatisticsRollups:
+    def assert_matches_rebuild(self, db):
+        incremental = DatabaseService.get_statistics(db)
+        DatabaseService.rebuild_statistics(db)
+        rebuilt = DatabaseService.get_statistics(db)
+        key = lambda item: str(item['level'])
+        incremental['experience_distribution'].sort(key=key)
+        rebuilt['experience_distribution'].sort(key=key)
+        assert incremental == rebuilt
+        return incremental
+
+    def test_counts_follow_inserts_updates_and_deletes(self, db):
+        DatabaseService.upsert_jobs(db, [
+            make_job(i, company=['Acme', 'Globex'][i % 2], experience_level=['entry', 'senior'][i % 2],
+                     remote_type=['fully-remote', 'hybrid'][i % 2], salary_max=None if i == 3 else 100000 + i)
+            for i in range(6)
+        ], chunk_size=4)
+        stats = self.assert_matches_rebuild(db)
+        assert stats['total_jobs'] == 6
+        assert stats['avg_salary'] == pytest.approx((600015 - 100003) / 5)
+        assert stats['remote_percentage'] == 50
+
+        # Re-scrape moves jobs between groups
+        DatabaseService.upsert_jobs(db, [
+            make_job(1, company='Initech', experience_level='mid', remote_type='fully-remote', salary_max=200000),
+            make_job(3, company='Acme', salary_max=90000),
+        ])
+        stats = self.assert_matches_rebuild(db)
+        assert stats['top_companies'][0] == {'name': 'Acme', 'count': 4}
+        assert stats['remote_percentage'] == pytest.approx(100 * 5 / 6)
+
+        assert DatabaseService.delete_jobs(db, ['test_0', 'test_1', 'missing']) == 2
+        stats = self.assert_matches_rebuild(db)
+        assert stats['total_jobs'] == 4
+        assert 'Initech' not in [c['name'] for c in stats['top_companies']]
+
+    def test_skipped_rows_do_not_count(self, db):
+        DatabaseService.upsert_jobs(db, [make_job(1), make_job(2, job_url=make_job(1)['job_url'])])
+        assert self.assert_matches_rebuild(db)['total_jobs'] == 1
+
+    def test_rebuild_reconciles_drift(self, db):
+        from backend.models.database import JobStatRollup
+        DatabaseService.upsert_jobs(db, [make_job(i) for i in range(3)])
+        db.query(JobStatRollup).delete()
+        db.commit()
+        assert DatabaseService.get_statistics(db)['total_jobs'] == 0
+        DatabaseService.rebuild_statistics(db)
+        assert DatabaseService.get_statistics(db)['total_jobs'] == 3
+
+
+class TestMarketAnalytics:
+    def test_skill_aggregates_match_trend_model(self, db):
+        from backend.models.ml_models import SkillTrendModel
+        jobs = [
+            make_job(i, skills_required=[['python', 'sql'], ['python'], ['go', 'sql'], ['python', 'aws']][i % 4],
+                     salary_max=90000 + i * 5000)
+            for i in range(12)
+        ]
+        DatabaseService.upsert_jobs(db, jobs)
+        DatabaseService.refresh_analytics(db)
+        
+        stored = {skill.skill_name: skill for skill in db.query(JobSkill)}
+        for name in ('python', 'sql', 'go', 'aws'):
+            expected = SkillTrendModel.calculate_skill_score(name, jobs)
+            assert stored[name].frequency == expected['count']
+            assert stored[name].average_salary_impact == pytest.approx(expected['avg_salary_impact'])
+            assert stored[name].trend_direction == expected['trend']
+        top = DatabaseService.get_market_analytics(db, top_skills=2)['top_skills']
+        assert [s['skill_name'] for s in top] == ['python', 'sql']
+
+    def test_unlinked_skills_reset(self, db):
+        DatabaseService.upsert_jobs(db, [make_job(1, skills_required=['rust'])])
+        DatabaseService.refresh_analytics(db)
+        DatabaseService.delete_jobs(db, ['test_1'])
+        DatabaseService.refresh_analytics(db)
+        assert db.query(JobSkill).filter(JobSkill.skill_name == 'rust').one().frequency == 0
+        assert DatabaseService.get_market_analytics(db)['top_skills'] == []
+
+    def test_week_over_week_growth(self, db):
+        from datetime import datetime, timedelta
+        from backend.utils.analytics import refresh_market_analytics
+        now = datetime(2024, 6, 15)
+        DatabaseService.upsert_jobs(db, [
+            make_job(i, posted_date=now - timedelta(days=days))
+            for i, days in enumerate([1, 2, 3, 8, 9, 30])
+        ])
+        assert refresh_market_analytics(db, now=now)['job_growth_rate'] == pytest.approx(50.0)
+        assert DatabaseService.get_market_analytics(db)['job_growth_rate'] == pytest.approx(50.0)
+
+
+class TestSchemaUpgrade:
+    def test_existing_tables_gain_new_columns_and_indexes(self, tmp_path):
+        from sqlalchemy import create_engine, inspect, text
+        from backend.models.database import Base
+        from backend.utils.schema import upgrade_schema
+        
+        engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+        with engine.begin() as conn:
+            # job_listings as first released
+            conn.execute(text(
+                "CREATE TABLE job_listings (id VARCHAR PRIMARY KEY, title VARCHAR, company VARCHAR, "
+                "location VARCHAR, job_url VARCHAR UNIQUE, description TEXT, salary_min FLOAT, salary_max FLOAT, "
+                "salary_currency VARCHAR, job_type VARCHAR, experience_level VARCHAR, skills_required TEXT, "
+                "remote_type VARCHAR, posted_date DATETIME, source VARCHAR, is_featured BOOLEAN, "
+                "salary_score FLOAT, growth_potential FLOAT, match_score FLOAT, "
+                "created_at DATETIME, updated_at DATETIME)"
+            ))
+            conn.execute(text("CREATE INDEX idx_posted_date ON job_listings (posted_date)"))
+            conn.execute(text("INSERT INTO job_listings (id, title) VALUES ('old_1', 'Engineer')"))
+        
+        Base.metadata.create_all(bind=engine)
+        changes = upgrade_schema(engine)
+        
+        columns = {column['name'] for column in inspect(engine).get_columns('job_listings')}
+        assert {'company_type', 'category', 'features_version', 'content_hash'} <= columns
+        indexes = {index['name']: index['column_names'] for index in inspect(engine).get_indexes('job_listings')}
+        assert indexes['idx_posted_date'] == ['posted_date', 'id']
+        assert 'idx_match_score' in indexes
+        assert changes and upgrade_schema(engine) == []
+        
+        session = sessionmaker(bind=engine)()
+        assert DatabaseService.get_job_by_id(session, 'old_1').content_hash is None
+        session.close()
+        engine.dispose()
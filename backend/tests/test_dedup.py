@@ -0,0 +1,108 @@
+"""
+Unit tests for near-duplicate detection
+"""
+import random
+import pytest
+from backend.models.database import JobListing
+from backend.pipelines.dedup import MinHasher, NearDuplicateDetector, lsh_params
+from backend.utils.database import DatabaseService
+from backend.tests.conftest import ListScraper, run_pipeline
+
+WORDS = (
+    "build scalable data pipelines with python spark and airflow partner with analysts "
+    "own services end to end mentor engineers design apis improve reliability ship models "
+    "to production monitor latency reduce costs automate deployments review code"
+).split()
+
+
+def posting(i, source, **overrides):
+    rng = random.Random(i)
+    job = {
+        'id': f"{source}_{i}",
+        'title': f"Data Engineer {i}",
+        'company': f"Company {i}",
+        'location': 'Remote',
+        'job_url': f"https://{source}.example.com/{i}",
+        'description': ' '.join(rng.choice(WORDS) for _ in range(80)),
+        'skills_required': ['python'],
+        'source': source
+    }
+    job.update(overrides)
+    return job
+
+
+def repost(job, source):
+    """The same posting on another board: new id and url, a sentence appended"""
+    return {
+        **job,
+        'id': job['id'].replace(job['source'], source),
+        'job_url': job['job_url'].replace(job['source'], source),
+        'description': job['description'] + ' Apply through our careers page.',
+        'source': source
+    }
+
+
+def test_signature_similarity_estimates_jaccard():
+    hasher = MinHasher(num_perm=256)
+    a, b = posting(1, 'x')['description'], posting(2, 'x')['description']
+    b = ' '.join(a.split()[:60] + b.split()[60:])
+    shingles_a, shingles_b = hasher.shingles(a), hasher.shingles(b)
+    jaccard = len(shingles_a & shingles_b) / len(shingles_a | shingles_b)
+    assert hasher.similarity(hasher.signature(a), hasher.signature(b)) == pytest.approx(jaccard, abs=0.1)
+
+
+def test_lsh_params_use_the_permutations():
+    bands, rows = lsh_params(0.8, 128)
+    assert bands * rows <= 128
+    assert rows > 1 and bands > 1
+
+
+def test_cross_source_reposts_are_grouped(db):
+    originals = [posting(i, 'boarda') for i in range(20)]
+    reposts = [repost(job, 'boardb') for job in originals[:5]]
+    result = run_pipeline(db, ListScraper(originals, source='boarda'), ListScraper(reposts, source='boardb'))
+
+    assert (result['processed'], result['inserted'], result['duplicates']) == (25, 20, 5)
+    assert result['dedup_ratio'] == pytest.approx(0.2)
+    assert db.query(JobListing).filter(JobListing.source == 'boardb').count() == 0
+    assert DatabaseService.get_job_duplicates(db, 'boarda_0') == ['boardb_0']
+
+
+def test_index_persists_across_runs(db):
+    originals = [posting(i, 'boarda') for i in range(10)]
+    run_pipeline(db, ListScraper(originals, source='boarda'))
+
+    jobs = [repost(job, 'boardc') for job in originals[:3]] + [posting(50, 'boardc')]
+    result = run_pipeline(db, ListScraper(jobs, source='boardc'))
+    assert (result['inserted'], result['duplicates']) == (1, 3)
+
+
+def test_different_roles_with_shared_boilerplate_stay_apart(db):
+    detector = NearDuplicateDetector()
+    base = posting(1, 'boarda')
+    jobs = [base, {**base, 'id': 'boarda_2', 'job_url': 'https://boarda.example.com/2', 'title': 'Analytics Engineer'}]
+    kept, duplicates, _ = detector.filter(db, jobs)
+    assert (len(kept), duplicates) == (2, {})
+
+
+def test_deleting_canonical_releases_its_duplicates(db):
+    original = posting(1, 'boarda')
+    run_pipeline(db, ListScraper([original], source='boarda'), ListScraper([repost(original, 'boardb')], source='boardb'))
+
+    DatabaseService.delete_jobs(db, ['boarda_1'])
+    result = run_pipeline(db, ListScraper([repost(original, 'boardb')], source='boardb'))
+    assert (result['inserted'], result['duplicates']) == (1, 0)
+
+
+def test_skipped_posting_does_not_absorb_reposts(db):
+    owner = posting(1, 'boarda')
+    run_pipeline(db, ListScraper([owner], source='boarda'))
+    # A different posting that reuses boarda_1's url is skipped by the upsert
+    skipped = posting(2, 'boardb', job_url=owner['job_url'])
+    result = run_pipeline(db, ListScraper([skipped], source='boardb'))
+    assert (result['inserted'], result['skipped']) == (0, 1)
+
+    reposted = {**repost(skipped, 'boardc'), 'job_url': 'https://boardc.example.com/2'}
+    result = run_pipeline(db, ListScraper([reposted], source='boardc'))
+    assert (result['inserted'], result['duplicates']) == (1, 0)
+    assert db.get(JobListing, 'boardc_2') is not None
@@ -0,0 +1,57 @@
+"""
+Unit tests for the task executor
+"""
+import asyncio
+import threading
+import time
+import pytest
+from backend.utils.executor import ExecutorBusyError, ExecutorTimeoutError, TaskExecutor
+
+
+def sum_of_squares(n):
+    return sum(i * i for i in range(n))
+
+
+@pytest.fixture
+def executor():
+    executor = TaskExecutor(thread_workers=2, process_workers=0, max_pending=2)
+    yield executor
+    executor.shutdown()
+
+
+def test_inference_result_and_metrics(executor):
+    assert asyncio.run(executor.run_inference(sum_of_squares, 10)) == 285
+    stats = executor.stats()['inference']
+    assert (stats['submitted'], stats['completed'], stats['in_flight']) == (1, 1, 0)
+
+
+def test_rejects_when_pending_limit_reached(executor):
+    release = threading.Event()
+    futures = [executor.inference.submit(release.wait) for _ in range(2)]
+    with pytest.raises(ExecutorBusyError):
+        executor.inference.submit(release.wait)
+    release.set()
+    for future in futures:
+        future.result(timeout=5)
+    assert executor.stats()['inference']['rejected'] == 1
+    assert asyncio.run(executor.run_inference(sum_of_squares, 3)) == 5
+
+
+def test_timeout_keeps_slot_until_task_ends(executor):
+    with pytest.raises(ExecutorTimeoutError):
+        asyncio.run(executor.run_inference(time.sleep, 0.3, timeout=0.05))
+    stats = executor.stats()['inference']
+    assert stats['timed_out'] == 1
+    assert stats['in_flight'] == 1
+    time.sleep(0.4)
+    assert executor.stats()['inference']['in_flight'] == 0
+
+
+def test_background_runs_in_process_pool():
+    executor = TaskExecutor(thread_workers=1, process_workers=1, max_pending=2)
+    try:
+        assert asyncio.run(executor.run_background(sum_of_squares, 1000)) == sum_of_squares(1000)
+        assert executor.run_background_sync(sum_of_squares, 10) == 285
+        assert executor.stats()['background']['completed'] == 2
+    finally:
+        executor.shutdown()
@@ -0,0 +1,104 @@
+"""
+Unit tests for database leases and scheduler leader election
+"""
+import multiprocessing
+import time
+from datetime import timedelta
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from backend.config import settings
+from backend.utils.lease import DatabaseLease
+from backend.utils.scheduler import JobScheduler
+
+
+def session_factory(path):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"timeout": 30})
+    return sessionmaker(bind=engine)
+
+
+def contend(path, results, barrier):
+    """One replica's scheduled tick: lead, then run the 6-hourly task at most once"""
+    scheduler = JobScheduler(session_factory(path))
+    barrier.wait()
+    ran = scheduler.run_scheduled('refresh_jobs', JobScheduler.REFRESH_INTERVAL, lambda: None)
+    results.put((scheduler.holder, scheduler.is_leader, ran))
+
+
+@pytest.fixture
+def sessions(db):
+    return sessionmaker(bind=db.get_bind())
+
+
+def test_lease_is_exclusive_until_it_expires(sessions):
+    first = DatabaseLease('scheduler', 0.2, 'replica-a', sessions)
+    second = DatabaseLease('scheduler', 0.2, 'replica-b', sessions)
+
+    assert first.acquire()
+    assert not second.acquire()
+    assert first.acquire()  # renewal
+    assert second.current()['holder'] == 'replica-a'
+
+    time.sleep(0.25)
+    assert second.acquire()
+    assert not first.acquire()
+
+
+def test_release_hands_over_at_once(sessions):
+    first = DatabaseLease('scheduler', 60, 'replica-a', sessions)
+    second = DatabaseLease('scheduler', 60, 'replica-b', sessions)
+    assert first.acquire()
+
+    first.release()
+    assert second.acquire()
+
+
+def test_claim_does_not_renew(sessions):
+    period = DatabaseLease('task:refresh_jobs', 60, 'replica-a', sessions)
+    assert period.claim()
+    assert not period.claim()
+
+
+def test_leader_failover(sessions, monkeypatch):
+    monkeypatch.setattr(settings, 'scheduler_lease_ttl', 0.2)
+    leader, standby = JobScheduler(sessions), JobScheduler(sessions)
+    runs = []
+
+    assert leader.heartbeat()
+    assert not standby.run_scheduled('update_models', JobScheduler.RETRAIN_INTERVAL, lambda: runs.append('standby'))
+
+    time.sleep(0.25)  # the leader stops heartbeating
+    assert standby.heartbeat() and not leader.heartbeat()
+    assert standby.run_scheduled('update_models', JobScheduler.RETRAIN_INTERVAL, lambda: runs.append('standby'))
+    assert runs == ['standby']
+
+
+def test_new_leader_does_not_repeat_the_period(sessions, monkeypatch):
+    monkeypatch.setattr(settings, 'scheduler_lease_ttl', 0.2)
+    leader, standby = JobScheduler(sessions), JobScheduler(sessions)
+    runs = []
+
+    assert leader.run_scheduled('refresh_jobs', JobScheduler.REFRESH_INTERVAL, lambda: runs.append('leader'))
+    time.sleep(0.25)
+    assert not standby.run_scheduled('refresh_jobs', JobScheduler.REFRESH_INTERVAL, lambda: runs.append('standby'))
+    assert standby.is_leader and runs == ['leader']
+
+
+def test_task_runs_once_across_processes(db):
+    path = db.get_bind().url.database
+    context = multiprocessing.get_context('spawn')
+    replicas = 4
+    results, barrier = context.Queue(), context.Barrier(replicas)
+    processes = [context.Process(target=contend, args=(path, results, barrier)) for _ in range(replicas)]
+    for process in processes:
+        process.start()
+    outcomes = [results.get(timeout=60) for _ in processes]
+    for process in processes:
+        process.join(timeout=10)
+
+    assert len({holder for holder, _, _ in outcomes}) == replicas
+    assert sum(leader for _, leader, _ in outcomes) == 1
+    assert sum(ran for _, _, ran in outcomes) == 1
+    assert DatabaseLease('scheduler', 1, session_factory=session_factory(path)).current()['holder'] in {
+        holder for holder, leader, _ in outcomes if leader
+    }
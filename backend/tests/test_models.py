@@ -1,8 +1,10 @@
 """
 Unit tests for ML models
 """
+import numpy as np
 import pytest
-from backend.models.ml_models import SalaryPredictionModel, JobRecommendationModel
+from backend.config import settings
+from backend.models.ml_models import SalaryPredictionModel, JobRecommendationModel, JobCandidates
 
 
 class TestSalaryPredictionModel:
@@ -32,6 +34,226 @@ class TestSalaryPredictionModel:
         assert max_sal > min_sal
 
 
+class TestSalaryBatchPrediction:
+    def setup_method(self):
+        import random
+        rng = random.Random(3)
+        self.jobs = [
+            {
+                'experience_level': rng.choice(['entry', 'mid', 'senior', 'lead']),
+                'skills_required': ['python'] * rng.randint(0, 6),
+                'remote_type': rng.choice(['fully-remote', 'hybrid', 'on-site']),
+                'company': rng.choice(['Google', 'Acme Inc', 'Tiny Startup']),
+                'location': rng.choice(['Seattle, WA', 'Denver, CO', 'Remote']),
+                'salary_max': rng.randint(60, 250) * 1000
+            }
+            for _ in range(120)
+        ]
+        self.model = SalaryPredictionModel()
+        self.model.save = lambda: None
+
+    def test_baseline_batch_matches_single(self):
+        assert self.model.predict_batch(self.jobs) == [self.model.predict(job) for job in self.jobs]
+
+    def test_trained_batch_matches_single(self):
+        self.model.train(self.jobs)
+        assert self.model.predict_batch(self.jobs) == [self.model.predict(job) for job in self.jobs]
+
+    def test_empty_batch(self):
+        assert self.model.predict_batch([]) == []
+
+
+class TestSalaryFeatureEncoder:
+    def test_encodes_columns(self):
+        from backend.models.features import SalaryFeatureEncoder
+        X = SalaryFeatureEncoder().encode_jobs([
+            {'experience_level': 'Senior', 'skills_required': ['python', 'aws', 'sql'],
+             'remote_type': 'fully-remote', 'company': 'Google', 'location': 'Seattle, WA'},
+            {'experience_level': None, 'skills_required': None, 'remote_type': 'hybrid',
+             'company': 'Acme Inc', 'location': 'Denver, CO'},
+            {}
+        ])
+        assert X.tolist() == [
+            [0.9, 3, 1.15, 0.95, 1.0],
+            [0.6, 0, 1.0, 0.7, 0.8],
+            [0.6, 0, 1.0, 0.5, 0.6]
+        ]
+    
+    def test_lookup_cache_is_bounded(self):
+        from backend.models.features import SalaryFeatureEncoder
+        encoder = SalaryFeatureEncoder(cache_size=4)
+        companies = [f"Company {i % 10}" for i in range(100)]
+        encoder.encode(['mid'] * 100, [0] * 100, ['on-site'] * 100, companies, ['Remote'] * 100)
+        assert encoder.cache_info()['company_tier']['currsize'] == 4
+        assert encoder.cache_info()['location_tier']['hits'] == 99
+    
+    def test_model_serves_with_its_training_vocabulary(self, tmp_path):
+        from backend.models.features import DEFAULT_SALARY_VOCABULARY, SalaryFeatureEncoder
+        vocabulary = {**DEFAULT_SALARY_VOCABULARY, 'company_tiers': [[0.9, ['acme']]]}
+        batch = TestSalaryBatchPrediction()
+        batch.setup_method()
+        model = SalaryPredictionModel(models_dir=str(tmp_path))
+        model.encoder = SalaryFeatureEncoder(vocabulary)
+        model.train(batch.jobs)
+        
+        loaded = SalaryPredictionModel(models_dir=str(tmp_path))
+        assert loaded.load()
+        assert loaded.encoder.vocabulary == vocabulary
+        assert loaded.encoder.company_tier('Acme Inc') == 0.9
+
+
+class TestCompiledForest:
+    def test_matches_sklearn_with_folded_scaler(self):
+        import numpy as np
+        from sklearn.ensemble import RandomForestRegressor
+        from sklearn.preprocessing import StandardScaler
+        from backend.models.forest import CompiledForest
+        
+        rng = np.random.default_rng(0)
+        X = rng.normal(size=(800, 5)) * [1, 10, 0.1, 1000, 3] + [0, 5, 1, -200, 0]
+        y = X @ rng.normal(size=5) + rng.normal(size=800)
+        scaler = StandardScaler().fit(X)
+        forest = RandomForestRegressor(n_estimators=20, random_state=0, n_jobs=1).fit(scaler.transform(X), y)
+        
+        compiled = CompiledForest.from_sklearn(forest, scaler)
+        unseen = rng.normal(size=(300, 5)) * [1, 10, 0.1, 1000, 3]
+        
+        for rows in (X, unseen):
+            assert (compiled.predict(rows) == forest.predict(scaler.transform(rows))).all()
+        assert compiled.predict_one(unseen[0]) == forest.predict(scaler.transform(unseen[:1]))[0]
+    
+    def test_unfoldable_threshold_raises(self):
+        import numpy as np
+        from backend.models.forest import _raw_thresholds
+        
+        with pytest.raises(ValueError):
+            _raw_thresholds(np.array([np.nan]), np.array([0.0]), np.array([1.0]))
+    
+    def test_salary_model_predicts_like_sklearn(self, tmp_path):
+        import numpy as np
+        batch = TestSalaryBatchPrediction()
+        batch.setup_method()
+        model = SalaryPredictionModel(models_dir=str(tmp_path))
+        model.train(batch.jobs)
+        
+        X = model.encoder.encode_jobs(batch.jobs)
+        model.model.set_params(n_jobs=1)  # sums trees in order, like the compiled forest
+        expected = model.model.predict(model.scaler.transform(X))
+        assert [high for _, high in model.predict_batch(batch.jobs)] == [max(60000, v) for v in expected]
+        
+        loaded = SalaryPredictionModel(models_dir=str(tmp_path))
+        assert loaded.load()
+        assert loaded.predict_batch(batch.jobs) == model.predict_batch(batch.jobs)
+        assert loaded._model is None  # served without unpickling the sklearn forest
+        assert len(loaded.model.estimators_) == len(model.model.estimators_)
+
+
+class TestStreamingTraining:
+    def setup_method(self):
+        import random
+        rng = random.Random(5)
+        self.jobs = [
+            {
+                'id': f"job_{i:03d}",
+                'title': f"Engineer {i}",
+                'job_url': f"https://example.com/{i}",
+                'source': 'test',
+                'experience_level': rng.choice(['entry', 'mid', 'senior', 'lead']),
+                'skills_required': rng.sample(['python', 'sql', 'aws', 'docker', 'react'], rng.randint(0, 5)),
+                'remote_type': rng.choice(['fully-remote', 'hybrid', 'on-site']),
+                'company': rng.choice(['Google', 'Acme Inc', 'Tiny Startup']),
+                'location': rng.choice(['Seattle, WA', 'Denver, CO', 'Remote']),
+                'salary_max': rng.randint(60, 250) * 1000
+            }
+            for i in range(60)
+        ]
+    
+    def test_matrix_matches_per_job_features(self, db):
+        from backend.utils.database import DatabaseService
+        unpaid = {**self.jobs[0], 'id': 'job_unpaid', 'job_url': 'https://example.com/unpaid', 'salary_max': None}
+        DatabaseService.upsert_jobs(db, self.jobs + [unpaid])
+        
+        model = SalaryPredictionModel()
+        X, y = model.training_matrix(db, chunk_size=7)
+        
+        assert X.tolist() == model.encoder.encode_jobs(self.jobs).tolist()
+        assert y.tolist() == [job['salary_max'] for job in self.jobs]
+    
+    def test_incremental_retrain_fits_only_new_rows(self, db, tmp_path):
+        from backend.utils.database import DatabaseService
+        DatabaseService.upsert_jobs(db, self.jobs[:40])
+        model = SalaryPredictionModel(models_dir=str(tmp_path))
+        
+        first = model.train_from_db(db)
+        assert (first['mode'], first['rows']) == ('full', 40)
+        
+        DatabaseService.upsert_jobs(db, self.jobs[40:])
+        reloaded = SalaryPredictionModel(models_dir=str(tmp_path))
+        assert reloaded.load()
+        second = reloaded.train_from_db(db)
+        
+        assert (second['mode'], second['rows'], second['replayed_rows']) == ('incremental', 20, 20)
+        assert second['trees'] == first['trees'] * 3 // 2  # in proportion to 20 rows on top of 40
+        assert reloaded.training_samples == 60
+        assert reloaded.train_from_db(db)['mode'] == 'skipped'
+        assert reloaded.train_from_db(db, incremental=False)['rows'] == 60
+    
+    def test_small_batches_wait_and_large_ones_rebuild(self, db, tmp_path, monkeypatch):
+        from backend.utils.database import DatabaseService
+        monkeypatch.setattr(settings, 'training_min_update_fraction', 0.1)
+        monkeypatch.setattr(settings, 'training_max_update_fraction', 0.3)
+        DatabaseService.upsert_jobs(db, self.jobs[:40])
+        model = SalaryPredictionModel(models_dir=str(tmp_path))
+        model.train_from_db(db)
+        
+        DatabaseService.upsert_jobs(db, self.jobs[40:43])
+        assert model.train_from_db(db)['mode'] == 'deferred'
+        DatabaseService.upsert_jobs(db, self.jobs[43:46])
+        assert (model.train_from_db(db)['mode'], model.training_samples) == ('incremental', 46)
+        DatabaseService.upsert_jobs(db, self.jobs[46:55])
+        assert model.train_from_db(db)['mode'] == 'incremental'
+        
+        DatabaseService.upsert_jobs(db, [{**job, 'salary_max': job['salary_max'] + 1000} for job in self.jobs[:30]])
+        assert model.train_from_db(db)['mode'] == 'full'
+    
+    def test_incremental_error_tracks_full_retrain(self, db, tmp_path, monkeypatch):
+        import random
+        from backend.utils.database import DatabaseService
+        monkeypatch.setattr(settings, 'training_trees', 30)
+        rng = random.Random(11)
+        levels = {'entry': 70000, 'mid': 100000, 'senior': 140000, 'lead': 180000}
+        
+        def job(i):
+            level = rng.choice(list(levels))
+            skills = rng.sample(['python', 'sql', 'aws', 'docker', 'react'], rng.randint(0, 5))
+            return {
+                'id': f"job_{i:04d}", 'title': 'Engineer', 'job_url': f"https://example.com/{i}", 'source': 'test',
+                'experience_level': level, 'skills_required': skills,
+                'remote_type': rng.choice(['fully-remote', 'hybrid', 'on-site']),
+                'company': rng.choice(['Google', 'Acme Inc', 'Tiny Startup']),
+                'location': rng.choice(['Seattle, WA', 'Denver, CO', 'Remote']),
+                'salary_max': levels[level] + 5000 * len(skills) + rng.randint(-8000, 8000)
+            }
+        
+        jobs = [job(i) for i in range(400)]
+        held_out = [job(i) for i in range(400, 600)]
+        truth = np.array([j['salary_max'] for j in held_out], dtype=np.float64)
+        
+        def error(model):
+            return np.abs(model.forest.predict(model.encoder.encode_jobs(held_out)) - truth).mean()
+        
+        DatabaseService.upsert_jobs(db, jobs[:300])
+        incremental = SalaryPredictionModel(models_dir=str(tmp_path / 'incremental'))
+        incremental.train_from_db(db)
+        for start in range(300, 400, 25):
+            DatabaseService.upsert_jobs(db, jobs[start:start + 25])
+            assert incremental.train_from_db(db)['mode'] == 'incremental'
+        
+        full = SalaryPredictionModel(models_dir=str(tmp_path / 'full'))
+        assert full.train_from_db(db)['rows'] == 400
+        assert error(incremental) <= error(full) * 1.1
+
+
 class TestJobRecommendationModel:
     def setup_method(self):
         self.model = JobRecommendationModel()
@@ -62,3 +284,54 @@ class TestJobRecommendationModel:
         }
         score = self.model.calculate_growth_potential(job)
         assert 0 <= score <= 1
+
+
+class TestVectorizedRanking:
+    def setup_method(self):
+        import random
+        rng = random.Random(7)
+        self.model = JobRecommendationModel()
+        skills = ['python', 'sql', 'aws', 'go', 'rust', 'spark']
+        self.jobs = [
+            {
+                'id': f"job_{i}",
+                'experience_level': rng.choice(['entry', 'mid', 'senior']),
+                'skills_required': rng.sample(skills, rng.randint(0, 4)),
+                'salary_max': rng.choice([60000, 90000, 140000, 200000]),
+                'location': rng.choice(['San Francisco, CA', 'Remote', 'Austin, TX']),
+                'remote_type': rng.choice(['fully-remote', 'hybrid', 'on-site'])
+            }
+            for i in range(200)
+        ]
+        # Postings without a salary, stored as NULL or never scraped
+        self.jobs[0]['salary_max'] = None
+        del self.jobs[1]['salary_max']
+        self.candidates = JobCandidates(self.jobs)
+
+    def test_scores_match_single_job_path(self):
+        for prefs in [
+            {'experience_level': 'senior', 'skills': ['Python', 'AWS', 'kotlin'], 'salary_min': 120000,
+             'location': 'san francisco', 'remote_preference': 'fully-remote'},
+            {'experience_level': 'mid', 'skills': [], 'salary_min': 60000, 'location': '', 'remote_preference': 'any'},
+        ]:
+            scores = self.model.score_candidates(self.candidates, prefs)
+            expected = [self.model.calculate_match_score(job, prefs) for job in self.jobs]
+            assert scores.tolist() == expected
+
+    def test_rank_returns_top_k_best_first(self):
+        prefs = {'experience_level': 'mid', 'skills': ['go', 'rust'], 'salary_min': 100000}
+        ranked = self.model.rank_jobs(self.candidates, prefs, k=10)
+        expected = sorted(
+            ((job['id'], self.model.calculate_match_score(job, prefs)) for job in self.jobs),
+            key=lambda item: -item[1]
+        )
+        assert [score for _, score in ranked] == [score for _, score in expected[:10]]
+        assert len({job_id for job_id, _ in ranked}) == 10
+
+    def test_growth_potential_batch_matches_single_job_path(self):
+        jobs = [
+            {**job, 'company_type': ['startup', 'enterprise', 'unknown'][i % 3]} if i % 4 else job
+            for i, job in enumerate(self.jobs)
+        ]
+        growth = self.model.growth_potential_batch(JobCandidates(jobs))
+        assert growth.tolist() == [self.model.calculate_growth_potential(job) for job in jobs]
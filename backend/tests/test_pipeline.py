@@ -0,0 +1,199 @@
+"""
+Unit tests for the data pipeline
+"""
+import time
+import pytest
+from backend.config import settings
+from backend.pipelines.data_pipeline import (
+    DataPipeline, DataProcessor, JobScraperBase, RemoteJobsScraperAPI
+)
+from backend.pipelines.skills import SkillMatcher
+from backend.tests.conftest import make_pipeline
+
+
+class FakeScraper(JobScraperBase):
+    def __init__(self, source, delay=0.0, count=3, fail=False):
+        super().__init__()
+        self.source = source
+        self.delay = delay
+        self.count = count
+        self.fail = fail
+
+    def scrape(self):
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("source down")
+        return [
+            {'id': f"{self.source}_{i}", 'title': 'Engineer', 'company': 'Acme',
+             'location': 'Remote', 'skills_required': ['Python']}
+            for i in range(self.count)
+        ]
+
+
+class TestConcurrentScraping:
+    def test_wall_time_tracks_slowest_source(self):
+        pipeline = make_pipeline(*(FakeScraper(f"s{i}", delay=0.2) for i in range(4)))
+        start = time.monotonic()
+        jobs = pipeline.run(concurrent=True)
+        assert len(jobs) == 12
+        assert time.monotonic() - start < 0.6
+
+    def test_slow_source_is_dropped_at_deadline(self, monkeypatch):
+        monkeypatch.setattr(settings, 'scrape_source_timeout', 0.2)
+        pipeline = make_pipeline(FakeScraper("fast"), FakeScraper("slow", delay=1.0))
+        start = time.monotonic()
+        jobs = pipeline.run(concurrent=True)
+        assert {job['id'].split('_')[0] for job in jobs} == {'fast'}
+        assert time.monotonic() - start < 0.8
+
+    def test_global_deadline_returns_partial_results(self, monkeypatch):
+        monkeypatch.setattr(settings, 'scrape_total_timeout', 0.2)
+        pipeline = make_pipeline(FakeScraper("fast"), FakeScraper("slow", delay=1.0))
+        assert len(pipeline.run(concurrent=True)) == 3
+
+    def test_time_spent_downstream_does_not_count(self, monkeypatch):
+        monkeypatch.setattr(settings, 'scrape_source_timeout', 0.2)
+        monkeypatch.setattr(settings, 'scrape_total_timeout', 0.3)
+        ids = []
+        for job in make_pipeline(FakeScraper("a"), FakeScraper("b")).stream(concurrent=True):
+            ids.append(job['id'])
+            time.sleep(0.15)  # a slow flush
+        assert len(ids) == 6
+
+    def test_source_keeps_scraping_through_a_slow_flush(self, monkeypatch):
+        monkeypatch.setattr(settings, 'scrape_source_timeout', 0.25)
+        ids = []
+        for job in make_pipeline(StreamingScraper("s", 3, delay=0.1)).stream(concurrent=True):
+            ids.append(job['id'])
+            time.sleep(0.3)  # the source's next jobs arrive while this flush is still running
+        assert len(ids) == 3
+
+    def test_jobs_queued_before_abandonment_flow_downstream(self, monkeypatch):
+        import threading
+        from types import SimpleNamespace
+        from backend.pipelines import data_pipeline
+
+        clock = [0.0]
+        monkeypatch.setattr(data_pipeline, 'time', SimpleNamespace(
+            monotonic=lambda: clock[0], perf_counter=time.perf_counter
+        ))
+        monkeypatch.setattr(settings, 'scrape_source_timeout', 10)
+        release = threading.Event()
+
+        class QueueThenStall(StreamingScraper):
+            def iter_jobs(self):
+                yield from super().iter_jobs()
+                release.wait(5)
+
+        class LateQueue(data_pipeline.Queue):
+            def get(self, block=True, timeout=None):
+                # Let the source queue everything, then jump past its deadline
+                while clock[0] < 100.0 and self.qsize() < 3:
+                    time.sleep(0.01)
+                clock[0] = 100.0
+                return super().get(block, timeout)
+
+        monkeypatch.setattr(data_pipeline, 'Queue', LateQueue)
+        try:
+            jobs = list(make_pipeline(QueueThenStall("s", 3))._scrape_concurrently())
+        finally:
+            release.set()
+        assert [job['id'] for job in jobs] == ['s_0', 's_1', 's_2']
+
+    def test_failing_source_does_not_block_others(self):
+        pipeline = make_pipeline(FakeScraper("ok"), FakeScraper("bad", fail=True))
+        assert len(pipeline.run(concurrent=True)) == 3
+
+    def test_sequential_mode_matches(self):
+        pipeline = make_pipeline(FakeScraper("a"), FakeScraper("b"))
+        assert len(pipeline.run(concurrent=False)) == 6
+
+
+class StreamingScraper(JobScraperBase):
+    def __init__(self, source, count, delay=0.0):
+        super().__init__()
+        self.source = source
+        self.count = count
+        self.delay = delay
+        self.produced = 0
+
+    def iter_jobs(self):
+        for i in range(self.count):
+            time.sleep(self.delay)
+            self.produced += 1
+            yield {'id': f"{self.source}_{i}", 'title': f"Engineer {i}", 'company': 'Acme',
+                   'location': 'Remote', 'job_url': f"https://example.com/{self.source}/{i}",
+                   'skills_required': ['Python']}
+
+
+class TestStreamingPipeline:
+    def test_stream_is_lazy(self):
+        scraper = StreamingScraper("big", 10000)
+        pipeline = make_pipeline(scraper)
+        first = next(pipeline.stream(concurrent=False))
+        assert first['id'] == 'big_0'
+        assert scraper.produced == 1
+
+    def test_bounded_queue_applies_backpressure(self, monkeypatch):
+        monkeypatch.setattr(settings, 'pipeline_queue_size', 5)
+        scraper = StreamingScraper("big", 10000)
+        stream = make_pipeline(scraper).stream(concurrent=True)
+        next(stream)
+        time.sleep(0.3)
+        assert scraper.produced <= 5 + 2
+        stream.close()
+
+    def test_max_jobs_per_scrape_caps_each_source(self, monkeypatch):
+        monkeypatch.setattr(settings, 'max_jobs_per_scrape', 7)
+        pipeline = make_pipeline(StreamingScraper("a", 100), StreamingScraper("b", 3))
+        assert len(pipeline.run(concurrent=True)) == 10
+
+    def test_run_into_commits_fixed_size_batches(self, db):
+        pipeline = make_pipeline(StreamingScraper("a", 25))
+        result = pipeline.run_into(db, batch_size=10, concurrent=False)
+        assert (result['processed'], result['inserted'], result['batches']) == (25, 25, 3)
+
+    def test_unchanged_refresh_writes_nothing(self, db):
+        from sqlalchemy import event
+        make_pipeline(StreamingScraper("a", 25)).run_into(db, batch_size=10, concurrent=False)
+        
+        writes = []
+        def count_writes(conn, cursor, statement, *args):
+            if not statement.lstrip().upper().startswith('SELECT'):
+                writes.append(statement)
+        event.listen(db.get_bind(), 'before_cursor_execute', count_writes)
+        try:
+            result = make_pipeline(StreamingScraper("a", 25)).run_into(db, batch_size=10, concurrent=False)
+        finally:
+            event.remove(db.get_bind(), 'before_cursor_execute', count_writes)
+        
+        assert (result['inserted'], result['updated'], result['unchanged']) == (0, 0, 25)
+        assert writes == []
+
+
+class TestSkillMatcher:
+    def setup_method(self):
+        self.matcher = SkillMatcher()
+
+    def test_matches_on_token_boundaries(self):
+        assert self.matcher.extract("Digital products at Google scale") == []
+        assert self.matcher.extract("Go, Git and C++ experience") == ['c++', 'git', 'go']
+
+    def test_aliases_resolve_to_canonical_names(self):
+        assert self.matcher.extract("K8s, postgres and golang") == ['go', 'kubernetes', 'postgresql']
+
+    def test_multi_token_terms(self):
+        assert self.matcher.extract("Node.js services on Google Cloud with CI/CD") == ['ci/cd', 'gcp', 'node.js']
+        assert self.matcher.extract("node.js and plain js") == ['javascript', 'node.js']
+
+    def test_custom_vocabulary(self):
+        matcher = SkillMatcher({'dbt': ['data build tool']})
+        assert matcher.extract("We use dbt (data build tool)") == ['dbt']
+
+    def test_normalize_keeps_unknown_skills(self):
+        assert self.matcher.normalize(['Python', 'K8s', 'Spark ', 'Airbyte']) == ['python', 'kubernetes', 'spark', 'airbyte']
+
+    def test_processor_and_scraper_share_matcher(self):
+        description = "Python and Kubernetes (k8s) on AWS"
+        parsed = RemoteJobsScraperAPI._parse_job({'id': 1, 'job_title': 'Engineer', 'job_description': description})
+        assert parsed['skills_required'] == DataProcessor.extract_skills(description) == ['aws', 'kubernetes', 'python']
@@ -0,0 +1,177 @@
+"""
+Unit tests for request rate limiting
+"""
+import asyncio
+import threading
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from backend.config import settings
+from backend.utils.ratelimit import (
+    LocalRateLimitBackend, RateLimiter, RateLimitMiddleware, RedisRateLimitBackend, client_key, sliding_window
+)
+from backend.utils.security import rate_limit_decorator
+
+
+class FakeRedis:
+    """Just enough of the redis client for RedisRateLimitBackend"""
+
+    def __init__(self):
+        self.data = {}
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+    def incr(self, key):
+        self.data[key] = int(self.data.get(key, 0)) + 1
+        return self.data[key]
+
+    def decr(self, key):
+        self.data[key] = int(self.data.get(key, 0)) - 1
+        return self.data[key]
+
+    def expire(self, key, ttl):
+        return True
+
+    def get(self, key):
+        value = self.data.get(key)
+        return str(value).encode() if value is not None else None
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args: self.calls.append((name, args))
+
+    def execute(self):
+        return [getattr(self.client, name)(*args) for name, args in self.calls]
+
+
+def test_limit_within_one_window():
+    backend = LocalRateLimitBackend(max_keys=10)
+    decisions = [backend.hit('a', 3, 60, now=0.0 + i) for i in range(4)]
+    assert [d.allowed for d in decisions] == [True, True, True, False]
+    assert [d.remaining for d in decisions[:3]] == [2, 1, 0]
+    # At t=60 the previous window still counts in full; just after, it starts fading
+    assert decisions[3].retry_after == 58
+    assert backend.hit('b', 3, 60, now=3.0).allowed
+
+
+def test_previous_window_is_weighted_by_overlap():
+    # 10 requests late in the last window still count fully at the start of this one
+    assert sliding_window(10, 0, 0.0, 60, 10) == (10.0, 1)
+    # Half-way through, half of them count
+    assert sliding_window(10, 4, 30.0, 60, 10)[0] == pytest.approx(9.0)
+    backend = LocalRateLimitBackend(max_keys=10)
+    for i in range(10):
+        backend.hit('a', 10, 60, now=50.0 + i * 0.1)
+    assert backend.hit('a', 10, 60, now=61.0).allowed  # 10 * 59/60 + 0 < 10
+    rejected = backend.hit('a', 10, 60, now=61.0)  # 10 * 59/60 + 1 >= 10
+    assert not rejected.allowed and rejected.retry_after == 6
+    assert not backend.hit('a', 10, 60, now=66.0).allowed
+    assert backend.hit('a', 10, 60, now=67.0).allowed
+
+
+def test_idle_callers_are_dropped():
+    backend = LocalRateLimitBackend(max_keys=1_000)
+    for i in range(500):
+        backend.hit(f"caller_{i}", 5, 10, now=1.0)
+    assert backend.info()['keys'] == 500
+
+    backend.hit('late', 5, 10, now=25.0)  # two windows later
+    assert backend.info()['keys'] == 1 and backend.info()['expirations'] == 500
+
+
+def test_key_table_is_capped():
+    backend = LocalRateLimitBackend(max_keys=100)
+    for i in range(50_000):
+        backend.hit(f"caller_{i}", 5, 60, now=1.0)
+    assert backend.info()['keys'] == 100
+    assert backend.info()['evictions'] == 49_900
+
+
+def test_redis_backend_shares_counts_across_workers():
+    client = FakeRedis()
+    worker_a, worker_b = RedisRateLimitBackend(client=client), RedisRateLimitBackend(client=client)
+    assert worker_a.hit('a', 2, 60, now=1.0).allowed
+    assert worker_b.hit('a', 2, 60, now=2.0).allowed
+    assert not worker_a.hit('a', 2, 60, now=3.0).allowed
+    assert client.get('sophia:ratelimit:a:0') == b'2'  # the rejection was given back
+
+
+def test_redis_backend_is_called_off_the_event_loop():
+    client = FakeRedis()
+    threads = []
+    client.pipeline = lambda: threads.append(threading.get_ident()) or FakePipeline(client)
+    limiter = RateLimiter(RedisRateLimitBackend(client=client), limit=1, window=60, enabled=True)
+    assert asyncio.run(limiter.ahit('a')).allowed
+    assert not asyncio.run(limiter.ahit('a')).allowed
+    assert (limiter.allowed, limiter.rejected) == (1, 1)
+    assert threads and threading.get_ident() not in threads
+
+
+def test_failing_backend_lets_requests_through():
+    class Broken:
+        def hit(self, *args):
+            raise ConnectionError("down")
+
+        async def ahit(self, *args):
+            raise ConnectionError("down")
+
+        def info(self):
+            return {}
+
+    limiter = RateLimiter(Broken(), limit=1, window=1, enabled=True)
+    assert limiter.hit('a').allowed
+    assert asyncio.run(limiter.ahit('a')).allowed
+
+
+def test_middleware_sends_retry_after():
+    app = FastAPI()
+    app.add_middleware(RateLimitMiddleware, limiter=RateLimiter(LocalRateLimitBackend(10), limit=2, window=60, enabled=True))
+
+    @app.get("/ping")
+    async def ping():
+        return {'ok': True}
+
+    @app.get("/api/admin/health")
+    async def health():
+        return {'status': 'healthy'}
+
+    client = TestClient(app)
+    responses = [client.get("/ping") for _ in range(3)]
+    assert [r.status_code for r in responses] == [200, 200, 429]
+    assert responses[0].headers['x-ratelimit-remaining'] == '1'
+    assert int(responses[2].headers['retry-after']) >= 1
+    assert client.get("/api/admin/health").status_code == 200
+
+
+def test_spoofed_forwarded_for_does_not_change_the_key(monkeypatch):
+    monkeypatch.setattr(settings, 'rate_limit_trust_proxy', True)
+
+    def scope(*forwarded):
+        return {'client': ('10.0.0.2', 1234), 'headers': [(b'x-forwarded-for', value.encode()) for value in forwarded]}
+
+    # The caller sends its own X-Forwarded-For; the proxy appends the address it saw
+    assert client_key(scope('1.1.1.1, 203.0.113.7')) == '203.0.113.7'
+    assert client_key(scope('2.2.2.2, 3.3.3.3', '203.0.113.7')) == '203.0.113.7'
+    assert client_key(scope()) == '10.0.0.2'
+
+    monkeypatch.setattr(settings, 'rate_limit_proxy_hops', 2)  # e.g. a CDN in front of the ingress
+    assert client_key(scope('1.1.1.1, 203.0.113.7, 198.51.100.4')) == '203.0.113.7'
+    assert client_key(scope('203.0.113.7')) == '10.0.0.2'
+
+
+def test_decorator_limits_per_user():
+    @rate_limit_decorator(max_calls=1, time_window=60)
+    async def endpoint(user_id=None):
+        return user_id
+
+    assert asyncio.run(endpoint(user_id='a')) == 'a'
+    assert asyncio.run(endpoint(user_id='b')) == 'b'
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(endpoint(user_id='a'))
+    assert error.value.status_code == 429 and 'Retry-After' in error.value.headers
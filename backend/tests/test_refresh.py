@@ -0,0 +1,119 @@
+"""
+Unit tests for background refresh runs
+"""
+from datetime import datetime, timedelta
+import pytest
+from fastapi.testclient import TestClient
+from backend.config import settings
+from backend.models.database import JobListing, RefreshRun
+from backend.pipelines.tasks import run_refresh
+from backend.utils.database import DatabaseService
+from backend.tests.conftest import ListScraper, make_job, make_pipeline
+
+
+@pytest.fixture(autouse=True)
+def small_batches(monkeypatch):
+    monkeypatch.setattr(settings, 'bulk_insert_chunk_size', 2)
+    monkeypatch.setattr(settings, 'scrape_concurrency', 1)
+
+
+def test_only_one_refresh_is_active(db):
+    first, created = DatabaseService.submit_refresh_run(db)
+    assert created and first['status'] == 'queued'
+
+    second, created = DatabaseService.submit_refresh_run(db, trigger='schedule')
+    assert not created and second['job_id'] == first['job_id']
+
+    run_refresh(db, first['job_id'], make_pipeline(ListScraper([make_job(i) for i in range(3)])))
+    third, created = DatabaseService.submit_refresh_run(db)
+    assert created and third['job_id'] != first['job_id']
+
+
+def test_silent_run_is_expired_on_next_submit(db):
+    stuck, _ = DatabaseService.submit_refresh_run(db)
+    db.query(RefreshRun).update({'requested_at': datetime.utcnow() - timedelta(seconds=settings.refresh_stale_after + 1)})
+    db.commit()
+
+    _, created = DatabaseService.submit_refresh_run(db)
+    assert created
+    assert DatabaseService.get_refresh_run(db, stuck['job_id'])['status'] == 'failed'
+
+
+def test_run_reports_progress_and_result(db):
+    run, _ = DatabaseService.submit_refresh_run(db)
+    result = run_refresh(db, run['job_id'], make_pipeline(ListScraper([make_job(i) for i in range(5)])))
+
+    stored = DatabaseService.get_refresh_run(db, run['job_id'])
+    assert result['status'] == stored['status'] == 'succeeded'
+    assert stored['progress']['batches'] == 3
+    assert (stored['result']['scraped'], stored['result']['processed'], stored['result']['inserted']) == (5, 5, 5)
+    assert set(stored['result']['timings']) == {'scrape', 'dedup', 'lookup', 'enrich', 'write'}
+    assert stored['started_at'] and stored['finished_at']
+
+
+def test_cancel_stops_a_running_refresh(db):
+    run, _ = DatabaseService.submit_refresh_run(db)
+
+    def cancel_midway(i):
+        if i == 4:
+            DatabaseService.cancel_refresh_run(db, run['job_id'])
+
+    result = run_refresh(db, run['job_id'], make_pipeline(ListScraper([make_job(i) for i in range(20)], on_job=cancel_midway)))
+
+    stored = DatabaseService.get_refresh_run(db, run['job_id'])
+    assert result['status'] == stored['status'] == 'cancelled'
+    assert stored['result']['inserted'] == db.query(JobListing).count() < 20
+    assert DatabaseService.submit_refresh_run(db)[1]
+
+
+def test_cancelled_queued_refresh_never_starts(db):
+    run, _ = DatabaseService.submit_refresh_run(db)
+    assert DatabaseService.cancel_refresh_run(db, run['job_id'])['status'] == 'cancelled'
+
+    assert run_refresh(db, run['job_id'], make_pipeline(ListScraper([make_job(i) for i in range(3)]))) == {'status': 'cancelled'}
+    assert db.query(JobListing).count() == 0
+
+
+def test_refresh_endpoints(api_db, monkeypatch):
+    from backend.api import admin
+    from backend.main import app
+
+    submitted = []
+
+    class RecordingScheduler:
+        def submit_refresh(self, run_id):
+            submitted.append(run_id)
+
+    monkeypatch.setattr(admin, 'get_job_scheduler', RecordingScheduler)
+    client = TestClient(app)
+
+    response = client.post("/api/admin/refresh-data")
+    assert response.status_code == 202
+    job_id = response.json()['job_id']
+    assert submitted == [job_id]
+    assert client.get(response.json()['status_url']).json()['status'] == 'queued'
+
+    response = client.post("/api/admin/refresh-data")
+    assert response.status_code == 409
+    assert response.json()['detail']['job_id'] == job_id
+
+    assert client.post(f"/api/admin/refresh-data/{job_id}/cancel").json()['status'] == 'cancelled'
+    assert [run['job_id'] for run in client.get("/api/admin/refresh-data").json()] == [job_id]
+    assert client.get("/api/admin/refresh-data/missing").status_code == 404
+
+
+def test_unschedulable_refresh_is_recorded_as_failed(api_db, monkeypatch):
+    from backend.api import admin
+    from backend.main import app
+
+    class BrokenScheduler:
+        def submit_refresh(self, run_id):
+            raise RuntimeError("scheduler is shut down")
+
+    monkeypatch.setattr(admin, 'get_job_scheduler', BrokenScheduler)
+    client = TestClient(app)
+
+    assert client.post("/api/admin/refresh-data").status_code == 500
+    [run] = client.get("/api/admin/refresh-data").json()
+    assert run['status'] == 'failed' and 'scheduler is shut down' in run['error']
+    assert client.post("/api/admin/refresh-data").status_code == 500  # the slot was released
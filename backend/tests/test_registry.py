@@ -0,0 +1,80 @@
+"""
+Unit tests for the model registry
+"""
+import os
+import numpy as np
+import pytest
+from backend.models.ml_models import SalaryPredictionModel
+from backend.models.registry import ModelHandle, ModelNotFoundError, ModelRegistry
+
+
+JOBS = [
+    {'experience_level': level, 'skills_required': ['python'] * n, 'remote_type': remote,
+     'company': 'Google', 'location': 'Seattle, WA', 'salary_max': 60000 + 20000 * n}
+    for n, (level, remote) in enumerate([('entry', 'on-site'), ('mid', 'hybrid'), ('senior', 'fully-remote')] * 5)
+]
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return ModelRegistry(str(tmp_path), keep=2)
+
+
+def test_publish_and_load_latest(registry):
+    assert registry.latest_version('demo') is None
+    with pytest.raises(ModelNotFoundError):
+        registry.load('demo')
+    
+    first = registry.publish('demo', {'weights': np.arange(4.0)}, {'score': 0.5})
+    second = registry.publish('demo', {'weights': np.arange(8.0)})
+    assert registry.latest_version('demo') == second
+    
+    artifacts, metadata = registry.load('demo')
+    assert isinstance(artifacts['weights'], np.memmap)
+    assert artifacts['weights'].tolist() == list(range(8))
+    assert registry.load('demo', first)[1]['score'] == 0.5
+
+
+def test_prune_keeps_newest_versions(registry):
+    versions = [registry.publish('demo', {'v': np.zeros(1)}, version=f"v{i}") for i in range(4)]
+    assert registry.versions('demo') == versions[-2:]
+    assert not any(name.startswith('.') for name in os.listdir(os.path.join(registry.root, 'demo')))
+
+
+def test_trained_model_round_trips(registry, tmp_path):
+    model = SalaryPredictionModel(models_dir=str(tmp_path))
+    model.train(JOBS)
+    assert registry.latest_version('salary') == model.version
+    
+    loaded = SalaryPredictionModel(models_dir=str(tmp_path))
+    assert loaded.load()
+    assert loaded.version == model.version
+    assert loaded.predict_batch(JOBS) == model.predict_batch(JOBS)
+
+
+def test_handle_hot_swaps_new_versions(registry, tmp_path):
+    handle = ModelHandle('salary', lambda: SalaryPredictionModel(models_dir=str(tmp_path)), registry)
+    assert handle.current.version == 'baseline'
+    assert not handle.refresh()
+    
+    serving = handle.current
+    trained = SalaryPredictionModel(models_dir=str(tmp_path))
+    trained.train(JOBS)
+    assert handle.refresh()
+    assert handle.current.version == trained.version
+    assert serving.version == 'baseline'  # requests holding the old instance are unaffected
+    assert not handle.refresh()
+
+
+def test_models_endpoint_lists_versions(registry, tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+    from backend.main import app
+    from backend.models import registry as registry_module
+    monkeypatch.setattr(registry_module.salary_models, '_registry', registry)
+    monkeypatch.setattr(registry_module.salary_models, '_current', SalaryPredictionModel(models_dir=str(tmp_path)))
+    trained = SalaryPredictionModel(models_dir=str(tmp_path))
+    trained.train(JOBS)
+    
+    body = TestClient(app).get("/api/admin/models").json()
+    assert (body['serving'], body['latest'], body['versions']) == ('baseline', trained.version, [trained.version])
+    assert body['metadata']['training_samples'] == len(JOBS)
@@ -0,0 +1,114 @@
+"""
+Job market analytics computed with grouped queries
+"""
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import bindparam, case, func, select, update
+from sqlalchemy.orm import Session
+import logging
+
+logger = logging.getLogger(__name__)
+
+GROWTH_METRIC = 'job_growth_rate'
+
+
+def refresh_market_analytics(db: Session, now: Optional[datetime] = None) -> dict:
+    """
+    Recompute per-skill frequency, average salary and trend into ``JobSkill``
+    and week-over-week posting growth into ``JobAnalysis``.
+    
+    Skills come from one GROUP BY over the job -> skill association and
+    growth from one conditional count over the last two weeks of
+    ``posted_date``, so no job rows are loaded into Python.
+    """
+    from backend.models.database import JobAnalysis, JobListing, JobSkill, job_listing_skills
+    from backend.models.ml_models import SkillTrendModel
+    
+    now = now or datetime.utcnow()
+    link = job_listing_skills.c
+    
+    total_jobs = db.execute(select(func.count(JobListing.id))).scalar() or 0
+    skill_rows = db.execute(
+        select(link.skill_id, func.count(link.job_id), func.avg(JobListing.salary_max))
+        .join(JobListing, JobListing.id == link.job_id)
+        .group_by(link.skill_id)
+    ).all()
+    
+    # Skills no longer linked to any job fall back to zero before the grouped values are written
+    db.execute(update(JobSkill).values(
+        frequency=0, average_salary_impact=0.0,
+        trend_direction=SkillTrendModel.trend_direction(0.0), last_updated=now
+    ))
+    if skill_rows:
+        db.execute(
+            update(JobSkill.__table__)
+            .where(JobSkill.__table__.c.id == bindparam('skill_id'))
+            .values(
+                frequency=bindparam('new_frequency'),
+                average_salary_impact=bindparam('new_salary'),
+                trend_direction=bindparam('new_trend')
+            ),
+            [
+                {'skill_id': skill_id, 'new_frequency': count, 'new_salary': float(avg_salary or 0.0),
+                 'new_trend': SkillTrendModel.trend_direction(count / total_jobs)}
+                for skill_id, count, avg_salary in skill_rows
+            ]
+        )
+    
+    week_ago, two_weeks_ago = now - timedelta(days=7), now - timedelta(days=14)
+    this_week, last_week = db.execute(
+        select(
+            func.count(case((JobListing.posted_date >= week_ago, 1))),
+            func.count(case((JobListing.posted_date < week_ago, 1)))
+        ).where(JobListing.posted_date >= two_weeks_ago, JobListing.posted_date <= now)
+    ).one()
+    growth_rate = ((this_week - last_week) / last_week * 100) if last_week else 0.0
+    
+    db.merge(JobAnalysis(
+        id=f"{GROWTH_METRIC}:week",
+        metric_name=GROWTH_METRIC,
+        metric_value=growth_rate,
+        category='trends',
+        time_period='week',
+        created_at=now
+    ))
+    db.commit()
+    
+    logger.info(f"Refreshed analytics for {len(skill_rows)} skills, weekly growth {growth_rate:.1f}%")
+    return {'skills': len(skill_rows), 'job_growth_rate': growth_rate}
+
+
+def read_market_analytics(db: Session, top_skills: int = 5) -> dict:
+    """Most frequent skills and the latest growth rate as last computed"""
+    from backend.models.database import JobAnalysis, JobSkill
+    
+    skills = db.execute(
+        select(JobSkill.skill_name, JobSkill.frequency, JobSkill.average_salary_impact, JobSkill.trend_direction)
+        .where(JobSkill.frequency > 0)
+        .order_by(JobSkill.frequency.desc(), JobSkill.skill_name)
+        .limit(top_skills)
+    ).all()
+    growth = db.execute(
+        select(JobAnalysis.metric_value).where(JobAnalysis.id == f"{GROWTH_METRIC}:week")
+    ).scalar()
+    
+    return {
+        'top_skills': [
+            {'skill_name': name, 'frequency': frequency,
+             'average_salary_impact': salary, 'trend_direction': trend}
+            for name, frequency, salary, trend in skills
+        ],
+        'job_growth_rate': growth or 0.0
+    }
+
+
+def ensure_market_analytics(db: Session) -> bool:
+    """Compute analytics once for a database that has jobs but none stored yet"""
+    from backend.models.database import JobAnalysis, JobListing
+    
+    if db.execute(select(JobAnalysis.id).where(JobAnalysis.metric_name == GROWTH_METRIC).limit(1)).first():
+        return False
+    if db.execute(select(JobListing.id).limit(1)).first() is None:
+        return False
+    refresh_market_analytics(db)
+    return True
@@ -0,0 +1,202 @@
+"""
+Asyncio database engine, sessions and service for the API routes
+"""
+import asyncio
+from typing import AsyncIterator, Optional
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
+from backend.config import settings
+from backend.utils.database import DatabaseService
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Sync driver -> asyncio driver for the same database
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+}
+
+
+def async_database_url(url: str) -> str:
+    """The asyncio-driver URL for a sync ``database_url``"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No asyncio driver configured for {backend}")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+def create_async_db_engine(url: Optional[str] = None, pool_size: Optional[int] = None) -> AsyncEngine:
+    """
+    Async engine for ``url`` (default ``settings.database_url``). Concurrent
+    requests run on up to ``pool_size`` + ``db_max_overflow`` connections.
+    """
+    url = async_database_url(url or settings.database_url)
+    parsed = make_url(url)
+    if parsed.get_backend_name() == 'sqlite' and parsed.database in (None, '', ':memory:'):
+        # One shared connection, otherwise every checkout sees an empty database
+        return create_async_engine(url, poolclass=StaticPool)
+    return create_async_engine(
+        url,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=pool_size or settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_pre_ping=True
+    )
+
+
+_async_engine: Optional[AsyncEngine] = None
+_async_sessions: Optional[async_sessionmaker] = None
+_no_async_driver = False
+
+
+def get_async_engine() -> Optional[AsyncEngine]:
+    """
+    Process-wide async engine for ``settings.database_url``, created on first
+    use; None when the database has no asyncio driver in ``ASYNC_DRIVERS``
+    """
+    global _async_engine, _async_sessions, _no_async_driver
+    if _async_engine is None and not _no_async_driver:
+        try:
+            _async_engine = create_async_db_engine()
+        except ValueError as e:
+            logger.warning(f"{e}; async routes will run the sync service in threads")
+            _no_async_driver = True
+        else:
+            _async_sessions = async_sessionmaker(_async_engine, expire_on_commit=False)
+    return _async_engine
+
+
+class ThreadedSession:
+    """
+    Stand-in for ``AsyncSession`` on databases without an asyncio driver.
+    ``run_sync`` calls the sync service on a regular session in a worker
+    thread, so ``AsyncDatabaseService`` works unchanged and the event loop
+    still never waits on a query.
+    """
+    
+    def __init__(self, session: Session):
+        self.session = session
+    
+    async def run_sync(self, fn, *args, **kwargs):
+        return await asyncio.to_thread(fn, self.session, *args, **kwargs)
+    
+    async def close(self) -> None:
+        await asyncio.to_thread(self.session.close)
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Get async database session dependency"""
+    if get_async_engine() is not None:
+        async with _async_sessions() as db:
+            yield db
+        return
+    
+    from backend.utils import database
+    db = ThreadedSession(database.SessionLocal())
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
+async def init_async_db() -> None:
+    """Register the full-text index with the async engine (tables are created by ``init_db``)"""
+    from backend.utils.search import install_fulltext_index_async
+    
+    engine = get_async_engine()
+    if engine is not None:
+        await install_fulltext_index_async(engine)
+
+
+class AsyncDatabaseService:
+    """
+    Awaitable ``DatabaseService``. Each call runs the sync implementation on
+    the async session via ``run_sync``, so query logic is shared while every
+    round trip to the database is awaited instead of blocking the event loop.
+    Returned ORM objects are fully loaded and safe to read after the call.
+    """
+    
+    @staticmethod
+    async def insert_jobs(db: AsyncSession, jobs: list) -> int:
+        return await db.run_sync(DatabaseService.insert_jobs, jobs)
+    
+    @staticmethod
+    async def upsert_jobs(db: AsyncSession, jobs: list, chunk_size: Optional[int] = None) -> dict:
+        return await db.run_sync(DatabaseService.upsert_jobs, jobs, chunk_size)
+    
+    @staticmethod
+    async def get_all_jobs(db: AsyncSession, limit: int = 100, offset: int = 0):
+        return await db.run_sync(DatabaseService.get_all_jobs, limit, offset)
+    
+    @staticmethod
+    async def get_job_by_id(db: AsyncSession, job_id: str):
+        return await db.run_sync(DatabaseService.get_job_by_id, job_id)
+    
+    @staticmethod
+    async def search_jobs(db: AsyncSession, query: dict) -> list:
+        return await db.run_sync(DatabaseService.search_jobs, query)
+    
+    @staticmethod
+    async def search_jobs_page(db: AsyncSession, query: dict) -> dict:
+        return await db.run_sync(DatabaseService.search_jobs_page, query)
+    
+    @staticmethod
+    async def get_ranking_candidates(db: AsyncSession):
+        # Only the column fetch runs on the session; building the arrays is inference-pool work
+        from backend.utils.database import build_ranking_candidates
+        from backend.utils.executor import get_task_executor
+        
+        columns = await db.run_sync(DatabaseService.get_ranking_columns)
+        if columns['candidates'] is not None:
+            return columns['candidates']
+        return await get_task_executor().run_inference(build_ranking_candidates, columns)
+    
+    @staticmethod
+    async def get_jobs_by_ids(db: AsyncSession, job_ids: list) -> list:
+        return await db.run_sync(DatabaseService.get_jobs_by_ids, job_ids)
+    
+    @staticmethod
+    async def delete_jobs(db: AsyncSession, job_ids: list) -> int:
+        return await db.run_sync(DatabaseService.delete_jobs, job_ids)
+    
+    @staticmethod
+    async def submit_refresh_run(db: AsyncSession, trigger: str = 'api') -> tuple:
+        return await db.run_sync(DatabaseService.submit_refresh_run, trigger)
+    
+    @staticmethod
+    async def get_refresh_run(db: AsyncSession, run_id: str):
+        return await db.run_sync(DatabaseService.get_refresh_run, run_id)
+    
+    @staticmethod
+    async def list_refresh_runs(db: AsyncSession, limit: int = 20) -> list:
+        return await db.run_sync(DatabaseService.list_refresh_runs, limit)
+    
+    @staticmethod
+    async def cancel_refresh_run(db: AsyncSession, run_id: str):
+        return await db.run_sync(DatabaseService.cancel_refresh_run, run_id)
+    
+    @staticmethod
+    async def finish_refresh_run(
+        db: AsyncSession, run_id: str, status: str, result: Optional[dict] = None, error: Optional[str] = None
+    ) -> None:
+        await db.run_sync(DatabaseService.finish_refresh_run, run_id, status, result, error)
+    
+    @staticmethod
+    async def get_statistics(db: AsyncSession) -> dict:
+        return await db.run_sync(DatabaseService.get_statistics)
+    
+    @staticmethod
+    async def rebuild_statistics(db: AsyncSession) -> int:
+        return await db.run_sync(DatabaseService.rebuild_statistics)
+    
+    @staticmethod
+    async def refresh_analytics(db: AsyncSession) -> dict:
+        return await db.run_sync(DatabaseService.refresh_analytics)
+    
+    @staticmethod
+    async def get_market_analytics(db: AsyncSession, top_skills: int = 5) -> dict:
+        return await db.run_sync(DatabaseService.get_market_analytics, top_skills)
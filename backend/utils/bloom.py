@@ -0,0 +1,250 @@
+"""
+Bloom filter of job ids and urls already stored, used to skip database
+lookups for jobs that are certainly new
+"""
+import hashlib
+import json
+import math
+import os
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from backend.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings.
+
+    Sized for ``capacity`` keys at ``error_rate`` false positives. Each key
+    is hashed once with blake2b; the ``hashes`` bit positions are derived
+    from the two halves of the digest (double hashing), and batches of keys
+    are set and tested with vectorized numpy indexing.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        if capacity < 1 or not 0 < error_rate < 1:
+            raise ValueError("capacity must be positive and error_rate in (0, 1)")
+        self.capacity = int(capacity)
+        self.error_rate = float(error_rate)
+        self.size = max(8, math.ceil(-self.capacity * math.log(self.error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+        self.count = 0
+
+    def _positions(self, keys: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Byte offsets and bit masks, one row of ``hashes`` per key"""
+        digests = b''.join(hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest() for key in keys)
+        halves = np.frombuffer(digests, dtype='<u8').reshape(-1, 2)
+        steps = np.arange(self.hashes, dtype=np.uint64)
+        positions = (halves[:, :1] + steps * (halves[:, 1:] | np.uint64(1))) % np.uint64(self.size)
+        return (positions >> np.uint64(3)).astype(np.intp), (np.uint8(1) << (positions & np.uint64(7)).astype(np.uint8))
+
+    def add_many(self, keys: Iterable[str]) -> None:
+        keys = list(keys)
+        if not keys:
+            return
+        offsets, masks = self._positions(keys)
+        np.bitwise_or.at(self.bits, offsets.ravel(), masks.ravel())
+        self.count += len(keys)
+
+    def contains_many(self, keys: Iterable[str]) -> np.ndarray:
+        """Boolean per key: False means certainly never added"""
+        keys = list(keys)
+        if not keys:
+            return np.zeros(0, dtype=bool)
+        offsets, masks = self._positions(keys)
+        return ((self.bits[offsets] & masks) != 0).all(axis=1)
+
+    def __contains__(self, key: str) -> bool:
+        return bool(self.contains_many([key])[0])
+
+    def stats(self) -> Dict:
+        """Size, load and the false positive rate expected at the current fill"""
+        fill = float(np.unpackbits(self.bits)[:self.size].mean())
+        return {
+            'capacity': self.capacity,
+            'error_rate': self.error_rate,
+            'bits': self.size,
+            'bytes': int(self.bits.nbytes),
+            'hashes': self.hashes,
+            'count': self.count,
+            'fill_ratio': fill,
+            'estimated_false_positive_rate': fill ** self.hashes
+        }
+
+    def save(self, path: str, metadata: Optional[Dict] = None) -> None:
+        """Write the filter atomically; readers see the old or the new file"""
+        header = json.dumps({
+            'capacity': self.capacity, 'error_rate': self.error_rate, 'count': self.count, **(metadata or {})
+        }).encode('utf-8')
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        staging = f"{path}.{os.getpid()}.tmp"
+        with open(staging, 'wb') as f:
+            f.write(len(header).to_bytes(4, 'little'))
+            f.write(header)
+            f.write(self.bits.tobytes())
+        os.replace(staging, path)
+
+    @classmethod
+    def load(cls, path: str) -> Tuple['BloomFilter', Dict]:
+        """Filter and the metadata saved with it"""
+        with open(path, 'rb') as f:
+            header = json.loads(f.read(int.from_bytes(f.read(4), 'little')))
+            bloom = cls(header.pop('capacity'), header.pop('error_rate'))
+            bits = np.frombuffer(f.read(), dtype=np.uint8)
+        if len(bits) != len(bloom.bits):
+            raise ValueError(f"{path} holds {len(bits)} bytes of bits, expected {len(bloom.bits)}")
+        bloom.bits = bits.copy()
+        bloom.count = header.pop('count')
+        return bloom, header
+
+
+class KnownJobsIndex:
+    """
+    Bloom filter of every stored job id and url, persisted at ``path``.
+
+    ``split`` sends jobs whose id and url are both absent from the filter
+    down a plain INSERT path; the rest may already be stored and still go
+    through the content hash check and upsert. The filter records the
+    ``created_at`` of the newest row it covers, so a restart loads the file
+    and catches up on rows written since instead of rescanning the table.
+    Deleted jobs keep their bits, which only costs them a database check if
+    they come back, and a job missing from the filter (say, written by
+    another process since the last sync) fails its INSERT and falls back to
+    the upsert path, so a stale filter costs time, never correctness. Once
+    more keys than ``capacity`` are added the filter is rebuilt from the
+    table with room for twice its jobs, holding the error rate.
+    """
+
+    def __init__(self, path: Optional[str] = None, capacity: Optional[int] = None, error_rate: Optional[float] = None):
+        self.path = path or settings.bloom_path
+        self.capacity = capacity or settings.bloom_capacity
+        self.error_rate = error_rate or settings.bloom_error_rate
+        self.bloom = BloomFilter(self.capacity, self.error_rate)
+        self.watermark: Optional[datetime] = None
+        self.stored_jobs = 0
+        self.checks = {'definitely_new': 0, 'maybe_seen': 0}
+
+    @staticmethod
+    def keys(job: Dict) -> List[str]:
+        keys = []
+        if job.get('id'):
+            keys.append(f"id:{job['id']}")
+        if job.get('job_url'):
+            keys.append(f"url:{job['job_url']}")
+        return keys
+
+    def rebuild(self, db: Session, chunk_size: Optional[int] = None) -> None:
+        """Refill the filter from the whole table, sized for its row count"""
+        from backend.models.database import JobListing
+
+        chunk_size = chunk_size or settings.bulk_insert_chunk_size
+        rows, watermark = db.execute(select(func.count(), func.max(JobListing.created_at))).one()
+        # Two keys per job, with room to double before the next rebuild
+        self.capacity = max(self.capacity, 4 * rows)
+        self.bloom = BloomFilter(self.capacity, self.error_rate)
+        self.stored_jobs = 0
+        result = db.execute(
+            select(JobListing.id, JobListing.job_url).execution_options(yield_per=chunk_size)
+        )
+        for partition in result.partitions():
+            self._add_rows(partition)
+        self.watermark = watermark
+        self.save()
+        logger.info(f"Rebuilt known jobs filter with {self.stored_jobs} jobs ({self.bloom.bits.nbytes} bytes)")
+
+    def load(self) -> bool:
+        """Read the saved filter; False if it is missing, unreadable or built for another error rate"""
+        try:
+            bloom, metadata = BloomFilter.load(self.path)
+        except FileNotFoundError:
+            return False
+        except (ValueError, KeyError) as e:
+            logger.warning(f"Unreadable known jobs filter {self.path}: {e}")
+            return False
+        if bloom.error_rate != self.error_rate:
+            return False
+        self.bloom, self.capacity = bloom, bloom.capacity
+        self.stored_jobs = metadata.get('stored_jobs', 0)
+        self.watermark = datetime.fromisoformat(metadata['watermark']) if metadata.get('watermark') else None
+        return True
+
+    def sync(self, db: Session, chunk_size: Optional[int] = None) -> None:
+        """Load the saved filter (or rebuild it) and add rows created since it was saved"""
+        from backend.models.database import JobListing
+
+        if not self.load():
+            return self.rebuild(db, chunk_size)
+
+        query = select(JobListing.id, JobListing.job_url, JobListing.created_at)
+        if self.watermark is not None:
+            # >= because rows of the last batch share its timestamp; re-adding is harmless
+            query = query.where(JobListing.created_at >= self.watermark)
+        result = db.execute(query.execution_options(yield_per=chunk_size or settings.bulk_insert_chunk_size))
+        for partition in result.partitions():
+            self._add_rows(partition)
+            stamps = [row.created_at for row in partition if row.created_at]
+            if stamps and (self.watermark is None or max(stamps) > self.watermark):
+                self.watermark = max(stamps)
+        if self.needs_rebuild():
+            return self.rebuild(db, chunk_size)
+        self.save()
+
+    def split(self, jobs: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        """Jobs certainly not stored yet, and jobs that may be"""
+        keys = [self.keys(job) for job in jobs]
+        seen = iter(self.bloom.contains_many(key for job_keys in keys for key in job_keys))
+        new, maybe = [], []
+        for job, job_keys in zip(jobs, keys):
+            hits = [next(seen) for _ in job_keys]
+            if job_keys and not any(hits):
+                new.append(job)
+            else:
+                maybe.append(job)
+        self.checks['definitely_new'] += len(new)
+        self.checks['maybe_seen'] += len(maybe)
+        return new, maybe
+
+    def add_jobs(self, jobs: List[Dict], created_at: Optional[datetime] = None) -> None:
+        """Record jobs just written, advancing the watermark to ``created_at``"""
+        self._add_rows([(job.get('id'), job.get('job_url')) for job in jobs])
+        if created_at is not None and (self.watermark is None or created_at > self.watermark):
+            self.watermark = created_at
+
+    def needs_rebuild(self) -> bool:
+        return self.bloom.count > self.capacity
+
+    def save(self) -> None:
+        self.bloom.save(self.path, {
+            'stored_jobs': self.stored_jobs,
+            'watermark': self.watermark.isoformat() if self.watermark else None
+        })
+
+    def stats(self) -> Dict:
+        return {
+            **self.bloom.stats(),
+            'path': self.path,
+            'stored_jobs': self.stored_jobs,
+            'watermark': self.watermark.isoformat() if self.watermark else None,
+            **self.checks
+        }
+
+    def _add_rows(self, rows: Iterable) -> None:
+        keys = []
+        added = 0
+        for row in rows:
+            job_id, job_url = row[0], row[1]
+            added += 1
+            if job_id:
+                keys.append(f"id:{job_id}")
+            if job_url:
+                keys.append(f"url:{job_url}")
+        self.bloom.add_many(keys)
+        self.stored_jobs += added
@@ -0,0 +1,375 @@
+"""
+Response cache for read endpoints
+"""
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from sqlalchemy.orm import Session
+from backend.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Rough per-entry bookkeeping cost on top of key and payload bytes
+ENTRY_OVERHEAD = 128
+
+
+class DatabaseGeneration:
+    """
+    Cache generation kept in a ``cache_generations`` row, so a write made in
+    any process (a pipeline worker, another uvicorn worker, another replica)
+    invalidates every process's local cache. Each process reads the row at
+    most once per ``check_interval`` seconds, which bounds both the extra
+    queries and how long a stale entry can still be served. Async callers
+    go through ``LocalCacheBackend.ageneration``, which only leaves the event
+    loop when a read is due.
+    """
+    
+    def __init__(
+        self,
+        name: str = "responses",
+        check_interval: Optional[float] = None,
+        session_factory: Optional[Callable[[], Session]] = None
+    ):
+        self.name = name
+        self.check_interval = settings.cache_generation_check_seconds if check_interval is None else check_interval
+        self.session_factory = session_factory
+        self._value = 0
+        self._checked_at = float('-inf')
+    
+    def _session(self) -> Session:
+        if self.session_factory is not None:
+            return self.session_factory()
+        from backend.utils.database import SessionLocal
+        return SessionLocal()
+    
+    @property
+    def due(self) -> bool:
+        """Whether the next ``current()`` reads the database"""
+        return time.monotonic() - self._checked_at >= self.check_interval
+    
+    def current(self) -> int:
+        """Last generation read, refreshed from the database once it is older than ``check_interval``"""
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return self._value
+        from backend.models.database import CacheGeneration
+        
+        db = self._session()
+        try:
+            row = db.get(CacheGeneration, self.name)
+            self._value = row.value if row is not None else 0
+        except Exception as e:
+            logger.warning(f"Could not read cache generation: {e}")
+        finally:
+            db.close()
+        self._checked_at = now
+        return self._value
+    
+    def bump(self) -> int:
+        """Increment the shared generation and return it"""
+        from sqlalchemy import update
+        from sqlalchemy.exc import IntegrityError
+        from backend.models.database import CacheGeneration
+        
+        db = self._session()
+        try:
+            for _ in range(2):
+                try:
+                    bumped = db.execute(
+                        update(CacheGeneration)
+                        .where(CacheGeneration.name == self.name)
+                        .values(value=CacheGeneration.value + 1)
+                    ).rowcount
+                    if not bumped:
+                        db.add(CacheGeneration(name=self.name, value=1))
+                        db.flush()
+                    db.commit()
+                    break
+                except IntegrityError:
+                    # Another process created the row first; increment it instead
+                    db.rollback()
+            self._value = db.get(CacheGeneration, self.name).value
+            self._checked_at = time.monotonic()
+            return self._value
+        finally:
+            db.close()
+
+
+class LocalCacheBackend:
+    """
+    In-process store with per-entry TTL and LRU eviction under a byte budget.
+    
+    Values are kept as serialized bytes, so the budget counts what is
+    actually held and cached responses can never be mutated by a caller.
+    Without ``shared`` the generation lives in this process only, so an
+    invalidation reaches no other process and their entries stay until
+    their TTL; with a ``DatabaseGeneration`` every process follows the
+    same generation.
+    """
+    
+    def __init__(self, max_bytes: int, shared: Optional[DatabaseGeneration] = None):
+        self.max_bytes = max_bytes
+        self.shared = shared
+        self._entries: 'OrderedDict[str, Tuple[float, bytes]]' = OrderedDict()
+        self._bytes = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+    
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        size = len(key) + len(value) + ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            while self._entries and self._bytes + size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._bytes += size
+    
+    def generation(self) -> int:
+        if self.shared is not None:
+            generation = self.shared.current()
+            if generation != self._generation:
+                self._advance(generation)
+        return self._generation
+    
+    async def aget(self, key: str) -> Optional[bytes]:
+        return self.get(key)
+    
+    async def aset(self, key: str, value: bytes, ttl: float) -> None:
+        self.set(key, value, ttl)
+    
+    async def ageneration(self) -> int:
+        """``generation()`` with any database read done off the event loop"""
+        if self.shared is not None and self.shared.due:
+            generation = await asyncio.to_thread(self.shared.current)
+            if generation != self._generation:
+                self._advance(generation)
+        return self._generation
+    
+    def bump_generation(self) -> int:
+        generation = self._generation + 1
+        if self.shared is not None:
+            try:
+                generation = self.shared.bump()
+            except Exception as e:
+                # Still drop this process's entries; the others catch up by TTL
+                logger.warning(f"Could not bump shared cache generation: {e}")
+        self._advance(generation)
+        return self._generation
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+    
+    def info(self) -> Dict[str, int]:
+        return {
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+            'max_bytes': self.max_bytes,
+            'evictions': self.evictions,
+            'expirations': self.expirations
+        }
+    
+    def _advance(self, generation: int) -> None:
+        with self._lock:
+            self._generation = generation
+            # Entries of older generations can never be read again
+            self._entries.clear()
+            self._bytes = 0
+    
+    def _remove(self, key: str) -> None:
+        expires_at, value = self._entries.pop(key)
+        self._bytes -= len(key) + len(value) + ENTRY_OVERHEAD
+
+
+class RedisCacheBackend:
+    """
+    Shared store for multi-worker deployments. Entries expire through Redis
+    TTLs and memory is bounded by the server's ``maxmemory`` LRU policy; the
+    generation counter lives in Redis so one worker's ingest invalidates
+    every worker's entries. The async methods run the blocking client in a
+    worker thread.
+    """
+    
+    def __init__(self, url: Optional[str] = None, client=None, prefix: str = "sophia:cache"):
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+    
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(f"{self.prefix}:{key}")
+    
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self.client.setex(f"{self.prefix}:{key}", max(1, int(ttl)), value)
+    
+    def generation(self) -> int:
+        return int(self.client.get(f"{self.prefix}:generation") or 0)
+    
+    def bump_generation(self) -> int:
+        return int(self.client.incr(f"{self.prefix}:generation"))
+    
+    async def aget(self, key: str) -> Optional[bytes]:
+        return await asyncio.to_thread(self.get, key)
+    
+    async def aset(self, key: str, value: bytes, ttl: float) -> None:
+        await asyncio.to_thread(self.set, key, value, ttl)
+    
+    async def ageneration(self) -> int:
+        return await asyncio.to_thread(self.generation)
+    
+    def clear(self) -> None:
+        self.bump_generation()
+    
+    def info(self) -> Dict[str, int]:
+        return {}
+
+
+class ResponseCache:
+    """
+    Read-through cache keyed on an endpoint name and its normalized
+    parameters. Every key embeds the current generation, so bumping it after
+    a write makes all earlier entries unreachable at once.
+    """
+    
+    def __init__(self, backend=None, ttl: Optional[float] = None, enabled: Optional[bool] = None):
+        self.backend = backend or LocalCacheBackend(settings.cache_max_bytes)
+        self.ttl = ttl if ttl is not None else settings.cache_ttl_seconds
+        self.enabled = settings.cache_enabled if enabled is None else enabled
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def make_key(namespace: str, params: Dict[str, Any]) -> str:
+        """Stable key: unset parameters dropped, keys and list values sorted"""
+        normalized = {
+            name: sorted(value) if isinstance(value, (list, tuple, set)) else value
+            for name, value in params.items()
+            if value is not None and value != []
+        }
+        return f"{namespace}:{json.dumps(normalized, sort_keys=True, default=str, separators=(',', ':'))}"
+    
+    def get_or_set(self, namespace: str, params: Dict[str, Any], compute: Callable[[], Any]) -> Any:
+        """Cached JSON-compatible result of ``compute()``, computing it on a miss"""
+        key, cached = self._lookup(namespace, params)
+        if cached is not None:
+            return json.loads(cached)
+        value = compute()
+        self._store(key, value)
+        return value
+    
+    async def aget_or_set(self, namespace: str, params: Dict[str, Any], compute: Callable[[], Awaitable[Any]]) -> Any:
+        """``get_or_set`` for an async ``compute``, with backend I/O kept off the event loop"""
+        key, cached = await self._alookup(namespace, params)
+        if cached is not None:
+            return json.loads(cached)
+        value = await compute()
+        await self._astore(key, value)
+        return value
+    
+    def _lookup(self, namespace: str, params: Dict[str, Any]) -> Tuple[Optional[str], Optional[bytes]]:
+        """(key, cached bytes); key is None when the result must not be stored"""
+        if not self.enabled:
+            return None, None
+        try:
+            key = f"{self.backend.generation()}:{self.make_key(namespace, params)}"
+            cached = self.backend.get(key)
+        except Exception as e:
+            # An unreachable shared backend degrades to uncached reads
+            logger.warning(f"Cache read failed: {e}")
+            return None, None
+        return key, self._count(cached)
+    
+    async def _alookup(self, namespace: str, params: Dict[str, Any]) -> Tuple[Optional[str], Optional[bytes]]:
+        if not self.enabled:
+            return None, None
+        try:
+            key = f"{await self.backend.ageneration()}:{self.make_key(namespace, params)}"
+            cached = await self.backend.aget(key)
+        except Exception as e:
+            logger.warning(f"Cache read failed: {e}")
+            return None, None
+        return key, self._count(cached)
+    
+    def _count(self, cached: Optional[bytes]) -> Optional[bytes]:
+        if cached is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return cached
+    
+    def _store(self, key: Optional[str], value: Any) -> None:
+        if key is None:
+            return
+        try:
+            self.backend.set(key, json.dumps(value, separators=(',', ':')).encode(), self.ttl)
+        except Exception as e:
+            logger.warning(f"Cache write failed: {e}")
+    
+    async def _astore(self, key: Optional[str], value: Any) -> None:
+        if key is None:
+            return
+        try:
+            await self.backend.aset(key, json.dumps(value, separators=(',', ':')).encode(), self.ttl)
+        except Exception as e:
+            logger.warning(f"Cache write failed: {e}")
+    
+    def invalidate(self) -> None:
+        """Start a new generation after job data changed"""
+        try:
+            self.backend.bump_generation()
+        except Exception as e:
+            logger.warning(f"Cache invalidation failed: {e}")
+    
+    async def ainvalidate(self) -> None:
+        """``invalidate`` for async handlers; a shared generation is bumped in a worker thread"""
+        await asyncio.to_thread(self.invalidate)
+    
+    def clear(self) -> None:
+        self.backend.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            'enabled': self.enabled,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'generation': self.backend.generation(),
+            'ttl_seconds': self.ttl,
+            **self.backend.info()
+        }
+
+
+def _create_cache() -> ResponseCache:
+    if settings.cache_backend == 'redis':
+        return ResponseCache(RedisCacheBackend(settings.redis_url))
+    shared = DatabaseGeneration() if settings.cache_shared_generation else None
+    return ResponseCache(LocalCacheBackend(settings.cache_max_bytes, shared))
+
+
+response_cache = _create_cache()
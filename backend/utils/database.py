@@ -1,10 +1,23 @@
 """
 Database connection and session management
 """
-from sqlalchemy import create_engine
+from datetime import datetime
+from typing import Callable, Optional
+from sqlalchemy import create_engine, delete, func, select, or_, tuple_
 from sqlalchemy.orm import sessionmaker, Session
 from backend.config import settings
 from backend.models.database import Base
+from backend.pipelines.skills import get_skill_matcher
+from backend.utils.bloom import KnownJobsIndex
+from backend.utils.cache import response_cache
+from backend.utils.analytics import ensure_market_analytics, read_market_analytics, refresh_market_analytics
+from backend.utils.pagination import decode_cursor, encode_cursor
+from backend.utils.refresh_runs import (
+    cancel_refresh_run, finish_refresh_run, get_refresh_run, list_refresh_runs, submit_refresh_run
+)
+from backend.utils.stats import (
+    STAT_COLUMNS, apply_stat_deltas, ensure_stat_rollups, read_statistics, rebuild_stat_rollups, stat_deltas
+)
 import logging
 
 logger = logging.getLogger(__name__)
@@ -30,79 +43,519 @@ def get_db() -> Session:
 
 def init_db():
     """Initialize database tables"""
+    from backend.utils.schema import upgrade_schema
+    from backend.utils.search import install_fulltext_index
+    
     Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
+    install_fulltext_index(engine)
+    
+    db = SessionLocal()
+    try:
+        DatabaseService.backfill_job_skills(db)
+        ensure_stat_rollups(db)
+        ensure_market_analytics(db)
+        if settings.bloom_enabled:
+            KnownJobsIndex().sync(db)
+    finally:
+        db.close()
     logger.info("Database initialized")
 
 
+# Columns written by the bulk upsert path; ``created_at`` is only set on insert
+UPSERT_COLUMNS = (
+    'id', 'title', 'company', 'location', 'job_url', 'description',
+    'salary_min', 'salary_max', 'job_type', 'experience_level',
+    'skills_required', 'remote_type', 'posted_date', 'source', 'company_type',
+    'salary_score', 'growth_potential', 'match_score', 'category', 'features_version',
+    'content_hash', 'created_at', 'updated_at'
+)
+
+# Scraped fields covered by ``content_hash``. posted_date is left out because
+# sources stamp it from the scrape time; derived feature columns are kept
+# current by JobEnricher.refresh_stale instead.
+CONTENT_HASH_COLUMNS = (
+    'title', 'company', 'location', 'job_url', 'description',
+    'salary_min', 'salary_max', 'job_type', 'experience_level',
+    'remote_type', 'source', 'company_type'
+)
+
+
+def _job_to_row(job: dict, now: datetime) -> dict:
+    """Map a scraped job dict onto job_listings column values"""
+    import uuid
+
+    return {
+        'id': job.get('id') or str(uuid.uuid4()),
+        'title': job.get('title'),
+        'company': job.get('company'),
+        'location': job.get('location'),
+        'job_url': job.get('job_url') or None,
+        'description': job.get('description'),
+        'salary_min': job.get('salary_min'),
+        'salary_max': job.get('salary_max'),
+        'job_type': job.get('job_type', 'full-time'),
+        'experience_level': job.get('experience_level', 'mid'),
+        'skills_required': ','.join(job.get('skills_required') or []),
+        'remote_type': job.get('remote_type', 'on-site'),
+        'posted_date': job.get('posted_date') or now,  # keyset pagination needs a non-null sort key
+        'source': job.get('source', 'web'),
+        'company_type': job.get('company_type'),
+        'salary_score': job.get('salary_score'),
+        'growth_potential': job.get('growth_potential'),
+        'match_score': job.get('match_score'),
+        'category': job.get('category'),
+        'features_version': job.get('features_version'),
+        'created_at': now,
+        'updated_at': now
+    }
+
+
+def _content_hash(row: dict, skills: list) -> str:
+    """Stable fingerprint of a row's scraped fields and normalized skills"""
+    import hashlib
+    import json
+
+    values = [row[column] for column in CONTENT_HASH_COLUMNS]
+    for index, column in enumerate(CONTENT_HASH_COLUMNS):
+        if column.startswith('salary_') and values[index] is not None:
+            values[index] = float(values[index])  # 120000 and 120000.0 are the same salary
+    payload = json.dumps(values + [sorted(skills)], separators=(',', ':'), default=str)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _prepare_rows(jobs: list, now: datetime) -> tuple:
+    """Rows with content hashes, normalized skills by job id, and the number of jobs that failed"""
+    rows = []
+    skills_by_id = {}
+    skipped = 0
+    for job in jobs:
+        try:
+            row = _job_to_row(job, now)
+            skills = get_skill_matcher().normalize(job.get('skills_required') or [])
+            row['content_hash'] = _content_hash(row, skills)
+            skills_by_id[row['id']] = skills
+            rows.append(row)
+        except Exception as e:
+            logger.error(f"Error preparing job: {e}")
+            skipped += 1
+    return rows, skills_by_id, skipped
+
+
+def _dialect_insert(dialect_name: str):
+    """The dialect's ``insert`` construct supporting ON CONFLICT, or None"""
+    if dialect_name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect_name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    return insert
+
+
+def _upsert_statement(dialect_name: str):
+    """Build a dialect-specific INSERT ... ON CONFLICT (id) DO UPDATE statement"""
+    from backend.models.database import JobListing
+
+    insert = _dialect_insert(dialect_name)
+    if insert is None:
+        return None
+
+    stmt = insert(JobListing.__table__)
+    return stmt.on_conflict_do_update(
+        index_elements=['id'],
+        set_={col: stmt.excluded[col] for col in UPSERT_COLUMNS if col not in ('id', 'created_at')}
+    )
+
+
+def _ensure_skills(db: Session, names: set) -> dict:
+    """Map skill names to JobSkill ids, adding missing names to the dictionary"""
+    from backend.models.database import JobSkill
+    import uuid
+
+    if not names:
+        return {}
+    skill_ids = dict(db.execute(
+        select(JobSkill.skill_name, JobSkill.id).where(JobSkill.skill_name.in_(names))
+    ).all())
+
+    missing = names - skill_ids.keys()
+    if missing:
+        now = datetime.utcnow()
+        new_skills = [
+            {'id': str(uuid.uuid4()), 'skill_name': name, 'frequency': 0,
+             'average_salary_impact': 0.0, 'trend_direction': 'stable', 'last_updated': now}
+            for name in sorted(missing)
+        ]
+        insert = _dialect_insert(db.get_bind().dialect.name)
+        if insert is not None:
+            # Another writer may add the same skill concurrently
+            db.execute(insert(JobSkill.__table__).on_conflict_do_nothing(index_elements=['skill_name']), new_skills)
+        else:
+            db.add_all(JobSkill(**skill) for skill in new_skills)
+            db.flush()
+        skill_ids.update(db.execute(
+            select(JobSkill.skill_name, JobSkill.id).where(JobSkill.skill_name.in_(missing))
+        ).all())
+    return skill_ids
+
+
+def _link_job_skills(db: Session, skills_by_job: dict, replace_job_ids) -> None:
+    """Write job -> skill associations, replacing those of already-stored jobs"""
+    from backend.models.database import job_listing_skills
+
+    if replace_job_ids:
+        db.execute(delete(job_listing_skills).where(job_listing_skills.c.job_id.in_(list(replace_job_ids))))
+
+    skill_ids = _ensure_skills(db, {name for names in skills_by_job.values() for name in names})
+    links = [
+        {'job_id': job_id, 'skill_id': skill_ids[name]}
+        for job_id, names in skills_by_job.items()
+        for name in names
+    ]
+    if links:
+        db.execute(job_listing_skills.insert(), links)
+
+
+def _jobs_with_skills(skills: list, match: str = 'any'):
+    """Subquery of job ids linked to any/all of the given skill names"""
+    from backend.models.database import JobSkill, job_listing_skills
+
+    link = job_listing_skills.c
+    sub = select(link.job_id).where(
+        link.skill_id.in_(select(JobSkill.id).where(JobSkill.skill_name.in_(skills)))
+    )
+    if match == 'all':
+        sub = sub.group_by(link.job_id).having(func.count(link.skill_id) == len(skills))
+    return sub
+
+
+# Precomputed feature columns /api/jobs/ can sort and filter on
+SCORE_SORT_COLUMNS = ('salary_score', 'growth_potential', 'match_score')
+
+# Last candidate set built for job ranking, keyed on a cheap change fingerprint
+_ranking_cache = {'key': None, 'candidates': None}
+
+
+def build_ranking_candidates(columns: dict):
+    """
+    ``JobCandidates`` from ``DatabaseService.get_ranking_columns``, cached
+    under its fingerprint. Pure CPU work on already-fetched rows, so async
+    callers run it on the inference pool.
+    """
+    from backend.models.ml_models import JobCandidates
+    
+    if columns['candidates'] is not None:
+        return columns['candidates']
+    skills_by_job = columns['skills_by_job']
+    candidates = JobCandidates([
+        {
+            'id': job_id,
+            'experience_level': experience_level,
+            'salary_max': salary_max,
+            'location': location,
+            'remote_type': remote_type,
+            'skills_required': skills_by_job.get(job_id, [])
+        }
+        for job_id, experience_level, salary_max, location, remote_type in columns['rows']
+    ])
+    _ranking_cache.update(key=columns['key'], candidates=candidates)
+    return candidates
+
+
+def _chunks(items: list, size: int):
+    """Yield successive fixed-size slices of a list"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
 class DatabaseService:
     """Service for database operations"""
     
     @staticmethod
     def insert_jobs(db: Session, jobs: list) -> int:
-        """Insert jobs into database"""
+        """Insert or update jobs, returning the number of rows written"""
+        result = DatabaseService.upsert_jobs(db, jobs)
+        return result['inserted'] + result['updated']
+    
+    @staticmethod
+    def upsert_jobs(
+        db: Session,
+        jobs: list,
+        chunk_size: Optional[int] = None,
+        on_stored: Optional[Callable[[Session, list], None]] = None
+    ) -> dict:
+        """
+        Bulk insert-or-update jobs with INSERT ... ON CONFLICT DO UPDATE.
+        
+        Jobs are written in chunks of ``chunk_size`` rows (one executemany and
+        one commit per chunk), so a bad row or batch never discards the rest of
+        the refresh. Rows whose ``job_url`` already belongs to a different
+        listing are skipped instead of failing the batch. Rows whose
+        ``content_hash`` matches the stored one are counted as unchanged and
+        not written, so ``updated_at`` only moves when a listing changes. Skill
+        associations and the statistics rollups are updated in the same
+        transaction as their jobs, as is anything ``on_stored(db, ids)`` adds
+        for the ids written.
+        """
         from backend.models.database import JobListing
-        import uuid
         
-        count = 0
-        for job in jobs:
-            try:
-                job_listing = JobListing(
-                    id=job.get('id', str(uuid.uuid4())),
-                    title=job.get('title'),
-                    company=job.get('company'),
-                    location=job.get('location'),
-                    job_url=job.get('job_url'),
-                    description=job.get('description'),
-                    salary_min=job.get('salary_min'),
-                    salary_max=job.get('salary_max'),
-                    job_type=job.get('job_type', 'full-time'),
-                    experience_level=job.get('experience_level', 'mid'),
-                    skills_required=','.join(job.get('skills_required', [])),
-                    remote_type=job.get('remote_type', 'on-site'),
-                    posted_date=job.get('posted_date'),
-                    source=job.get('source', 'web')
+        chunk_size = chunk_size or settings.bulk_insert_chunk_size
+        rows, skills_by_id, skipped = _prepare_rows(jobs, datetime.utcnow())
+        
+        stmt = _upsert_statement(db.get_bind().dialect.name)
+        totals = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'skipped': skipped, 'batches': []}
+        
+        for chunk in _chunks(rows, chunk_size):
+            batch = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0}
+            
+            # Collapse duplicates inside the chunk: last row per id wins,
+            # first listing to claim a job_url keeps it
+            by_id = {}
+            for row in chunk:
+                by_id[row['id']] = row
+            batch['skipped'] += len(chunk) - len(by_id)
+            
+            ids = list(by_id)
+            urls = [row['job_url'] for row in by_id.values() if row['job_url']]
+            existing = db.execute(
+                select(
+                    JobListing.id, JobListing.job_url, JobListing.content_hash,
+                    *(getattr(JobListing, col) for col in STAT_COLUMNS)
+                ).where(
+                    or_(JobListing.id.in_(ids), JobListing.job_url.in_(urls))
                 )
-                db.add(job_listing)
-                count += 1
+            ).all()
+            existing_by_id = {row.id: row for row in existing}
+            existing_ids = existing_by_id.keys()
+            url_owner = {row.job_url: row.id for row in existing if row.job_url}
+            
+            batch_rows = []
+            for row in by_id.values():
+                stored = existing_by_id.get(row['id'])
+                if stored is not None and stored.content_hash == row['content_hash']:
+                    batch['unchanged'] += 1
+                    continue
+                url = row['job_url']
+                if url and url_owner.setdefault(url, row['id']) != row['id']:
+                    batch['skipped'] += 1
+                    continue
+                batch['updated' if row['id'] in existing_ids else 'inserted'] += 1
+                batch_rows.append(row)
+            
+            try:
+                if batch_rows:
+                    if stmt is not None:
+                        db.execute(stmt, batch_rows)
+                    else:
+                        for row in batch_rows:
+                            db.merge(JobListing(**row))
+                        db.flush()
+                    _link_job_skills(
+                        db,
+                        {row['id']: skills_by_id[row['id']] for row in batch_rows},
+                        [row['id'] for row in batch_rows if row['id'] in existing_ids]
+                    )
+                    apply_stat_deltas(db, stat_deltas(
+                        added=batch_rows,
+                        removed=[existing_by_id[row['id']] for row in batch_rows if row['id'] in existing_ids]
+                    ))
+                    if on_stored is not None:
+                        on_stored(db, [row['id'] for row in batch_rows])
+                db.commit()
+                if batch_rows:
+                    response_cache.invalidate()
             except Exception as e:
-                logger.error(f"Error inserting job: {e}")
-                continue
+                db.rollback()
+                logger.error(f"Error committing batch of {len(batch_rows)} jobs: {e}")
+                batch = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'skipped': len(chunk)}
+            
+            for key in ('inserted', 'updated', 'unchanged', 'skipped'):
+                totals[key] += batch[key]
+            totals['batches'].append(batch)
         
-        try:
+        logger.info(
+            f"Upserted jobs: {totals['inserted']} inserted, {totals['updated']} updated, "
+            f"{totals['unchanged']} unchanged, {totals['skipped']} skipped in {len(totals['batches'])} batches"
+        )
+        return totals
+    
+    @staticmethod
+    def insert_new_jobs(
+        db: Session,
+        jobs: list,
+        chunk_size: Optional[int] = None,
+        on_stored: Optional[Callable[[Session, list], None]] = None
+    ) -> dict:
+        """
+        Append jobs believed to be absent from the table (e.g. by the known
+        jobs Bloom filter) with a plain INSERT per chunk, skipping the
+        pre-select ``upsert_jobs`` needs for conflicts and rollup deltas. A
+        chunk that turns out to collide with stored rows is rolled back and
+        written through ``upsert_jobs`` instead. Returns ``upsert_jobs``'s
+        counters; ``on_stored`` is as there.
+        """
+        from sqlalchemy.exc import IntegrityError
+        from backend.models.database import JobListing
+        
+        chunk_size = chunk_size or settings.bulk_insert_chunk_size
+        totals = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0, 'batches': []}
+        
+        for job_chunk in _chunks(jobs, chunk_size):
+            rows, skills_by_id, skipped = _prepare_rows(job_chunk, datetime.utcnow())
+            batch = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'skipped': skipped}
+            
+            # Same in-chunk rules as upsert_jobs: last row per id, first claim on a url
+            by_id = {}
+            for row in rows:
+                by_id[row['id']] = row
+            batch['skipped'] += len(rows) - len(by_id)
+            claimed = set()
+            batch_rows = []
+            for row in by_id.values():
+                if row['job_url'] and row['job_url'] in claimed:
+                    batch['skipped'] += 1
+                    continue
+                claimed.add(row['job_url'])
+                batch_rows.append(row)
+            
+            try:
+                if batch_rows:
+                    db.execute(JobListing.__table__.insert(), batch_rows)
+                    _link_job_skills(db, {row['id']: skills_by_id[row['id']] for row in batch_rows}, [])
+                    apply_stat_deltas(db, stat_deltas(added=batch_rows))
+                    if on_stored is not None:
+                        on_stored(db, [row['id'] for row in batch_rows])
+                db.commit()
+                if batch_rows:
+                    response_cache.invalidate()
+                batch['inserted'] = len(batch_rows)
+            except IntegrityError:
+                db.rollback()
+                logger.info(f"Append of {len(batch_rows)} jobs hit stored rows, upserting instead")
+                batch = DatabaseService.upsert_jobs(db, job_chunk, chunk_size=chunk_size, on_stored=on_stored)
+                batch.pop('batches')
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Error appending batch of {len(batch_rows)} jobs: {e}")
+                batch = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'skipped': len(job_chunk)}
+            
+            for key in ('inserted', 'updated', 'unchanged', 'skipped'):
+                totals[key] += batch[key]
+            totals['batches'].append(batch)
+        return totals
+    
+    @staticmethod
+    def changed_jobs(db: Session, jobs: list, chunk_size: Optional[int] = None) -> list:
+        """
+        The jobs that ``upsert_jobs`` would write: new ids or a content hash
+        different from the stored one. Stored hashes are read with one query
+        per chunk of ids.
+        """
+        from backend.models.database import JobListing
+        
+        chunk_size = chunk_size or settings.bulk_insert_chunk_size
+        now = datetime.utcnow()
+        changed = []
+        for chunk in _chunks(jobs, chunk_size):
+            hashes = {}
+            for job in chunk:
+                try:
+                    if job.get('id'):
+                        row = _job_to_row(job, now)
+                        skills = get_skill_matcher().normalize(job.get('skills_required') or [])
+                        hashes[row['id']] = _content_hash(row, skills)
+                except Exception:
+                    pass  # left to upsert_jobs, which logs and skips it
+            stored = dict(db.execute(
+                select(JobListing.id, JobListing.content_hash).where(JobListing.id.in_(list(hashes)))
+            ).all())
+            changed.extend(
+                job for job in chunk
+                if job.get('id') not in hashes or stored.get(job['id']) != hashes[job['id']]
+            )
+        return changed
+    
+    @staticmethod
+    def backfill_job_skills(db: Session, chunk_size: Optional[int] = None) -> int:
+        """
+        One-off migration linking jobs stored before the skills association
+        existed, from their comma-joined ``skills_required``. Does nothing once
+        any association has been written.
+        """
+        from backend.models.database import JobListing, job_listing_skills
+        
+        if db.execute(select(job_listing_skills.c.job_id).limit(1)).first() is not None:
+            return 0
+        
+        chunk_size = chunk_size or settings.bulk_insert_chunk_size
+        linked = 0
+        last_id = ''
+        while True:
+            rows = db.execute(
+                select(JobListing.id, JobListing.skills_required)
+                .where(JobListing.id > last_id)
+                .order_by(JobListing.id)
+                .limit(chunk_size)
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            skills_by_job = {
+                job_id: get_skill_matcher().normalize(skills.split(','))
+                for job_id, skills in rows if skills
+            }
+            _link_job_skills(db, skills_by_job, [])
             db.commit()
-        except Exception as e:
-            db.rollback()
-            logger.error(f"Error committing jobs: {e}")
+            linked += len(skills_by_job)
         
-        return count
+        if linked:
+            logger.info(f"Linked skills for {linked} existing jobs")
+        return linked
     
     @staticmethod
     def get_all_jobs(db: Session, limit: int = 100, offset: int = 0):
         """Get all jobs from database"""
         from backend.models.database import JobListing
+        from sqlalchemy.orm import selectinload
         
-        return db.query(JobListing).offset(offset).limit(limit).all()
+        return db.query(JobListing).options(selectinload(JobListing.skills)).offset(offset).limit(limit).all()
     
     @staticmethod
     def get_job_by_id(db: Session, job_id: str):
         """Get job by ID"""
         from backend.models.database import JobListing
+        from sqlalchemy.orm import selectinload
         
-        return db.query(JobListing).filter(JobListing.id == job_id).first()
+        return db.query(JobListing).options(selectinload(JobListing.skills)).filter(JobListing.id == job_id).first()
     
     @staticmethod
     def search_jobs(db: Session, query: dict) -> list:
         """Search jobs with filters"""
+        return DatabaseService.search_jobs_page(db, query)['jobs']
+    
+    @staticmethod
+    def search_jobs_page(db: Session, query: dict) -> dict:
+        """
+        Search jobs with filters, returning one keyset-paginated page.
+        
+        ``query['skills']`` keeps jobs linked to any (or, with
+        ``skills_match='all'``, every) listed skill through the indexed
+        association table. Results are ordered by relevance when a keyword is
+        given, by newest ``posted_date`` otherwise, or by a precomputed score
+        with ``query['sort_by']``, always with ``id`` as tie-breaker. Passing the
+        returned ``next_cursor`` back as ``query['cursor']`` continues after the
+        last row seen, so deep pages are a range scan on ``idx_posted_date``
+        instead of skipping ``offset`` rows.
+        """
         from backend.models.database import JobListing
+        from backend.utils.search import apply_keyword_search
         
         q = db.query(JobListing)
+        rank = None
         
         if query.get('keyword'):
-            keyword = f"%{query['keyword']}%"
-            q = q.filter(
-                (JobListing.title.ilike(keyword)) |
-                (JobListing.description.ilike(keyword))
-            )
+            q, rank = apply_keyword_search(q, query['keyword'], db.get_bind())
         
         if query.get('experience_level'):
             q = q.filter(JobListing.experience_level == query['experience_level'])
@@ -116,43 +569,178 @@ class DatabaseService:
         if query.get('location'):
             q = q.filter(JobListing.location.ilike(f"%{query['location']}%"))
         
+        skills = get_skill_matcher().normalize(query.get('skills') or [])
+        if skills:
+            q = q.filter(JobListing.id.in_(_jobs_with_skills(skills, query.get('skills_match', 'any'))))
+        
+        if query.get('category'):
+            q = q.filter(JobListing.category == query['category'])
+        
+        for column in SCORE_SORT_COLUMNS:
+            if query.get(f"min_{column}") is not None:
+                q = q.filter(getattr(JobListing, column) >= query[f"min_{column}"])
+        
+        sort_by = query.get('sort_by')
+        if sort_by in SCORE_SORT_COLUMNS:
+            # Precomputed scores, highest first; rows not yet enriched are left out
+            sort, sort_key, descending = sort_by, getattr(JobListing, sort_by), True
+            q = q.filter(sort_key.isnot(None))
+        elif rank is not None and sort_by in (None, 'relevance'):
+            sort, sort_key, descending = 'relevance', rank, False
+        else:
+            sort, sort_key, descending = 'posted_date', JobListing.posted_date, True
+        
+        if descending:
+            q = q.order_by(sort_key.desc(), JobListing.id.desc())
+        else:
+            q = q.order_by(sort_key, JobListing.id)
+        
+        if query.get('cursor'):
+            last_value, last_id = decode_cursor(query['cursor'], sort, 2)
+            if descending:
+                q = q.filter(tuple_(sort_key, JobListing.id) < tuple_(last_value, last_id))
+            else:
+                q = q.filter(tuple_(sort_key, JobListing.id) > tuple_(last_value, last_id))
+        elif query.get('offset'):
+            q = q.offset(query['offset'])
+        
         limit = query.get('limit', 20)
-        offset = query.get('offset', 0)
+        rows = q.add_columns(sort_key).limit(limit + 1).all()
+        
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last_job, last_value = rows[-1]
+            next_cursor = encode_cursor(sort, [last_value, last_job.id])
         
-        return q.limit(limit).offset(offset).all()
+        return {'jobs': [job for job, _ in rows], 'next_cursor': next_cursor}
     
     @staticmethod
-    def get_statistics(db: Session) -> dict:
-        """Get job market statistics"""
+    def get_ranking_columns(db: Session) -> dict:
+        """
+        Input for ``build_ranking_candidates``: the job table's change
+        fingerprint and either the candidates cached for it or every job's
+        ranking columns, loaded with two column-only queries (no ORM objects).
+        """
+        from backend.models.database import JobListing, JobSkill, job_listing_skills
+        
+        count, last_update = db.execute(
+            select(func.count(JobListing.id), func.max(JobListing.updated_at))
+        ).one()
+        key = (id(db.get_bind()), count, last_update)
+        if _ranking_cache['key'] == key:
+            return {'key': key, 'candidates': _ranking_cache['candidates']}
+        
+        link = job_listing_skills.c
+        skills_by_job = {}
+        for job_id, skill_name in db.execute(
+            select(link.job_id, JobSkill.skill_name).join(JobSkill, JobSkill.id == link.skill_id)
+        ):
+            skills_by_job.setdefault(job_id, []).append(skill_name)
+        
+        rows = db.execute(select(
+            JobListing.id, JobListing.experience_level, JobListing.salary_max,
+            JobListing.location, JobListing.remote_type
+        ).order_by(JobListing.id)).all()
+        return {'key': key, 'candidates': None, 'rows': rows, 'skills_by_job': skills_by_job}
+    
+    @staticmethod
+    def get_ranking_candidates(db: Session):
+        """Columnar ``JobCandidates`` for every job, reused until the job table changes"""
+        return build_ranking_candidates(DatabaseService.get_ranking_columns(db))
+    
+    @staticmethod
+    def get_jobs_by_ids(db: Session, job_ids: list) -> list:
+        """Get jobs by ID in one query, in the order of ``job_ids``"""
         from backend.models.database import JobListing
-        from sqlalchemy import func
-        
-        total_jobs = db.query(func.count(JobListing.id)).scalar() or 0
-        avg_salary = db.query(func.avg(JobListing.salary_max)).scalar() or 0
-        
-        # Top companies
-        top_companies = db.query(
-            JobListing.company,
-            func.count(JobListing.id).label('count')
-        ).group_by(JobListing.company).order_by(func.count(JobListing.id).desc()).limit(5).all()
-        
-        # Experience distribution
-        experience_dist = db.query(
-            JobListing.experience_level,
-            func.count(JobListing.id).label('count')
-        ).group_by(JobListing.experience_level).all()
-        
-        # Remote distribution
-        remote_count = db.query(
-            func.count(JobListing.id)
-        ).filter(JobListing.remote_type == 'fully-remote').scalar() or 0
-        
-        remote_percentage = (remote_count / total_jobs * 100) if total_jobs > 0 else 0
-        
-        return {
-            'total_jobs': total_jobs,
-            'avg_salary': float(avg_salary) if avg_salary else 0,
-            'top_companies': [{'name': c[0], 'count': c[1]} for c in top_companies],
-            'experience_distribution': [{'level': e[0], 'count': e[1]} for e in experience_dist],
-            'remote_percentage': remote_percentage
+        from sqlalchemy.orm import selectinload
+        
+        jobs = {
+            job.id: job
+            for job in db.query(JobListing).options(selectinload(JobListing.skills)).filter(JobListing.id.in_(job_ids))
         }
+        return [jobs[job_id] for job_id in job_ids if job_id in jobs]
+    
+    @staticmethod
+    def delete_jobs(db: Session, job_ids: list) -> int:
+        """
+        Delete jobs with their skill links, keeping the statistics rollups
+        exact. Their near-duplicate signatures go too, along with those of
+        duplicates grouped under them, so those are judged afresh next time.
+        """
+        from backend.models.database import JobListing, JobSignature, job_listing_skills, job_lsh_buckets
+        
+        deleted = 0
+        for chunk in _chunks(list(job_ids), settings.bulk_insert_chunk_size):
+            removed = db.execute(
+                select(*(getattr(JobListing, col) for col in STAT_COLUMNS)).where(JobListing.id.in_(chunk))
+            ).all()
+            db.execute(delete(job_listing_skills).where(job_listing_skills.c.job_id.in_(chunk)))
+            db.execute(delete(JobListing).where(JobListing.id.in_(chunk)))
+            db.execute(delete(job_lsh_buckets).where(job_lsh_buckets.c.job_id.in_(chunk)))
+            db.execute(delete(JobSignature).where(
+                or_(JobSignature.job_id.in_(chunk), JobSignature.canonical_id.in_(chunk))
+            ))
+            apply_stat_deltas(db, stat_deltas(removed=removed))
+            db.commit()
+            response_cache.invalidate()
+            deleted += len(removed)
+        return deleted
+    
+    @staticmethod
+    def get_job_duplicates(db: Session, job_id: str) -> list:
+        """Ids of near-duplicate postings grouped under a canonical job"""
+        from backend.models.database import JobSignature
+        
+        return list(db.execute(
+            select(JobSignature.job_id)
+            .where(JobSignature.canonical_id == job_id, JobSignature.job_id != job_id)
+            .order_by(JobSignature.job_id)
+        ).scalars())
+    
+    @staticmethod
+    def submit_refresh_run(db: Session, trigger: str = 'api') -> tuple:
+        """Queue a data refresh; (run, True), or (active run, False) if one is already queued or running"""
+        return submit_refresh_run(db, trigger)
+    
+    @staticmethod
+    def get_refresh_run(db: Session, run_id: str) -> Optional[dict]:
+        return get_refresh_run(db, run_id)
+    
+    @staticmethod
+    def list_refresh_runs(db: Session, limit: int = 20) -> list:
+        return list_refresh_runs(db, limit)
+    
+    @staticmethod
+    def cancel_refresh_run(db: Session, run_id: str) -> Optional[dict]:
+        return cancel_refresh_run(db, run_id)
+    
+    @staticmethod
+    def finish_refresh_run(
+        db: Session, run_id: str, status: str, result: Optional[dict] = None, error: Optional[str] = None
+    ) -> None:
+        finish_refresh_run(db, run_id, status, result, error)
+    
+    @staticmethod
+    def get_statistics(db: Session) -> dict:
+        """Get job market statistics from the incrementally maintained rollups"""
+        return read_statistics(db)
+    
+    @staticmethod
+    def rebuild_statistics(db: Session) -> int:
+        """Recompute the statistics rollups from job_listings to reconcile any drift"""
+        rows = rebuild_stat_rollups(db)
+        response_cache.invalidate()
+        return rows
+    
+    @staticmethod
+    def refresh_analytics(db: Session) -> dict:
+        """Recompute skill demand and posting growth into JobSkill/JobAnalysis"""
+        result = refresh_market_analytics(db)
+        response_cache.invalidate()
+        return result
+    
+    @staticmethod
+    def get_market_analytics(db: Session, top_skills: int = 5) -> dict:
+        """Top skills and growth rate from the last analytics refresh"""
+        return read_market_analytics(db, top_skills)
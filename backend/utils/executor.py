@@ -0,0 +1,185 @@
+"""
+Bounded thread/process execution for CPU-bound work in the API
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+from backend.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutorBusyError(RuntimeError):
+    """Raised when a pool already has its maximum number of pending tasks"""
+
+
+class ExecutorTimeoutError(TimeoutError):
+    """Raised when a task does not finish within its timeout"""
+
+
+def _lower_priority(increment: int) -> None:
+    """Worker initializer: yield the CPU to request handling when cores are contended"""
+    if increment and hasattr(os, 'nice'):
+        os.nice(increment)
+
+
+class _Pool:
+    """One executor with an admission limit and counters"""
+    
+    def __init__(self, name: str, executor: Executor, max_pending: int, timeout: float):
+        self.name = name
+        self.executor = executor
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self.metrics = {
+            'submitted': 0, 'completed': 0, 'failed': 0, 'rejected': 0, 'timed_out': 0,
+            'in_flight': 0, 'total_seconds': 0.0, 'max_seconds': 0.0
+        }
+    
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        if not self._slots.acquire(blocking=False):
+            self._count('rejected')
+            raise ExecutorBusyError(f"{self.name} pool has {self.max_pending} tasks pending")
+        
+        started = time.perf_counter()
+        try:
+            future = self.executor.submit(fn, *args, **kwargs)
+        except Exception:
+            self._slots.release()
+            raise
+        self._count('submitted', in_flight=1)
+        
+        def done(f: Future):
+            # The slot is held until the task really ends, even after a timeout
+            elapsed = time.perf_counter() - started
+            self._slots.release()
+            with self._lock:
+                self.metrics['in_flight'] -= 1
+                self.metrics['failed' if f.cancelled() or f.exception() else 'completed'] += 1
+                self.metrics['total_seconds'] += elapsed
+                self.metrics['max_seconds'] = max(self.metrics['max_seconds'], elapsed)
+        
+        future.add_done_callback(done)
+        return future
+    
+    def _count(self, key: str, in_flight: int = 0) -> None:
+        with self._lock:
+            self.metrics[key] += 1
+            self.metrics['in_flight'] += in_flight
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.metrics)
+        finished = stats['completed'] + stats['failed']
+        stats['avg_seconds'] = stats['total_seconds'] / finished if finished else 0.0
+        stats['max_pending'] = self.max_pending
+        return stats
+
+
+class TaskExecutor:
+    """
+    Runs short inference on a thread pool and training/pipeline runs on a
+    process pool, so neither stalls the event loop. Each pool admits at most
+    ``max_pending`` queued or running tasks; extra submissions fail fast with
+    ``ExecutorBusyError`` instead of queueing without bound.
+    
+    Process tasks must be picklable module-level functions. With
+    ``process_workers=0`` background tasks use a thread pool instead.
+    """
+    
+    def __init__(
+        self,
+        thread_workers: Optional[int] = None,
+        process_workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        inference_timeout: Optional[float] = None,
+        background_timeout: Optional[float] = None
+    ):
+        thread_workers = thread_workers or settings.executor_thread_workers
+        process_workers = settings.executor_process_workers if process_workers is None else process_workers
+        max_pending = max_pending or settings.executor_max_pending
+        
+        self.inference = _Pool(
+            'inference',
+            ThreadPoolExecutor(thread_workers, thread_name_prefix='inference'),
+            max_pending,
+            inference_timeout or settings.executor_inference_timeout
+        )
+        if process_workers > 0:
+            # spawn: forking a process that runs threads (uvicorn, scheduler) is unsafe
+            background = ProcessPoolExecutor(
+                process_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_lower_priority,
+                initargs=(settings.executor_process_nice,)
+            )
+        else:
+            background = ThreadPoolExecutor(1, thread_name_prefix='background')
+        self.background = _Pool(
+            'background',
+            background,
+            max_pending,
+            background_timeout or settings.executor_background_timeout
+        )
+    
+    async def run_inference(self, fn: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """Await ``fn(*args, **kwargs)`` on the inference thread pool"""
+        return await self._run(self.inference, partial(fn, *args, **kwargs), timeout)
+    
+    async def run_background(self, fn: Callable, *args, timeout: Optional[float] = None) -> Any:
+        """Await ``fn(*args)`` on the background (process) pool"""
+        return await self._run(self.background, partial(fn, *args), timeout)
+    
+    def run_background_sync(self, fn: Callable, *args, timeout: Optional[float] = None) -> Any:
+        """``run_background`` for callers outside the event loop (e.g. the scheduler)"""
+        future = self.background.submit(fn, *args)
+        try:
+            return future.result(timeout=timeout or self.background.timeout)
+        except TimeoutError as e:
+            self.background._count('timed_out')
+            raise ExecutorTimeoutError(f"background task exceeded {timeout or self.background.timeout}s") from e
+    
+    async def _run(self, pool: _Pool, call: Callable, timeout: Optional[float]) -> Any:
+        timeout = timeout or pool.timeout
+        future = asyncio.wrap_future(pool.submit(call))
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError as e:
+            pool._count('timed_out')
+            raise ExecutorTimeoutError(f"{pool.name} task exceeded {timeout}s") from e
+    
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {'inference': self.inference.stats(), 'background': self.background.stats()}
+    
+    def shutdown(self, wait: bool = True) -> None:
+        self.inference.executor.shutdown(wait=wait, cancel_futures=True)
+        self.background.executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_task_executor: Optional[TaskExecutor] = None
+_task_executor_lock = threading.Lock()
+
+
+def get_task_executor() -> TaskExecutor:
+    """Process-wide executor, created on first use"""
+    global _task_executor
+    with _task_executor_lock:
+        if _task_executor is None:
+            _task_executor = TaskExecutor()
+        return _task_executor
+
+
+def shutdown_task_executor() -> None:
+    global _task_executor
+    with _task_executor_lock:
+        if _task_executor is not None:
+            _task_executor.shutdown(wait=False)
+            _task_executor = None
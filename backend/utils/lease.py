@@ -0,0 +1,130 @@
+"""
+Named leases stored in the database, for coordinating replicas
+"""
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import Session
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def holder_id() -> str:
+    """Identity of this process among the replicas"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class DatabaseLease:
+    """
+    A lease row in ``scheduler_leases`` held by one holder until it expires.
+
+    ``acquire`` takes the lease if it is free or expired and extends it if
+    this holder already has it, with a single conditional UPDATE (or an
+    INSERT for a lease never taken), so concurrent replicas cannot both
+    win. A holder that stops renewing loses the lease ``ttl`` seconds after
+    its last renewal. Works on any database, SQLite included; expiry uses
+    the replicas' clocks, so their skew must stay well below ``ttl``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl: float,
+        holder: Optional[str] = None,
+        session_factory: Optional[Callable[[], Session]] = None
+    ):
+        self.name = name
+        self.ttl = ttl
+        self.holder = holder or holder_id()
+        self._session_factory = session_factory
+
+    def _session(self) -> Session:
+        if self._session_factory is not None:
+            return self._session_factory()
+        from backend.utils.database import SessionLocal
+        return SessionLocal()
+
+    def acquire(self) -> bool:
+        """Take or renew the lease; True while this holder has it"""
+        return self._take(renew=True)
+
+    def claim(self) -> bool:
+        """Take the lease only if it is free or expired, even from this holder"""
+        return self._take(renew=False)
+
+    def release(self) -> None:
+        """Give the lease up early if this holder has it"""
+        from backend.models.database import SchedulerLease
+
+        db = self._session()
+        try:
+            db.execute(delete(SchedulerLease).where(
+                SchedulerLease.name == self.name, SchedulerLease.holder == self.holder
+            ))
+            db.commit()
+        finally:
+            db.close()
+
+    def current(self) -> Optional[Dict]:
+        """Holder and expiry of the lease, or None if it was never taken"""
+        from backend.models.database import SchedulerLease
+
+        db = self._session()
+        try:
+            lease = db.get(SchedulerLease, self.name)
+            if lease is None:
+                return None
+            return {
+                'name': lease.name,
+                'holder': lease.holder,
+                'acquired_at': lease.acquired_at.isoformat(),
+                'expires_at': lease.expires_at.isoformat(),
+                'expired': lease.expires_at <= datetime.utcnow()
+            }
+        finally:
+            db.close()
+
+    def _take(self, renew: bool) -> bool:
+        from backend.models.database import SchedulerLease
+
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.ttl)
+        available = SchedulerLease.expires_at <= now
+        if renew:
+            available = or_(available, SchedulerLease.holder == self.holder)
+
+        db = self._session()
+        try:
+            held_before = db.execute(
+                select(SchedulerLease.holder).where(SchedulerLease.name == self.name)
+            ).scalar_one_or_none() == self.holder
+            taken = db.execute(
+                update(SchedulerLease)
+                .where(SchedulerLease.name == self.name, available)
+                .values(
+                    holder=self.holder,
+                    expires_at=expires_at,
+                    **({} if renew and held_before else {'acquired_at': now})
+                )
+            ).rowcount
+            if not taken:
+                db.add(SchedulerLease(name=self.name, holder=self.holder, acquired_at=now, expires_at=expires_at))
+                db.flush()
+            db.commit()
+            return True
+        except IntegrityError:
+            # The row exists and is held by someone else
+            db.rollback()
+            return False
+        except OperationalError as e:
+            # e.g. SQLite busy past its timeout; try again on the next call
+            db.rollback()
+            logger.warning(f"Could not take lease {self.name}: {e}")
+            return False
+        finally:
+            db.close()
@@ -0,0 +1,45 @@
+"""
+Opaque cursors for keyset pagination
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, List
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and 'dt' in value:
+        return datetime.fromisoformat(value['dt'])
+    return value
+
+
+def encode_cursor(sort: str, values: List[Any]) -> str:
+    """Encode the sort key of the last row on a page as an opaque token"""
+    payload = json.dumps({'s': sort, 'k': [_encode_value(v) for v in values]}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, sort: str, size: int) -> List[Any]:
+    """Decode a cursor produced by ``encode_cursor`` for the same sort order and key size"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload['s'] != sort:
+            raise InvalidCursorError("Cursor was issued for a different sort order")
+        if len(payload['k']) != size:
+            raise InvalidCursorError(f"Cursor key has {len(payload['k'])} values, expected {size}")
+        return [_decode_value(v) for v in payload['k']]
+    except InvalidCursorError:
+        raise
+    except Exception as e:
+        raise InvalidCursorError(f"Malformed cursor: {e}") from e
@@ -0,0 +1,274 @@
+"""
+Request rate limiting shared by every endpoint
+"""
+import asyncio
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Tuple
+from backend.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitDecision(NamedTuple):
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: int  # whole seconds until a request would be allowed; 0 when allowed
+
+
+def sliding_window(previous: int, current: int, elapsed: float, window: float, limit: int) -> Tuple[float, int]:
+    """
+    Estimated requests in the last ``window`` seconds, weighting the previous
+    fixed window by the part of it still covered, and whole seconds until
+    the estimate drops below ``limit`` (0 if it already is)
+    """
+    estimate = previous * (1 - elapsed / window) + current
+    if estimate < limit:
+        return estimate, 0
+    if current < limit and previous > 0:
+        # The previous window's share shrinks as this one goes on
+        wait = window * (previous + current - limit) / previous - elapsed
+    else:
+        # Only the next window helps; then this window is the one fading out
+        wait = window - elapsed + window * (current - limit) / current
+    return estimate, max(1, math.floor(wait) + 1)
+
+
+class LocalRateLimitBackend:
+    """
+    In-process sliding-window counters, O(1) state per key.
+
+    Each key keeps its window number and the counts of that window and the
+    one before. Keys are held in least-recently-used order; a key untouched
+    for two windows carries no information and is dropped from the cold end
+    as new requests arrive, and ``max_keys`` caps the table outright, so
+    memory stays flat however many distinct callers come and go. Counts are
+    per process; use the Redis backend to share them across workers.
+    """
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._counters: 'OrderedDict[str, list]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def hit(self, key: str, limit: int, window: float, now: Optional[float] = None) -> RateLimitDecision:
+        now = time.time() if now is None else now
+        index, elapsed = divmod(now, window)
+        with self._lock:
+            self._expire(index)
+            counter = self._counters.get(key)
+            if counter is None:
+                if len(self._counters) >= self.max_keys:
+                    self._counters.popitem(last=False)
+                    self.evictions += 1
+                counter = self._counters[key] = [index, 0, 0]
+            else:
+                self._counters.move_to_end(key)
+                if counter[0] != index:
+                    counter[1] = counter[2] if counter[0] == index - 1 else 0
+                    counter[0], counter[2] = index, 0
+
+            estimate, retry_after = sliding_window(counter[1], counter[2], elapsed, window, limit)
+            if retry_after:
+                return RateLimitDecision(False, limit, 0, retry_after)
+            counter[2] += 1
+            return RateLimitDecision(True, limit, max(0, int(limit - estimate - 1)), 0)
+
+    async def ahit(self, key: str, limit: int, window: float) -> RateLimitDecision:
+        return self.hit(key, limit, window)
+
+    def info(self) -> Dict[str, int]:
+        return {
+            'keys': len(self._counters),
+            'max_keys': self.max_keys,
+            'evictions': self.evictions,
+            'expirations': self.expirations
+        }
+
+    def _expire(self, index: float) -> None:
+        counters = self._counters
+        while counters:
+            key, counter = next(iter(counters.items()))
+            if counter[0] >= index - 1:
+                return
+            del counters[key]
+            self.expirations += 1
+
+
+class RedisRateLimitBackend:
+    """
+    Sliding-window counters in Redis, shared by every worker and replica.
+
+    One pipelined round trip per request increments the current window's
+    counter and reads the previous one; both expire after two windows. A
+    rejected request gives its increment back. ``ahit`` runs the blocking
+    client in a worker thread.
+    """
+
+    def __init__(self, url: Optional[str] = None, client=None, prefix: str = "sophia:ratelimit"):
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    def hit(self, key: str, limit: int, window: float, now: Optional[float] = None) -> RateLimitDecision:
+        now = time.time() if now is None else now
+        index, elapsed = divmod(now, window)
+        current_key = f"{self.prefix}:{key}:{int(index)}"
+        pipe = self.client.pipeline()
+        pipe.incr(current_key)
+        pipe.expire(current_key, max(1, math.ceil(2 * window)))
+        pipe.get(f"{self.prefix}:{key}:{int(index) - 1}")
+        current, _, previous = pipe.execute()
+
+        estimate, retry_after = sliding_window(int(previous or 0), current - 1, elapsed, window, limit)
+        if retry_after:
+            self.client.decr(current_key)
+            return RateLimitDecision(False, limit, 0, retry_after)
+        return RateLimitDecision(True, limit, max(0, int(limit - estimate - 1)), 0)
+
+    async def ahit(self, key: str, limit: int, window: float) -> RateLimitDecision:
+        return await asyncio.to_thread(self.hit, key, limit, window)
+
+    def info(self) -> Dict[str, int]:
+        return {}
+
+
+class RateLimiter:
+    """
+    Allows ``limit`` requests per ``window`` seconds per caller, counted by
+    the backend. A failing backend lets requests through rather than
+    taking the API down with it.
+    """
+
+    def __init__(
+        self,
+        backend=None,
+        limit: Optional[int] = None,
+        window: Optional[float] = None,
+        enabled: Optional[bool] = None
+    ):
+        self.backend = backend or LocalRateLimitBackend(settings.rate_limit_max_keys)
+        self.limit = limit or settings.rate_limit_requests
+        self.window = window or settings.rate_limit_window_seconds
+        self.enabled = settings.rate_limit_enabled if enabled is None else enabled
+        self.allowed = 0
+        self.rejected = 0
+
+    def hit(self, key: str) -> RateLimitDecision:
+        try:
+            decision = self.backend.hit(key, self.limit, self.window)
+        except Exception as e:
+            logger.warning(f"Rate limit check failed: {e}")
+            return RateLimitDecision(True, self.limit, self.limit, 0)
+        return self._count(decision)
+
+    async def ahit(self, key: str) -> RateLimitDecision:
+        """``hit`` for async callers, with backend I/O kept off the event loop"""
+        try:
+            decision = await self.backend.ahit(key, self.limit, self.window)
+        except Exception as e:
+            logger.warning(f"Rate limit check failed: {e}")
+            return RateLimitDecision(True, self.limit, self.limit, 0)
+        return self._count(decision)
+
+    def _count(self, decision: RateLimitDecision) -> RateLimitDecision:
+        if decision.allowed:
+            self.allowed += 1
+        else:
+            self.rejected += 1
+        return decision
+
+    def stats(self) -> Dict:
+        return {
+            'enabled': self.enabled,
+            'limit': self.limit,
+            'window_seconds': self.window,
+            'allowed': self.allowed,
+            'rejected': self.rejected,
+            **self.backend.info()
+        }
+
+
+def client_key(scope: Dict) -> str:
+    """
+    Caller identity: the client address or, behind ``rate_limit_proxy_hops``
+    trusted proxies, the address the outermost of them saw. Proxies append
+    to ``X-Forwarded-For``, so entries left of that one come from the
+    caller and could be anything.
+    """
+    if settings.rate_limit_trust_proxy:
+        forwarded = [
+            address.strip()
+            for name, value in scope.get('headers', ())
+            if name == b'x-forwarded-for'
+            for address in value.decode('latin-1').split(',')
+        ]
+        hops = settings.rate_limit_proxy_hops
+        if hops > 0 and len(forwarded) >= hops:
+            return forwarded[-hops]
+    client = scope.get('client')
+    return client[0] if client else 'anonymous'
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware applying a ``RateLimiter`` to every HTTP request outside
+    ``rate_limit_exempt_paths``. Rejections are 429 with ``Retry-After``;
+    allowed responses carry ``X-RateLimit-Limit`` and
+    ``X-RateLimit-Remaining``.
+    """
+
+    def __init__(self, app, limiter: Optional[RateLimiter] = None):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        limiter = self.limiter or rate_limiter
+        if scope['type'] != 'http' or not limiter.enabled or scope['path'] in settings.rate_limit_exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        decision = await limiter.ahit(client_key(scope))
+        limit_headers = [
+            (b'x-ratelimit-limit', str(decision.limit).encode()),
+            (b'x-ratelimit-remaining', str(decision.remaining).encode())
+        ]
+        if not decision.allowed:
+            body = json.dumps({'detail': 'Rate limit exceeded'}).encode()
+            await send({
+                'type': 'http.response.start',
+                'status': 429,
+                'headers': [
+                    (b'content-type', b'application/json'),
+                    (b'content-length', str(len(body)).encode()),
+                    (b'retry-after', str(decision.retry_after).encode()),
+                    *limit_headers
+                ]
+            })
+            await send({'type': 'http.response.body', 'body': body})
+            return
+
+        async def send_with_headers(message):
+            if message['type'] == 'http.response.start':
+                message = {**message, 'headers': [*message.get('headers', []), *limit_headers]}
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+def _create_rate_limiter() -> RateLimiter:
+    if settings.rate_limit_backend == 'redis':
+        return RateLimiter(RedisRateLimitBackend(settings.redis_url))
+    return RateLimiter()
+
+
+rate_limiter = _create_rate_limiter()
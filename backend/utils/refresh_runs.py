@@ -0,0 +1,163 @@
+"""
+Bookkeeping for background data refreshes.
+
+Runs live in the ``refresh_runs`` table so the API workers that accept and
+poll them and the worker process executing them share one view. The unique
+``active`` column holds True for the single queued or running refresh, so a
+second submission fails its INSERT instead of racing the first.
+"""
+import json
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from backend.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED = 'queued', 'running', 'succeeded', 'failed', 'cancelled'
+
+
+class RefreshCancelled(Exception):
+    """Raised inside a running refresh once its cancellation is requested"""
+
+
+def refresh_run_dict(run) -> Dict:
+    def stamp(value: Optional[datetime]) -> Optional[str]:
+        return value.isoformat() if value else None
+
+    return {
+        'job_id': run.id,
+        'status': run.status,
+        'trigger': run.trigger,
+        'cancel_requested': bool(run.cancel_requested),
+        'requested_at': stamp(run.requested_at),
+        'started_at': stamp(run.started_at),
+        'finished_at': stamp(run.finished_at),
+        'heartbeat_at': stamp(run.heartbeat_at),
+        'progress': json.loads(run.progress) if run.progress else None,
+        'result': json.loads(run.result) if run.result else None,
+        'error': run.error
+    }
+
+
+def submit_refresh_run(db: Session, trigger: str) -> Tuple[Dict, bool]:
+    """
+    Queue a refresh unless one is already active. Returns the queued run and
+    True, or the active run and False. An active run that has not reported
+    for ``refresh_stale_after`` seconds (its worker died) is failed first.
+    """
+    from backend.models.database import RefreshRun
+
+    now = datetime.utcnow()
+    expired = db.execute(
+        update(RefreshRun)
+        .where(
+            RefreshRun.active.is_(True),
+            func.coalesce(RefreshRun.heartbeat_at, RefreshRun.requested_at)
+            < now - timedelta(seconds=settings.refresh_stale_after)
+        )
+        .values(status=FAILED, active=None, finished_at=now, error="Worker stopped reporting progress")
+    ).rowcount
+    if expired:
+        logger.warning(f"Expired {expired} refresh runs that stopped reporting progress")
+        db.commit()
+
+    run = RefreshRun(id=str(uuid.uuid4()), trigger=trigger, status=QUEUED, active=True, requested_at=now)
+    db.add(run)
+    try:
+        db.commit()
+        return refresh_run_dict(run), True
+    except IntegrityError:
+        db.rollback()
+    active = db.execute(select(RefreshRun).where(RefreshRun.active.is_(True))).scalar_one_or_none()
+    if active is None:  # finished between the failed INSERT and this read
+        return submit_refresh_run(db, trigger)
+    return refresh_run_dict(active), False
+
+
+def get_refresh_run(db: Session, run_id: str) -> Optional[Dict]:
+    from backend.models.database import RefreshRun
+
+    run = db.get(RefreshRun, run_id, populate_existing=True)
+    return refresh_run_dict(run) if run is not None else None
+
+
+def list_refresh_runs(db: Session, limit: int = 20) -> List[Dict]:
+    """Most recently requested runs first"""
+    from backend.models.database import RefreshRun
+
+    runs = db.execute(select(RefreshRun).order_by(RefreshRun.requested_at.desc()).limit(limit)).scalars()
+    return [refresh_run_dict(run) for run in runs]
+
+
+def cancel_refresh_run(db: Session, run_id: str) -> Optional[Dict]:
+    """
+    Ask a run to stop. A queued run is cancelled at once; a running one
+    stops at its next progress report. Finished runs are left as they are.
+    """
+    from backend.models.database import RefreshRun
+
+    now = datetime.utcnow()
+    db.execute(
+        update(RefreshRun).where(RefreshRun.id == run_id, RefreshRun.status == QUEUED)
+        .values(status=CANCELLED, active=None, cancel_requested=True, finished_at=now)
+    )
+    db.execute(
+        update(RefreshRun).where(RefreshRun.id == run_id, RefreshRun.status == RUNNING)
+        .values(cancel_requested=True)
+    )
+    db.commit()
+    return get_refresh_run(db, run_id)
+
+
+def start_refresh_run(db: Session, run_id: str) -> bool:
+    """Mark a queued run as running; False if it was cancelled or expired meanwhile"""
+    from backend.models.database import RefreshRun
+
+    now = datetime.utcnow()
+    started = db.execute(
+        update(RefreshRun).where(RefreshRun.id == run_id, RefreshRun.status == QUEUED)
+        .values(status=RUNNING, started_at=now, heartbeat_at=now)
+    ).rowcount
+    db.commit()
+    return bool(started)
+
+
+def report_refresh_run(db: Session, run_id: str, progress: Dict) -> None:
+    """Store progress and raise ``RefreshCancelled`` if the run should stop"""
+    from backend.models.database import RefreshRun
+
+    db.execute(
+        update(RefreshRun).where(RefreshRun.id == run_id)
+        .values(progress=json.dumps(progress), heartbeat_at=datetime.utcnow())
+    )
+    db.commit()
+    cancelled = db.execute(
+        select(RefreshRun.id).where(
+            RefreshRun.id == run_id,
+            or_(RefreshRun.cancel_requested.is_(True), RefreshRun.status != RUNNING)
+        )
+    ).first()
+    if cancelled is not None:
+        raise RefreshCancelled(run_id)
+
+
+def finish_refresh_run(
+    db: Session,
+    run_id: str,
+    status: str,
+    result: Optional[Dict] = None,
+    error: Optional[str] = None
+) -> None:
+    """Record the outcome and release the single active slot"""
+    from backend.models.database import RefreshRun
+
+    values = {'status': status, 'active': None, 'finished_at': datetime.utcnow(), 'error': error}
+    if result is not None:
+        values['result'] = json.dumps(result)
+    db.execute(update(RefreshRun).where(RefreshRun.id == run_id, RefreshRun.active.is_(True)).values(**values))
+    db.commit()
@@ -1,28 +1,66 @@
 """
 Production-ready scheduler for background tasks
 """
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Optional
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
-from backend.pipelines.data_pipeline import DataPipeline
-from backend.utils.database import SessionLocal, DatabaseService
+from backend.config import settings
+from backend.pipelines.tasks import refresh_job_data, retrain_models
+from backend.utils.cache import response_cache
+from backend.utils.executor import get_task_executor
+from backend.utils.lease import DatabaseLease, holder_id
 import logging
 
 logger = logging.getLogger(__name__)
 
 
 class JobScheduler:
-    """Manages background job scheduling"""
+    """
+    Manages background job scheduling.
     
-    def __init__(self):
+    Data refreshes, periodic or submitted through the admin API, run on the
+    scheduler's thread pool, which hands the pipeline to the background
+    process pool and waits for it. Every refresh is a ``RefreshRun`` row, so
+    a periodic refresh is skipped while another one is active.
+    
+    Every replica may run a scheduler; periodic tasks only run on the one
+    holding the ``scheduler`` lease, renewed every
+    ``scheduler_heartbeat_interval`` seconds. When the leader dies its lease
+    expires after ``scheduler_lease_ttl`` seconds and the next replica to
+    heartbeat takes over. Each task also claims a lease for its period, so a
+    new leader whose triggers fire on a different phase does not repeat a
+    task the old leader already ran.
+    """
+    
+    REFRESH_INTERVAL = timedelta(hours=6)
+    RETRAIN_INTERVAL = timedelta(hours=24)
+    
+    def __init__(self, session_factory: Optional[Callable] = None):
         self.scheduler = BackgroundScheduler()
-        self.pipeline = DataPipeline()
+        self.holder = holder_id()
+        self.session_factory = session_factory
+        self.leader = DatabaseLease('scheduler', settings.scheduler_lease_ttl, self.holder, session_factory)
+        self.is_leader = False
     
     def start(self):
         """Start the scheduler"""
+        # Contend for leadership right away, then keep it renewed
+        self.scheduler.add_job(
+            self.heartbeat,
+            IntervalTrigger(seconds=settings.scheduler_heartbeat_interval),
+            id='scheduler_heartbeat',
+            name='Renew scheduler leadership',
+            next_run_time=datetime.now(),
+            replace_existing=True
+        )
+        
         # Refresh job data every 6 hours
         self.scheduler.add_job(
-            self._refresh_jobs,
-            IntervalTrigger(hours=6),
+            self.run_scheduled,
+            IntervalTrigger(seconds=self.REFRESH_INTERVAL.total_seconds()),
+            args=['refresh_jobs', self.REFRESH_INTERVAL, self._refresh_jobs],
             id='refresh_jobs',
             name='Refresh job listings',
             replace_existing=True
@@ -30,57 +68,147 @@ class JobScheduler:
         
         # Update ML models every 24 hours
         self.scheduler.add_job(
-            self._update_models,
-            IntervalTrigger(hours=24),
+            self.run_scheduled,
+            IntervalTrigger(seconds=self.RETRAIN_INTERVAL.total_seconds()),
+            args=['update_models', self.RETRAIN_INTERVAL, self._update_models],
             id='update_models',
             name='Update ML models',
             replace_existing=True
         )
         
-        self.scheduler.start()
-        logger.info("Job scheduler started")
+        self._ensure_running()
+        logger.info(f"Job scheduler started as {self.holder}")
     
     def stop(self):
-        """Stop the scheduler"""
-        self.scheduler.shutdown()
+        """Stop the scheduler, handing leadership over at once"""
+        if self.scheduler.running:
+            self.scheduler.shutdown()
+        if self.is_leader:
+            self.leader.release()
+            self.is_leader = False
         logger.info("Job scheduler stopped")
     
+    def heartbeat(self) -> bool:
+        """Take or renew the scheduler lease; True while this replica leads"""
+        held = self.leader.acquire()
+        if held != self.is_leader:
+            logger.info(f"{self.holder} {'became' if held else 'is no longer'} the scheduler leader")
+        self.is_leader = held
+        return held
+    
+    def run_scheduled(self, task: str, interval: timedelta, fn: Callable) -> bool:
+        """Run ``fn`` if this replica leads and ``task`` has not run anywhere this period"""
+        if not self.heartbeat():
+            logger.debug(f"Skipping {task}, another replica leads the scheduler")
+            return False
+        # Expires a little before the next trigger so the leader's own schedule never trips on it
+        period = DatabaseLease(
+            f"task:{task}",
+            interval.total_seconds() - settings.scheduler_lease_ttl,
+            self.holder,
+            self.session_factory
+        )
+        if not period.claim():
+            logger.info(f"Skipping {task}, it already ran this period")
+            return False
+        fn()
+        return True
+    
+    def submit_refresh(self, run_id: str):
+        """Run a queued refresh now, without waiting for it"""
+        self._ensure_running()
+        self.scheduler.add_job(
+            self._run_refresh,
+            args=[run_id],
+            id=f"refresh_{run_id}",
+            name='Refresh job listings on request',
+            misfire_grace_time=None
+        )
+    
+    def _ensure_running(self):
+        if not self.scheduler.running:
+            self.scheduler.start()
+    
+    def status(self) -> dict:
+        """This replica's role, the current leader and the next run of each job"""
+        return {
+            'holder': self.holder,
+            'running': self.scheduler.running,
+            'is_leader': self.is_leader,
+            'leader': self.leader.current(),
+            'jobs': [
+                {'id': job.id, 'name': job.name, 'next_run_time': job.next_run_time.isoformat() if job.next_run_time else None}
+                for job in self.scheduler.get_jobs()
+            ]
+        }
+    
+    def _session(self):
+        from backend.utils.database import SessionLocal
+        return self.session_factory() if self.session_factory is not None else SessionLocal()
+    
     def _refresh_jobs(self):
         """Refresh job data from sources"""
+        from backend.utils.database import DatabaseService
+        
+        db = self._session()
         try:
-            db = SessionLocal()
-            jobs = self.pipeline.run()
-            count = DatabaseService.insert_jobs(db, jobs)
-            logger.info(f"Refreshed {count} jobs")
+            run, created = DatabaseService.submit_refresh_run(db, trigger='schedule')
+        finally:
             db.close()
+        if not created:
+            logger.info(f"Skipping scheduled refresh, {run['job_id']} is {run['status']}")
+            return
+        self._run_refresh(run['job_id'])
+    
+    def _run_refresh(self, run_id: str):
+        """Execute one refresh run in the background pool"""
+        from backend.utils.refresh_runs import FAILED, finish_refresh_run
+        
+        try:
+            result = get_task_executor().run_background_sync(refresh_job_data, run_id)
         except Exception as e:
+            # The worker records its own failures; this covers a pool that rejected or lost the task
             logger.error(f"Error refreshing jobs: {e}")
+            db = self._session()
+            try:
+                finish_refresh_run(db, run_id, FAILED, error=str(e))
+            finally:
+                db.close()
+            return
+        
+        count = result.get('inserted', 0) + result.get('updated', 0)
+        if count:
+            # The worker already bumped the shared generation per batch; this
+            # covers a cache running with cache_shared_generation off
+            response_cache.invalidate()
+        logger.info(f"Refresh {run_id} {result['status']}: {count} jobs written ({result.get('unchanged', 0)} unchanged)")
     
     def _update_models(self):
         """Retrain ML models with new data"""
         try:
-            db = SessionLocal()
-            jobs = DatabaseService.get_all_jobs(db, limit=1000)
-            
-            # Convert to dicts for training
-            job_dicts = [
-                {
-                    'experience_level': job.experience_level,
-                    'skills_required': job.skills_required.split(',') if job.skills_required else [],
-                    'remote_type': job.remote_type,
-                    'company': job.company,
-                    'location': job.location,
-                    'salary_max': job.salary_max
-                }
-                for job in jobs
-            ]
-            
-            # Retrain models
-            from backend.models.ml_models import SalaryPredictionModel
-            model = SalaryPredictionModel()
-            model.train(job_dicts)
-            
+            get_task_executor().run_background_sync(retrain_models)
+            response_cache.invalidate()
             logger.info("ML models updated successfully")
-            db.close()
         except Exception as e:
             logger.error(f"Error updating models: {e}")
+
+
+_job_scheduler: Optional[JobScheduler] = None
+_job_scheduler_lock = threading.Lock()
+
+
+def get_job_scheduler() -> JobScheduler:
+    """Process-wide scheduler, created on first use"""
+    global _job_scheduler
+    with _job_scheduler_lock:
+        if _job_scheduler is None:
+            _job_scheduler = JobScheduler()
+        return _job_scheduler
+
+
+def shutdown_job_scheduler() -> None:
+    global _job_scheduler
+    with _job_scheduler_lock:
+        if _job_scheduler is not None:
+            _job_scheduler.stop()
+            _job_scheduler = None
@@ -0,0 +1,52 @@
+"""
+In-place schema upgrades for databases created by an earlier version
+"""
+from typing import List
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from backend.models.database import Base
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def upgrade_schema(engine: Engine) -> List[str]:
+    """
+    Bring existing tables up to the models after ``create_all``, which only
+    creates missing tables. Adds missing columns (as nullable, so existing
+    rows read NULL until the pipeline rewrites them) and creates missing
+    indexes, rebuilding any whose columns changed. Idempotent; returns the
+    changes made.
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    changes = []
+
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+
+        existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing_columns:
+                continue
+            if column.primary_key:
+                raise RuntimeError(f"Cannot add primary key column {table.name}.{column.name} in place")
+            column_type = column.type.compile(dialect=engine.dialect)
+            with engine.begin() as conn:
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+            changes.append(f"added column {table.name}.{column.name}")
+
+        existing_indexes = {index['name']: index['column_names'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            columns = [column.name for column in index.columns]
+            if existing_indexes.get(index.name) == columns:
+                continue
+            if index.name in existing_indexes:
+                index.drop(bind=engine)
+            index.create(bind=engine)
+            changes.append(f"indexed {table.name} ({', '.join(columns)}) as {index.name}")
+
+    for change in changes:
+        logger.info(f"Schema upgrade: {change}")
+    return changes
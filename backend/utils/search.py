@@ -0,0 +1,144 @@
+"""
+Full-text search index for job listings
+"""
+import re
+import weakref
+from typing import Optional, Tuple
+from sqlalchemy import column, func, inspect, literal_column, table, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Query
+import logging
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "job_listings_fts"
+
+# SQLite: external-content FTS5 table over job_listings, kept in sync by triggers
+# so every writer (ORM, bulk upsert, raw SQL) updates the index
+SQLITE_FTS_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, description,
+        content='job_listings', content_rowid='rowid',
+        tokenize='porter unicode61'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS job_listings_fts_ai AFTER INSERT ON job_listings BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description)
+        VALUES (new.rowid, new.title, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS job_listings_fts_ad AFTER DELETE ON job_listings BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.rowid, old.title, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS job_listings_fts_au AFTER UPDATE OF title, description ON job_listings BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.rowid, old.title, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, description)
+        VALUES (new.rowid, new.title, new.description);
+    END""",
+]
+
+# PostgreSQL: stored generated tsvector (title weighted above description) + GIN index
+POSTGRES_FTS_DDL = [
+    """ALTER TABLE job_listings ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(description, '')), 'B')
+        ) STORED""",
+    "CREATE INDEX IF NOT EXISTS idx_job_listings_search ON job_listings USING GIN (search_vector)",
+]
+
+# Engines with a usable full-text index; others fall back to ILIKE
+_fulltext_engines = weakref.WeakSet()
+
+
+def _create_fulltext_objects(conn, dialect: str) -> bool:
+    """Run the index DDL on a connection; False if the dialect has none"""
+    if dialect == "sqlite":
+        existed = inspect(conn).has_table(FTS_TABLE)
+        for statement in SQLITE_FTS_DDL:
+            conn.execute(text(statement))
+        if not existed:
+            conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+    elif dialect == "postgresql":
+        for statement in POSTGRES_FTS_DDL:
+            conn.execute(text(statement))
+    else:
+        return False
+    return True
+
+
+def install_fulltext_index(engine: Engine) -> bool:
+    """Create the full-text index for the engine's dialect, backfilling existing rows"""
+    dialect = engine.dialect.name
+    try:
+        with engine.begin() as conn:
+            if not _create_fulltext_objects(conn, dialect):
+                return False
+    except Exception as e:
+        logger.warning(f"Full-text index unavailable, keyword search will scan: {e}")
+        return False
+
+    _fulltext_engines.add(engine)
+    logger.info(f"Full-text index ready ({dialect})")
+    return True
+
+
+async def install_fulltext_index_async(engine: AsyncEngine) -> bool:
+    """``install_fulltext_index`` for an asyncio engine"""
+    dialect = engine.dialect.name
+    try:
+        async with engine.begin() as conn:
+            if not await conn.run_sync(_create_fulltext_objects, dialect):
+                return False
+    except Exception as e:
+        logger.warning(f"Full-text index unavailable, keyword search will scan: {e}")
+        return False
+
+    # Sessions on the async engine hand the sync facade to query code
+    _fulltext_engines.add(engine.sync_engine)
+    return True
+
+
+def rebuild_fulltext_index(engine: Engine) -> None:
+    """Rebuild the SQLite index from job_listings (e.g. after VACUUM renumbers rowids)"""
+    if engine.dialect.name == "sqlite":
+        with engine.begin() as conn:
+            conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+
+def _fts5_query(keyword: str) -> Optional[str]:
+    """Turn free text into an FTS5 query: every word must match, as a prefix"""
+    words = re.findall(r"\w+", keyword)
+    return " ".join(f'"{word}"*' for word in words) if words else None
+
+
+def apply_keyword_search(q: Query, keyword: str, engine: Engine) -> Tuple[Query, Optional[object]]:
+    """
+    Filter a JobListing query by keyword.
+    
+    Returns the filtered query and a rank expression (lower is better) when a
+    full-text index is available, or an ILIKE-filtered query and ``None``.
+    """
+    from backend.models.database import JobListing
+
+    dialect = engine.dialect.name
+    if engine in _fulltext_engines:
+        if dialect == "sqlite":
+            match = _fts5_query(keyword)
+            if match:
+                fts = table(FTS_TABLE, column("rowid"), column(FTS_TABLE))
+                q = q.join(fts, fts.c.rowid == literal_column("job_listings.rowid")).filter(
+                    fts.c[FTS_TABLE].op("MATCH")(match)
+                )
+                # Title matches weigh 10x description matches
+                return q, func.bm25(literal_column(FTS_TABLE), 10.0, 1.0)
+        elif dialect == "postgresql":
+            tsquery = func.websearch_to_tsquery("english", keyword)
+            search_vector = literal_column("job_listings.search_vector")
+            q = q.filter(search_vector.op("@@")(tsquery))
+            return q, -func.ts_rank_cd(search_vector, tsquery)
+
+    pattern = f"%{keyword}%"
+    q = q.filter(JobListing.title.ilike(pattern) | JobListing.description.ilike(pattern))
+    return q, None
@@ -5,6 +5,8 @@ from fastapi import HTTPException, status
 from functools import wraps
 import hashlib
 import secrets
+from backend.config import settings
+from backend.utils.ratelimit import LocalRateLimitBackend, RateLimiter
 
 
 def verify_api_key(api_key: str, valid_key: str) -> bool:
@@ -30,29 +32,24 @@ def verify_password(password: str, hashed: str) -> bool:
 
 
 def rate_limit_decorator(max_calls: int, time_window: int):
-    """Rate limiting decorator"""
+    """
+    Rate limiting decorator keyed on the ``user_id`` argument, with O(1)
+    state per caller. App-wide limits come from ``RateLimitMiddleware``.
+    """
     def decorator(func):
-        calls = {}
+        limiter = RateLimiter(
+            LocalRateLimitBackend(settings.rate_limit_max_keys), limit=max_calls, window=time_window, enabled=True
+        )
         
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            import time
-            caller_id = kwargs.get('user_id', 'anonymous')
-            now = time.time()
-            
-            if caller_id not in calls:
-                calls[caller_id] = []
-            
-            # Remove old calls outside time window
-            calls[caller_id] = [call for call in calls[caller_id] if now - call < time_window]
-            
-            if len(calls[caller_id]) >= max_calls:
+            decision = limiter.hit(str(kwargs.get('user_id', 'anonymous')))
+            if not decision.allowed:
                 raise HTTPException(
                     status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    detail="Rate limit exceeded"
+                    detail="Rate limit exceeded",
+                    headers={'Retry-After': str(decision.retry_after)}
                 )
-            
-            calls[caller_id].append(now)
             return await func(*args, **kwargs)
         
         return wrapper
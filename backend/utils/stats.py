@@ -0,0 +1,157 @@
+"""
+Incrementally maintained job statistics
+"""
+from typing import Dict, Iterable, Tuple
+from sqlalchemy import delete, func, literal, select
+from sqlalchemy.orm import Session
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Columns the dashboard groups by; each gets one rollup row per distinct value
+STAT_DIMENSIONS = ('company', 'experience_level', 'remote_type')
+
+# Columns a stored job must be read with to compute its contribution
+STAT_COLUMNS = STAT_DIMENSIONS + ('salary_max',)
+
+TOTAL = 'total'
+
+
+def stat_deltas(added: Iterable = (), removed: Iterable = ()) -> Dict[Tuple[str, str], list]:
+    """
+    Rollup changes for rows entering and leaving job_listings, keyed by
+    (dimension, value) as [job_count, salary_sum, salary_count]. Rows are
+    dicts or row objects exposing ``STAT_COLUMNS``.
+    """
+    deltas = {}
+    for rows, sign in ((added, 1), (removed, -1)):
+        for row in rows:
+            get = row.get if isinstance(row, dict) else lambda name: getattr(row, name)
+            salary = get('salary_max')
+            keys = [(TOTAL, '')] + [(dimension, get(dimension) or '') for dimension in STAT_DIMENSIONS]
+            for key in keys:
+                delta = deltas.setdefault(key, [0, 0.0, 0])
+                delta[0] += sign
+                if salary is not None:
+                    delta[1] += sign * salary
+                    delta[2] += sign
+    return {key: delta for key, delta in deltas.items() if delta != [0, 0.0, 0]}
+
+
+def apply_stat_deltas(db: Session, deltas: Dict[Tuple[str, str], list]) -> None:
+    """Add deltas to the rollup table in the caller's transaction"""
+    from backend.models.database import JobStatRollup
+    from backend.utils.database import _dialect_insert
+    
+    if not deltas:
+        return
+    
+    rows = [
+        {'dimension': dimension, 'value': value, 'job_count': count,
+         'salary_sum': salary_sum, 'salary_count': salary_count}
+        for (dimension, value), (count, salary_sum, salary_count) in deltas.items()
+    ]
+    insert = _dialect_insert(db.get_bind().dialect.name)
+    if insert is not None:
+        # Relative update so concurrent writers never overwrite each other's counts
+        table = JobStatRollup.__table__
+        stmt = insert(table)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=['dimension', 'value'],
+            set_={col: table.c[col] + stmt.excluded[col] for col in ('job_count', 'salary_sum', 'salary_count')}
+        ), rows)
+    else:
+        for row in rows:
+            rollup = db.get(JobStatRollup, (row['dimension'], row['value']))
+            if rollup is None:
+                db.add(JobStatRollup(**row))
+            else:
+                rollup.job_count += row['job_count']
+                rollup.salary_sum += row['salary_sum']
+                rollup.salary_count += row['salary_count']
+        db.flush()
+    
+    db.execute(delete(JobStatRollup).where(JobStatRollup.job_count <= 0))
+
+
+def rebuild_stat_rollups(db: Session) -> int:
+    """Recompute every rollup row from job_listings, replacing what is stored"""
+    from backend.models.database import JobListing, JobStatRollup
+    
+    salary = JobListing.salary_max
+    aggregates = (
+        func.count(JobListing.id),
+        func.coalesce(func.sum(salary), 0.0),
+        func.count(salary)
+    )
+    queries = [select(literal(TOTAL), literal(''), *aggregates)]
+    for dimension in STAT_DIMENSIONS:
+        value = func.coalesce(getattr(JobListing, dimension), '')
+        queries.append(select(literal(dimension), value, *aggregates).group_by(value))
+    
+    rows = [
+        {'dimension': dimension, 'value': value, 'job_count': count,
+         'salary_sum': float(salary_sum), 'salary_count': salary_count}
+        for query in queries
+        for dimension, value, count, salary_sum, salary_count in db.execute(query)
+        if count
+    ]
+    
+    db.execute(delete(JobStatRollup))
+    if rows:
+        db.execute(JobStatRollup.__table__.insert(), rows)
+    db.commit()
+    logger.info(f"Rebuilt {len(rows)} statistics rollup rows")
+    return len(rows)
+
+
+def ensure_stat_rollups(db: Session) -> bool:
+    """Build the rollups for a database populated before they existed"""
+    from backend.models.database import JobListing, JobStatRollup
+    
+    if db.execute(select(JobStatRollup.dimension).limit(1)).first() is not None:
+        return False
+    if db.execute(select(JobListing.id).limit(1)).first() is None:
+        return False
+    rebuild_stat_rollups(db)
+    return True
+
+
+def read_statistics(db: Session, top_companies: int = 5) -> dict:
+    """Dashboard statistics from the rollup table: two indexed reads"""
+    from backend.models.database import JobStatRollup
+    
+    def _value(value):
+        return value or None
+    
+    rows = db.execute(
+        select(JobStatRollup).where(JobStatRollup.dimension.in_([TOTAL, 'experience_level', 'remote_type']))
+    ).scalars().all()
+    companies = db.execute(
+        select(JobStatRollup.value, JobStatRollup.job_count)
+        .where(JobStatRollup.dimension == 'company')
+        .order_by(JobStatRollup.job_count.desc(), JobStatRollup.value)
+        .limit(top_companies)
+    ).all()
+    
+    total = next((row for row in rows if row.dimension == TOTAL), None)
+    total_jobs = total.job_count if total else 0
+    avg_salary = total.salary_sum / total.salary_count if total and total.salary_count else 0
+    remote_count = next(
+        (row.job_count for row in rows if row.dimension == 'remote_type' and row.value == 'fully-remote'), 0
+    )
+    
+    return {
+        'total_jobs': total_jobs,
+        'avg_salary': float(avg_salary),
+        'top_companies': [{'name': _value(name), 'count': count} for name, count in companies],
+        'experience_distribution': [
+            {'level': _value(row.value), 'count': row.job_count}
+            for row in rows if row.dimension == 'experience_level'
+        ],
+        'avg_salary_by_experience': {
+            row.value: row.salary_sum / row.salary_count
+            for row in rows if row.dimension == 'experience_level' and row.value and row.salary_count
+        },
+        'remote_percentage': (remote_count / total_jobs * 100) if total_jobs > 0 else 0
+    }
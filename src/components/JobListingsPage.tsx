@@ -42,7 +42,7 @@ export default function JobListingsPage() {
       const response = await fetch(`${API_BASE_URL}/api/jobs?${params}`);
       if (!response.ok) throw new Error('Failed to fetch jobs');
       const data = await response.json();
-      setJobs(data);
+      setJobs(data.data);
     } catch (error) {
       console.error('Error fetching jobs:', error);
     } finally {